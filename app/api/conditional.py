@@ -0,0 +1,54 @@
+# app/api/conditional.py
+import hashlib
+from typing import Callable, Hashable
+
+from fastapi import Request, Response
+
+from app.core.config import ConfigSnapshot, settings
+from app.models.schemas import ApiResponse
+
+
+def config_response(
+    request: Request,
+    key: Hashable,
+    build: Callable[[ConfigSnapshot], ApiResponse],
+) -> Response:
+    """기계 설정으로만 만들어지는 GET 응답을 ETag와 함께 반환
+
+    ETag는 스냅샷 식별자와 key로 정하므로 본문을 만들지 않고도 계산됩니다.
+    요청의 If-None-Match가 일치하면 본문을 만들지 않고 304를 반환하고, 아니면
+    스냅샷마다 한 번만 직렬화해 캐시한 본문을 반환합니다.
+
+    Args:
+        request: 현재 요청
+        key: 스냅샷 안에서 응답을 구분하는 키 (엔드포인트와 정규화한 경로 파라미터)
+        build: 스냅샷으로부터 응답 모델을 만드는 함수
+    """
+    snapshot = settings.config
+    etag = _make_etag(snapshot, key)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    body = snapshot.derive(("response", key), lambda s: _serialize(build(s)))
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _make_etag(snapshot: ConfigSnapshot, key: Hashable) -> str:
+    # 경로 파라미터에 헤더에 쓸 수 없는 문자가 있을 수 있으므로 키는 짧은 해시로 넣음
+    route = hashlib.blake2s(repr(key).encode("utf-8"), digest_size=6).hexdigest()
+    return f'"{snapshot.snapshot_id}-{route}"'
+
+
+def _serialize(response: ApiResponse) -> bytes:
+    return response.model_dump_json(exclude_none=True).encode("utf-8")
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        # If-None-Match는 약한 비교를 사용하므로 W/ 접두사는 무시
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
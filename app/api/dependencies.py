@@ -4,14 +4,30 @@ from app.services.modbus.client import ModbusClientManager, DatabaseClientManage
 from app.core.config import settings
 from app.services.modbus.machine import MachineService
 from app.services.modbus.dao.auto_controll_dao import AutoControllDAO
+from app.services.historian.service import HistorianService
+from app.services.historian.store import HistorianStore
 
 # 데이터베이스 인스턴스 생성
 db = DatabaseClientManager(settings.DATABASE_NAME)
+# 서버 내장 히스토리언 (비활성화 시 None, lifespan에서 시작/종료)
+historian = HistorianService() if settings.HISTORIAN_ENABLED else None
+# 히스토리 조회용 저장소 (조회는 읽기 전용 연결을 따로 열므로 외부 저장기가 쓰는 DB도 읽을 수 있음)
+history_store = historian.store if historian is not None else HistorianStore(
+    settings.historian_db_file,
+    partition=settings.HISTORIAN_PARTITION,
+    archive_dir=settings.historian_archive_dir,
+)
 
 
 def get_database_client():
     return db
 
+def get_historian():
+    return historian
+
+def get_history_store():
+    return history_store
+
 def get_auto_controll_dao(db_client = Depends(get_database_client)):
     return AutoControllDAO(db_client)
 
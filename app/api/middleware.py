@@ -5,6 +5,7 @@ import time
 from fastapi import Request, Response
 from fastapi.responses import JSONResponse
 
+from app.core.config import settings
 from app.core.logging_config import setup_logger
 
 logger = setup_logger(__name__)
@@ -34,6 +35,13 @@ async def log_middleware(request: Request, call_next):
 
     # 응답 처리
     response = await call_next(request)
+    # 응답 시점의 기계 설정 스냅샷 ("{boot_id}-{version}")
+    response.headers["X-Config-Version"] = settings.config.snapshot_id
+
+    # 응답 로깅은 POST 요청만 하므로, 그 외 요청은 응답 본문을 모으지 않고 그대로 전달
+    # (스트리밍 응답이 메모리에 쌓이지 않도록)
+    if request.method != "POST":
+        return response
 
     # 응답 바디 읽기
     response_body = b""
@@ -47,10 +55,9 @@ async def log_middleware(request: Request, call_next):
     response_log = {
         "status_code": response.status_code,
         "process_time": f"{process_time:.3f}s",
-        "response_body": response_body.decode(),
+        "response_body": response_body.decode(errors="replace"),
     }
-    if request.method == "POST":
-        logger.info(f"Response: {json.dumps(response_log, ensure_ascii=False)}")
+    logger.info(f"Response: {json.dumps(response_log, ensure_ascii=False)}")
 
     return Response(
         content=response_body,
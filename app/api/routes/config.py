@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from typing import Dict
 from app.models.schemas import ApiResponse, MachineConfigFormat
 from app.services.config import ConfigService
@@ -11,15 +12,29 @@ router = APIRouter(prefix="/config", tags=["config"])
 @router.post("/import")
 async def import_config(
     config: Dict[str, MachineConfigFormat],
+    dry_run: bool = Query(
+        default=False, description="변경 사항만 계산하고 반영하지 않음"
+    ),
     db: DatabaseClientManager = Depends(get_database_client),
 ):
-    """기계와 태그 설정을 일괄 등록"""
+    """기계와 태그 설정을 일괄 등록
+
+    현재 설정과 비교해 바뀐 기계와 태그만 하나의 트랜잭션으로 반영하고,
+    변경 사항(diff)을 반환합니다.
+    """
     try:
         config_service = ConfigService(db)
-        await config_service.import_config(config)
+        diff = await db.run(
+            config_service.import_config, config, dry_run=dry_run
+        )
         return ApiResponse(
             success=True,
-            message="기계 및 태그 설정이 성공적으로 일괄 등록되었습니다.",
+            message=(
+                "설정 변경 사항을 계산했습니다. (dry run: 반영되지 않음)"
+                if dry_run
+                else "기계 및 태그 설정이 성공적으로 일괄 등록되었습니다."
+            ),
+            data=diff,
         )
     except Exception as e:
         raise HTTPException(
@@ -29,18 +44,59 @@ async def import_config(
 
 @router.get("/export")
 async def export_config(
+    snapshot: bool = Query(
+        default=False,
+        description="추출 결과를 logs/config에 스냅샷 파일로 저장 (같은 내용이면 생략)",
+    ),
     db: DatabaseClientManager = Depends(get_database_client),
 ):
-    """등록된 모든 기계와 태그 설정을 JSON 형식으로 추출"""
+    """등록된 모든 기계와 태그 설정을 JSON 형식으로 추출
+
+    스냅샷을 저장하지 않는 기본 요청은 DB 스레드에서 한 번에 읽은 뒤 기계 단위로
+    나누어 인코딩하며 스트리밍합니다.
+    """
     try:
         config_service = ConfigService(db)
-        result = await config_service.export_config()
+        if not snapshot:
+            rows = await db.run(config_service.load_export_rows)
+            return StreamingResponse(
+                config_service.iter_export_json("설정이 성공적으로 추출되었습니다.", rows),
+                media_type="application/json",
+            )
+
+        result = await db.run(config_service.export_config)
         return ApiResponse(
             success=True,
             data=result,
-            message=f"설정이 성공적으로 추출되었으며 {result['saved_path']}에 저장되었습니다.",
+            message=(
+                f"설정이 성공적으로 추출되었으며 {result['saved_path']}에 저장되었습니다."
+                if not result["deduplicated"]
+                else f"설정이 성공적으로 추출되었으며 같은 내용의 스냅샷 {result['saved_path']}이 이미 있습니다."
+            ),
         )
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"설정 추출 중 오류가 발생했습니다: {str(e)}"
         )
+
+
+@router.get("/changes")
+async def get_config_changes(
+    since: int = Query(
+        default=0, ge=0, description="이 버전 이후의 변경만 조회 (처음 동기화는 0)"
+    ),
+    limit: int = Query(default=1000, ge=1, le=10000, description="최대 변경 건수"),
+    db: DatabaseClientManager = Depends(get_database_client),
+):
+    """since 버전 이후의 기계/태그 설정 변경 이력
+
+    변경은 버전 순으로 반환되며, 순서대로 적용하면 최신 설정과 같아집니다.
+    다음 요청에는 응답의 version을 since로 사용하고, has_more가 true이면 바로 이어서 요청합니다.
+    """
+    config_service = ConfigService(db)
+    changes = await db.run(config_service.get_changes, since, limit)
+    return ApiResponse(
+        success=True,
+        message=f"설정 변경 이력 {len(changes['changes'])}건 조회 성공",
+        data=changes,
+    )
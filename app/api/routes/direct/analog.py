@@ -1,13 +1,129 @@
 # app/api/routes/direct/analog.py
-from fastapi import APIRouter, Depends, Path, Query
-from app.api.dependencies import get_modbus_client_by_ip
-from app.models.schemas import ApiResponse
-from app.services.modbus.client import ModbusClientManager
+from enum import Enum
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from fastapi.responses import Response
+from app.api.dependencies import get_database_client, get_modbus_client_by_ip
+from app.core.config import settings
+from app.models.schemas import ApiResponse, RegisterMapConfig
+from app.services.modbus.client import DatabaseClientManager, ModbusClientManager
 from app.services.modbus.analog import AnalogService
+from app.services.modbus.register_map import RegisterMapService
 
 router = APIRouter(prefix="/direct/analog", tags=["Direct analog"])
 
 
+class RangeFormat(str, Enum):
+    ARRAY = "array"
+    BYTES = "bytes"
+
+
+def get_register_map_service(
+    db: DatabaseClientManager = Depends(get_database_client),
+) -> RegisterMapService:
+    return RegisterMapService(db)
+
+
+@router.get("/all")
+async def read_all_analog(
+    client: ModbusClientManager = Depends(get_modbus_client_by_ip),
+):
+    service = AnalogService(client)
+    result = await service.read_all_values()
+    return ApiResponse(success=True, message="모든 아날로그 값 읽기 성공", data=result)
+
+
+@router.get("/range")
+async def read_analog_range(
+    start: int = Query(..., ge=0, le=65535, description="시작 레지스터 주소"),
+    count: int = Query(..., ge=1, le=65536, description="읽을 레지스터 개수"),
+    format: RangeFormat = Query(
+        default=RangeFormat.ARRAY,
+        description="array: 값 배열(JSON), bytes: 빅엔디언 16비트 원시 바이트",
+    ),
+    client: ModbusClientManager = Depends(get_modbus_client_by_ip),
+):
+    """연속된 레지스터 범위를 한 번에 읽는 엔드포인트"""
+    if start + count > 65536:
+        raise HTTPException(
+            status_code=422, detail="레지스터 범위가 0-65535를 벗어났습니다."
+        )
+    service = AnalogService(client)
+    values = await service.read_range(start, count)
+    if format == RangeFormat.BYTES:
+        return Response(
+            content=np.asarray(values, dtype=">u2").tobytes(),
+            media_type="application/octet-stream",
+            headers={"X-Register-Start": str(start), "X-Register-Count": str(count)},
+        )
+    return ApiResponse(
+        success=True,
+        message=f"레지스터 {start}-{start + count - 1} 읽기 성공",
+        data={"start": start, "count": count, "values": values},
+    )
+
+
+@router.get("/maps")
+async def list_register_maps(
+    service: RegisterMapService = Depends(get_register_map_service),
+):
+    """사용 가능한 레지스터 맵 목록 (저장된 맵, 기계 태그 기반 맵, 기본 맵)"""
+    maps = await service.db.run(service.list_maps)
+    return ApiResponse(
+        success=True,
+        message="레지스터 맵 목록 조회 성공",
+        data={
+            name: [{"start": start, "count": count} for start, count in ranges]
+            for name, ranges in maps.items()
+        },
+    )
+
+
+@router.get("/maps/{map_name}")
+async def read_register_map(
+    map_name: str,
+    client: ModbusClientManager = Depends(get_modbus_client_by_ip),
+    service: RegisterMapService = Depends(get_register_map_service),
+):
+    """레지스터 맵에 포함된 모든 레지스터 값을 읽는 엔드포인트"""
+    ranges = await service.db.run(service.get_map, map_name)
+    result = await AnalogService(client).read_ranges(
+        ranges, max_gap=settings.MODBUS_COALESCE_GAP
+    )
+    return ApiResponse(
+        success=True,
+        message=f"레지스터 맵 {map_name.upper()} 읽기 성공",
+        data=result,
+    )
+
+
+@router.put("/maps/{map_name}")
+async def save_register_map(
+    map_name: str,
+    config: RegisterMapConfig,
+    service: RegisterMapService = Depends(get_register_map_service),
+):
+    """레지스터 맵 저장 (같은 이름이 있으면 덮어씀)"""
+    await service.db.run(
+        service.save_map, map_name, [(r.start, r.count) for r in config.ranges]
+    )
+    return ApiResponse(
+        success=True, message=f"레지스터 맵 {map_name.upper()} 저장 완료"
+    )
+
+
+@router.delete("/maps/{map_name}")
+async def delete_register_map(
+    map_name: str,
+    service: RegisterMapService = Depends(get_register_map_service),
+):
+    """저장된 레지스터 맵 삭제"""
+    await service.db.run(service.delete_map, map_name)
+    return ApiResponse(
+        success=True, message=f"레지스터 맵 {map_name.upper()} 삭제 완료"
+    )
+
+
 @router.get("/{register}")
 async def read_analog(
     register: int = Path(..., ge=0, le=65535),
@@ -27,12 +143,3 @@ async def write_analog(
     service = AnalogService(client)
     result = await service.write_value(register, value)
     return ApiResponse(success=True, message="아날로그 값 쓰기 성공", data=result)
-
-
-@router.get("/all")
-async def read_all_analog(
-    client: ModbusClientManager = Depends(get_modbus_client_by_ip),
-):
-    service = AnalogService(client)
-    result = await service.read_all_values()
-    return ApiResponse(success=True, message="모든 아날로그 값 읽기 성공", data=result)
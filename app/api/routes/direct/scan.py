@@ -0,0 +1,68 @@
+# app/api/routes/direct/scan.py
+import asyncio
+from fastapi import APIRouter, Depends, Query
+from app.api.dependencies import get_database_client
+from app.core.config import settings
+from app.models.schemas import ApiResponse
+from app.services.modbus.client import DatabaseClientManager
+from app.services.modbus.register_map import MAX_REGISTERS_PER_READ, RegisterMapService
+from app.services.modbus.scanner import scan_device
+
+router = APIRouter(prefix="/direct/scan", tags=["Direct scan"])
+
+
+@router.post("")
+async def scan_registers(
+    host: str = Query(
+        ...,
+        description="원격 호스트 주소 (예: 172.30.1.97)",
+        pattern=r"^(?:[0-9]{1,3}\.){3}[0-9]{1,3}$",
+    ),
+    port: int = Query(default=settings.MODBUS_DEFAULT_PORT, ge=1, le=65535),
+    slave: int = Query(default=settings.MODBUS_SLAVE, ge=0),
+    start: int = Query(default=0, ge=0, le=65535, description="탐색 시작 주소"),
+    count: int = Query(default=10000, ge=1, le=65536, description="탐색할 주소 개수"),
+    workers: int = Query(default=4, ge=1, le=16, description="동시 연결 수"),
+    block_size: int = Query(
+        default=MAX_REGISTERS_PER_READ,
+        ge=1,
+        le=MAX_REGISTERS_PER_READ,
+        description="한 번에 읽을 레지스터 수",
+    ),
+    machine_name: str = Query(default="", description="제안할 기계 이름"),
+    save_map: bool = Query(
+        default=False, description="응답 구간을 기계 이름의 레지스터 맵으로 저장"
+    ),
+    db: DatabaseClientManager = Depends(get_database_client),
+):
+    """장비의 레지스터 주소 공간을 탐색하고 태그 설정을 제안
+
+    결과의 config는 그대로 /config/import 요청 본문으로 사용할 수 있습니다.
+    """
+    count = min(count, 65536 - start)
+    result = await asyncio.to_thread(
+        scan_device,
+        host,
+        port,
+        slave,
+        start,
+        count,
+        workers,
+        block_size,
+        machine_name,
+    )
+    if save_map:
+        map_name = next(iter(result.config))
+        await db.run(
+            RegisterMapService(db).save_map,
+            map_name,
+            [(r.start, r.count) for r in result.ranges],
+        )
+    return ApiResponse(
+        success=True,
+        message=(
+            f"레지스터 탐색 완료: {len(result.ranges)}개 구간, "
+            f"{result.register_count}개 레지스터 응답"
+        ),
+        data=result,
+    ).model_dump(exclude_none=True)
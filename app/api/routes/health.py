@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends
-from app.api.dependencies import get_modbus_client_by_ip
+from typing import Optional
+from app.api.dependencies import get_database_client, get_historian, get_modbus_client_by_ip
 from app.models.schemas import ApiResponse
-from app.services.modbus.client import ModbusClientManager
+from app.services.historian.service import HistorianService
+from app.services.modbus.client import DatabaseClientManager, ModbusClientManager
 
 router = APIRouter(prefix="/health", tags=["health"])
 
@@ -16,3 +18,29 @@ async def test_connection(
     client: ModbusClientManager = Depends(get_modbus_client_by_ip),
 ):
     return await client.test_connection()
+
+
+@router.get("/db")
+async def database_health(
+    db: DatabaseClientManager = Depends(get_database_client),
+):
+    """DB 전용 스레드의 작업 대기열 지표 조회"""
+    return ApiResponse(
+        success=True,
+        message="DB 작업 대기열 상태 조회 성공",
+        data=db.executor.stats(),
+    )
+
+
+@router.get("/historian")
+async def historian_health(
+    historian: Optional[HistorianService] = Depends(get_historian),
+):
+    """히스토리언 저장 버퍼, 저장 지연과 수집 주기 지표 조회"""
+    if historian is None:
+        return ApiResponse(success=True, message="히스토리언이 비활성화되어 있습니다.")
+    return ApiResponse(
+        success=True,
+        message="히스토리언 저장 상태 조회 성공",
+        data=historian.stats(),
+    )
@@ -0,0 +1,124 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from app.api.dependencies import get_history_store
+from app.models.schemas import HistoryAggregation, HistoryExportFormat
+from app.services.exceptions import CustomException, ErrorCode
+from app.services.historian.history import EXPORT_MEDIA_TYPES, HistoryService
+from app.services.historian.schema import to_epoch_ms
+from app.services.historian.store import HistorianStore
+
+router = APIRouter(prefix="/history", tags=["history"])
+
+
+def _to_local(value: datetime) -> datetime:
+    """시간대가 있는 시각은 로컬 시각으로 바꿔 시간대 없는 시각과 비교할 수 있게 함"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+
+@router.get("")
+async def get_history(
+    tags: str = Query(
+        ...,
+        description="조회할 태그 ('기계.태그', 쉼표로 구분)",
+        examples=["OIL_MAIN.TEMP,OIL_MAIN.PRESSURE"],
+    ),
+    start: Optional[datetime] = Query(
+        default=None, description="조회 시작 시각 (기본값: end 1시간 전)"
+    ),
+    end: Optional[datetime] = Query(
+        default=None, description="조회 끝 시각, 포함하지 않음 (기본값: 현재)"
+    ),
+    aggregation: HistoryAggregation = Query(
+        default=HistoryAggregation.RAW, description="집계 방식"
+    ),
+    bucket: int = Query(
+        default=60, ge=1, description="집계 구간 (초, raw에서는 무시)"
+    ),
+    limit: int = Query(
+        default=10000, ge=1, le=100000, description="한 번에 반환할 최대 행 수"
+    ),
+    cursor: Optional[str] = Query(
+        default=None, description="이전 응답의 next_cursor (다음 페이지 조회)"
+    ),
+    store: HistorianStore = Depends(get_history_store),
+):
+    """히스토리언 값 조회
+
+    raw는 저장된 값을, 그 밖의 집계는 bucket 구간별 값을 (태그, 시각) 순으로 반환합니다.
+    행이 limit개를 넘으면 next_cursor를 cursor로 넘겨 이어서 조회합니다. 응답은 행을
+    나누어 스트리밍합니다.
+    """
+    end = _to_local(end) if end else datetime.now()
+    start = _to_local(start) if start else end - timedelta(hours=1)
+    if end <= start:
+        raise CustomException(
+            ErrorCode.INVALID_INPUT, "end는 start보다 뒤여야 합니다.", 400
+        )
+    history_service = HistoryService(store)
+    names = [name for name in tags.split(",") if name.strip()]
+    if not names:
+        raise CustomException(ErrorCode.INVALID_INPUT, "조회할 태그가 없습니다.", 400)
+    after = history_service.parse_cursor(cursor)
+    tag_ids = await asyncio.to_thread(history_service.resolve_tags, names)
+    return StreamingResponse(
+        history_service.iter_history_json(
+            "히스토리 조회 성공",
+            tag_ids,
+            to_epoch_ms(start),
+            to_epoch_ms(end),
+            aggregation,
+            bucket * 1000,
+            limit,
+            after,
+        ),
+        media_type="application/json",
+    )
+
+
+@router.get("/export")
+async def export_history(
+    tags: Optional[str] = Query(
+        default=None,
+        description="내보낼 태그 ('기계.태그', 쉼표로 구분, 기본값: 모든 태그)",
+        examples=["OIL_MAIN.TEMP,OIL_MAIN.PRESSURE"],
+    ),
+    start: Optional[datetime] = Query(
+        default=None, description="시작 시각 (기본값: end 1시간 전)"
+    ),
+    end: Optional[datetime] = Query(
+        default=None, description="끝 시각, 포함하지 않음 (기본값: 현재)"
+    ),
+    format: HistoryExportFormat = Query(
+        default=HistoryExportFormat.ARROW, description="파일 형식 (Arrow IPC 스트림 또는 Parquet)"
+    ),
+    store: HistorianStore = Depends(get_history_store),
+):
+    """구간의 원시 값을 Arrow IPC 스트림 또는 Parquet 파일로 내려받기
+
+    히스토리언에서 배치 단위로 읽어 바로 인코딩해 보내므로 긴 구간도 서버 메모리를
+    적게 씁니다. 열은 tag("기계.태그"), ts(UTC), value, quality입니다.
+    """
+    end = _to_local(end) if end else datetime.now()
+    start = _to_local(start) if start else end - timedelta(hours=1)
+    if end <= start:
+        raise CustomException(
+            ErrorCode.INVALID_INPUT, "end는 start보다 뒤여야 합니다.", 400
+        )
+    history_service = HistoryService(store)
+    names = [name for name in (tags or "").split(",") if name.strip()]
+    if names:
+        tag_ids = await asyncio.to_thread(history_service.resolve_tags, names)
+    else:
+        tag_ids = await asyncio.to_thread(history_service.resolve_all_tags)
+    media_type, extension = EXPORT_MEDIA_TYPES[format]
+    file_name = f"history_{start:%Y%m%d%H%M%S}_{end:%Y%m%d%H%M%S}.{extension}"
+    return StreamingResponse(
+        history_service.iter_export(tag_ids, to_epoch_ms(start), to_epoch_ms(end), format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{file_name}"'},
+    )
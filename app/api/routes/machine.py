@@ -1,7 +1,8 @@
-import asyncio
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Request, status
 from fastapi.responses import JSONResponse
+from app.api.conditional import config_response
 from app.api.dependencies import get_database_client, get_modbus_client_by_machine_name
+from app.core.config import ConfigSnapshot
 from app.models.schemas import ApiResponse, MachineConfig, TagConfig, ErrorResponse
 from app.models.swagger_docs import (
     MACHINE_LIST_RESPONSE,
@@ -37,13 +38,18 @@ def get_machine_service(db: DatabaseClientManager = Depends(get_database_client)
     responses={200: MACHINE_LIST_RESPONSE},
 )
 async def get_machines_config(
+    request: Request,
     machine_service: MachineService = Depends(get_machine_service),
 ):
     """현재 등록된 기계 목록 및 태그 반환"""
-    result = machine_service.get_all_machines()
-    return ApiResponse(
-        success=result.success, message=result.message, data=result.data
-    ).model_dump(exclude_none=True)
+
+    def build(snapshot: ConfigSnapshot) -> ApiResponse:
+        result = machine_service.get_all_machines(snapshot)
+        return ApiResponse(
+            success=result.success, message=result.message, data=result.data
+        )
+
+    return config_response(request, "machines", build)
 
 
 @router.get(
@@ -55,14 +61,20 @@ async def get_machines_config(
     responses={200: MACHINE_CONFIG_RESPONSE},
 )
 async def get_machine_config(
+    request: Request,
     machine_name: str,
     machine_service: MachineService = Depends(get_machine_service),
 ):
     """특정 기계의 설정을 반환"""
-    result = machine_service.get_machine_config_response(machine_name)
-    return ApiResponse(
-        success=result.success, message=result.message, data=result.data
-    ).model_dump(exclude_none=True)
+    machine_name = machine_name.upper()
+
+    def build(snapshot: ConfigSnapshot) -> ApiResponse:
+        result = machine_service.get_machine_config_response(machine_name, snapshot)
+        return ApiResponse(
+            success=result.success, message=result.message, data=result.data
+        )
+
+    return config_response(request, ("machine", machine_name), build)
 
 
 @router.post(
@@ -79,7 +91,9 @@ async def add_machine(
     machine_service: MachineService = Depends(get_machine_service),
 ):
     """새로운 기계를 추가하고 설정을 갱신"""
-    result = machine_service.add_machine(machine_name, config)
+    result = await machine_service.db.run(
+        machine_service.add_machine, machine_name, config
+    )
     return ApiResponse(
         success=result.success, message=result.message, data=result.data
     ).model_dump(exclude_none=True)
@@ -91,7 +105,7 @@ async def delete_machine(
     machine_service: MachineService = Depends(get_machine_service),
 ):
     """기계를 삭제하고 설정을 갱신"""
-    result = machine_service.delete_machine(machine_name)
+    result = await machine_service.db.run(machine_service.delete_machine, machine_name)
 
     return ApiResponse(
         success=result.success, message=result.message, data=result.data
@@ -106,7 +120,9 @@ async def add_tag(
     machine_service: MachineService = Depends(get_machine_service),
 ):
     """특정 기계에 태그 추가 후 설정 갱신"""
-    result = machine_service.add_machine_tag(machine_name, tag_name, tag_data)
+    result = await machine_service.db.run(
+        machine_service.add_machine_tag, machine_name, tag_name, tag_data
+    )
     return ApiResponse(
         success=result.success, message=result.message, data=result.data
     ).model_dump(exclude_none=True)
@@ -119,7 +135,9 @@ async def delete_tag(
     machine_service: MachineService = Depends(get_machine_service),
 ):
     """특정 기계에서 태그 삭제 후 설정 갱신"""
-    machine_service.delete_machine_tag(machine_name, tag_name)
+    await machine_service.db.run(
+        machine_service.delete_machine_tag, machine_name, tag_name
+    )
     return ApiResponse(success=True, message=f"태그 {tag_name} 삭제 완료").model_dump(
         exclude_none=True
     )
@@ -127,14 +145,22 @@ async def delete_tag(
 
 @router.get("/{machine_name}/tags", status_code=status.HTTP_200_OK)
 async def get_tags(
+    request: Request,
     machine_name: str,
     machine_service: MachineService = Depends(get_machine_service),
 ):
     """특정 기계의 모든 태그 반환"""
-    tags = machine_service.get_machine_tags(machine_name)
-    return ApiResponse(
-        success=True, message=f"기계 {machine_name}의 태그 목록 조회 성공", data=tags
-    ).model_dump(exclude_none=True)
+    machine_name = machine_name.upper()
+
+    def build(snapshot: ConfigSnapshot) -> ApiResponse:
+        tags = machine_service.get_machine_tags(machine_name, snapshot)
+        return ApiResponse(
+            success=True,
+            message=f"기계 {machine_name}의 태그 목록 조회 성공",
+            data=tags,
+        )
+
+    return config_response(request, ("machine_tags", machine_name), build)
 
 
 @router.get("/{machine_name}/tags/{tag_name}/config", status_code=status.HTTP_200_OK)
@@ -160,7 +186,9 @@ async def update_tag(
     machine_service: MachineService = Depends(get_machine_service),
 ):
     """특정 기계의 특정 태그 설정 수정"""
-    machine_service.update_machine_tag(machine_name, tag_name, tag_data)
+    await machine_service.db.run(
+        machine_service.update_machine_tag, machine_name, tag_name, tag_data
+    )
     return ApiResponse(success=True, message=f"태그 {tag_name} 수정 완료").model_dump(
         exclude_none=True
     )
@@ -209,13 +237,9 @@ async def get_selected_tag_values(
     try:
         machine_service.client_manager = client
         tag_list = [tag.strip() for tag in tag_names.split(",")]
-        tasks = [
-            machine_service.read_machine_tag_value(machine_name, tag.upper())
-            for tag in tag_list
-        ]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        results = await machine_service.read_machine_tag_values(machine_name, tag_list)
         data = {}
-        for tag, result in zip(tag_list, results):
+        for tag, result in results.items():
             # 예외가 발생한 경우 에러 메시지를 기록합니다.
             if isinstance(result, Exception):
                 data[tag.upper()] = f"오류 발생: {str(result)}"
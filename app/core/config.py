@@ -1,8 +1,59 @@
 # app/core/config.py
-from pydantic import Field
+from pydantic import Field, PrivateAttr
 from pydantic_settings import SettingsConfigDict, BaseSettings
-from typing import Dict
-from app.models.schemas import MachineConfig
+from datetime import datetime
+import threading
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, TypeVar
+import uuid
+from app.models.schemas import HistorianCompression, MachineConfig, TagConfig
+
+T = TypeVar("T")
+
+# 프로세스가 시작될 때마다 새로 정해지는 ID (재시작 후 버전 번호가 겹치는 것을 구분)
+BOOT_ID = uuid.uuid4().hex[:12]
+
+
+class ConfigSnapshot:
+    """특정 버전의 기계 설정 (읽기 전용)
+
+    설정이 바뀌면 새 스냅샷을 만들어 통째로 교체합니다. 스냅샷에서 계산한
+    파생 데이터(기계 이름 목록, 레지스터 맵 등)는 derive()로 스냅샷마다 한 번만 계산합니다.
+    스냅샷에 담긴 MachineConfig와 태그 딕셔너리도 수정하지 말고 새로 만들어 교체해야 합니다.
+    """
+
+    __slots__ = ("machines", "version", "boot_id", "created_at", "_derived")
+
+    def __init__(self, machines: Dict[str, MachineConfig], version: int):
+        set_attr = super().__setattr__
+        set_attr("machines", MappingProxyType(dict(machines)))
+        set_attr("version", version)
+        set_attr("boot_id", BOOT_ID)
+        set_attr("created_at", datetime.now())
+        set_attr("_derived", {})
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError("ConfigSnapshot은 수정할 수 없습니다.")
+
+    @property
+    def snapshot_id(self) -> str:
+        """재시작 간에도 겹치지 않는 스냅샷 식별자 ("{boot_id}-{version}")"""
+        return f"{self.boot_id}-{self.version}"
+
+    @property
+    def machine_names(self) -> Tuple[str, ...]:
+        return self.derive("machine_names", lambda snapshot: tuple(snapshot.machines))
+
+    def derive(self, key: Any, factory: Callable[["ConfigSnapshot"], T]) -> T:
+        """스냅샷에서 계산한 값을 캐시해 반환 (같은 스냅샷에서는 한 번만 계산)
+
+        잠금을 쓰지 않으므로 동시에 처음 호출되면 중복 계산될 수 있지만,
+        결과는 먼저 저장된 값 하나로 맞춰집니다.
+        """
+        try:
+            return self._derived[key]
+        except KeyError:
+            return self._derived.setdefault(key, factory(self))
 
 
 class Settings(BaseSettings):
@@ -11,15 +62,148 @@ class Settings(BaseSettings):
     MODBUS_TIMEOUT: int = Field(default=3)
     MODBUS_RETRY_COUNT: int = Field(default=3)
     MODBUS_SLAVE: int = Field(default=1)
+    # 레지스터 맵을 읽을 때 사이에 끼워 함께 읽을 최대 빈 레지스터 수
+    MODBUS_COALESCE_GAP: int = Field(default=8)
 
     PROJECT_DIR: str = Field(default="/home/dongwon/IneejiModbusTester")
     SAVER_DB_NAME: str = Field(default="modbus_data")
 
-    MODBUS_MACHINES: Dict[str, MachineConfig] = Field(default={})
+    # 서버 내장 히스토리언 (modbus_database_saver.py를 대체, 외부 저장기와 동시에 켜지 않도록 기본 비활성)
+    HISTORIAN_ENABLED: bool = Field(default=False)
+    # 수집 주기 (초, 1초 미만 가능). 이 간격의 배수 시각(epoch 기준)에 맞춰 수집
+    HISTORIAN_INTERVAL: float = Field(default=30, gt=0)
+    # 수집 시각을 주기의 배수 시각에서 미루는 시간 (초, HISTORIAN_INTERVAL 미만)
+    HISTORIAN_PHASE: float = Field(default=0, ge=0)
+    HISTORIAN_MACHINES: List[str] = Field(
+        default=[
+            "OIL_MAIN", "OIL_1L", "OIL_2L", "OIL_3L", "OIL_4L", "OIL_5L",
+            "OIL_1R", "OIL_2R", "OIL_3R", "OIL_4R",
+            "OXY_MAIN", "OXY_1L", "OXY_2L", "OXY_3L", "OXY_4L", "OXY_5L",
+            "OXY_1R", "OXY_2R", "OXY_3R", "OXY_4R",
+        ]
+    )
+    HISTORIAN_TAGS: List[str] = Field(default=["PV", "SV"])
+    # 원시 값을 HISTORIAN_SCALE로 나누어 저장하되, 이 목록의 기계는 그대로 저장
+    HISTORIAN_SCALE: float = Field(default=10)
+    HISTORIAN_UNSCALED_MACHINES: List[str] = Field(default=["OIL_MAIN", "OXY_MAIN"])
+    # 태그별 저장 압축 ("기계.태그" 패턴: 설정, 예 {"*.SV": {"mode": "deadband", "deviation": 0.1}}).
+    # 정확히 같은 이름이 먼저, 그다음 적은 순서대로 처음 맞는 패턴을 쓰며 없으면 압축하지 않음
+    HISTORIAN_COMPRESSION: Dict[str, HistorianCompression] = Field(default={})
+    # 저장은 버퍼에 모아 이 행 수마다, 또는 이 간격(ms)마다 한 트랜잭션으로 묶어서 실행
+    HISTORIAN_FLUSH_ROWS: int = Field(default=1000)
+    HISTORIAN_FLUSH_INTERVAL_MS: int = Field(default=1000)
+    # 저장이 계속 실패할 때 메모리에 보관할 최대 행 수 (넘으면 오래된 행부터 버림)
+    HISTORIAN_MAX_BUFFER_ROWS: int = Field(default=100000)
+    # 히스토리언 DB의 PRAGMA synchronous (WAL 모드에서는 NORMAL 권장)
+    HISTORIAN_SYNCHRONOUS: str = Field(default="NORMAL")
+    # 저장에 실패한 값을 디스크 스풀에 보관했다가 저장소가 돌아오면 이어서 저장
+    HISTORIAN_SPOOL_ENABLED: bool = Field(default=True)
+    HISTORIAN_SPOOL_DIR: Optional[str] = Field(default=None)
+    # 스풀 최대 크기 (MB). 넘으면 가장 오래된 세그먼트부터 버림
+    HISTORIAN_SPOOL_MAX_MB: int = Field(default=1024)
+    # 파티션 단위 ("day" 또는 "month"). 데이터가 쌓인 뒤에는 바꾸지 않음
+    HISTORIAN_PARTITION: str = Field(default="month", pattern="^(day|month)$")
+    # SQLite에 남길 최근 파티션 수 (현재 파티션 포함). 더 오래된 파티션은 Parquet 파일로 옮김
+    HISTORIAN_HOT_PARTITIONS: int = Field(default=2, ge=1)
+    # Parquet 파일 디렉토리 (기본: PROJECT_DIR/historian_archive)
+    HISTORIAN_ARCHIVE_DIR: Optional[str] = Field(default=None)
+
+    # 보관 기간 정리 작업 (히스토리언 DB, 외부 저장기 테이블, 자동 제어 로그). 데이터를 삭제하므로 기본 비활성
+    RETENTION_ENABLED: bool = Field(default=False)
+    # 정리 작업 주기 (초)
+    RETENTION_INTERVAL: int = Field(default=3600)
+    # 보관 기간 (일, 0이면 삭제하지 않음). 원시 값은 파티션 단위로 삭제되며 외부 저장기 테이블도 포함
+    RETENTION_RAW_DAYS: int = Field(default=365, ge=0)
+    RETENTION_ROLLUP_1M_DAYS: int = Field(default=730, ge=0)
+    RETENTION_ROLLUP_1H_DAYS: int = Field(default=0, ge=0)
+    RETENTION_AUTOCONTROL_LOG_DAYS: int = Field(default=365, ge=0)
+
+    _snapshot: "ConfigSnapshot" = PrivateAttr(
+        default_factory=lambda: ConfigSnapshot({}, 0)
+    )
+    # 설정을 교체하는 쪽만 사용하는 잠금 (읽는 쪽은 잠금 없이 스냅샷 참조만 읽음)
+    _write_lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def config(self) -> "ConfigSnapshot":
+        """현재 기계 설정 스냅샷
+
+        한 요청이나 폴링 주기 안에서는 이 참조를 한 번만 읽어 계속 사용해야
+        도중에 설정이 교체되어도 일관된 설정을 보게 됩니다.
+        """
+        return self._snapshot
+
+    @property
+    def config_version(self) -> int:
+        """기계 설정이 교체될 때마다 증가하는 버전"""
+        return self._snapshot.version
+
+    @property
+    def MODBUS_MACHINES(self) -> Mapping[str, MachineConfig]:
+        """현재 스냅샷의 기계 설정 (읽기 전용)"""
+        return self._snapshot.machines
 
     def update_machines_config(self, machines: Dict[str, MachineConfig]):
         """기계 설정을 업데이트"""
-        self.MODBUS_MACHINES = machines
+        with self._write_lock:
+            self._publish(machines)
+
+    def apply_machine(self, machine_name: str, machine_config: Optional[MachineConfig]):
+        """기계 하나의 설정만 교체 (None이면 삭제)"""
+        self.apply_machines({machine_name: machine_config})
+
+    def apply_machines(self, changes: Dict[str, Optional[MachineConfig]]):
+        """여러 기계의 설정을 한 번에 교체 (값이 None이면 삭제)
+
+        기존 스냅샷은 수정하지 않고 새 스냅샷을 만들어 교체하므로, 바뀌지 않은
+        기계의 MachineConfig 인스턴스(와 캐시된 읽기 계획)는 그대로 유지됩니다.
+        """
+        with self._write_lock:
+            machines = dict(self._snapshot.machines)
+            for machine_name, machine_config in changes.items():
+                if machine_config is None:
+                    machines.pop(machine_name, None)
+                else:
+                    machines[machine_name] = machine_config
+            self._publish(machines)
+
+    def apply_tag(
+        self, machine_name: str, tag_name: str, tag_config: Optional[TagConfig]
+    ):
+        """기계의 태그 하나만 교체 (None이면 삭제)"""
+        with self._write_lock:
+            current = self._snapshot.machines.get(machine_name)
+            if current is None:
+                return
+            tags = dict(current.tags)
+            if tag_config is None:
+                tags.pop(tag_name, None)
+            else:
+                tags[tag_name] = tag_config
+            machines = dict(self._snapshot.machines)
+            machines[machine_name] = MachineConfig(
+                ip=current.ip, port=current.port, slave=current.slave, tags=tags
+            )
+            self._publish(machines)
+
+    def _publish(self, machines: Dict[str, MachineConfig]):
+        # 참조 교체 한 번으로 반영되므로 읽는 쪽은 이전 또는 새 스냅샷 중 하나만 보게 됨
+        self._snapshot = ConfigSnapshot(machines, self._snapshot.version + 1)
+
+    @property
+    def historian_db_file(self) -> str:
+        """히스토리언 DB 파일 경로 (외부 저장기와 같은 파일)"""
+        return f"{self.PROJECT_DIR}/{self.SAVER_DB_NAME}.db"
+
+    @property
+    def historian_archive_dir(self) -> str:
+        """히스토리언 Parquet 파일 디렉토리"""
+        return self.HISTORIAN_ARCHIVE_DIR or f"{self.PROJECT_DIR}/historian_archive"
+
+    @property
+    def historian_spool_dir(self) -> str:
+        """히스토리언 스풀 세그먼트 디렉토리"""
+        return self.HISTORIAN_SPOOL_DIR or f"{self.PROJECT_DIR}/historian_spool"
 
     model_config = SettingsConfigDict(env_file=".env")
 
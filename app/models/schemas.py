@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from enum import Enum
 from typing import Any, Optional, Dict, List
 
@@ -68,6 +68,9 @@ class MachineConfig(BaseModel):
     slave: int = 1
     tags: Dict[str, TagConfig] = {}
 
+    # 태그 읽기 계획 캐시 (app.services.modbus.read_plan.get_read_plan 참고)
+    _read_plan: Optional[Any] = PrivateAttr(default=None)
+
 
 # 태그설정 벌크 임포트/익스포트 스키마
 class TagConfigFormat(BaseModel):
@@ -83,6 +86,34 @@ class MachineConfigFormat(BaseModel):
     slave: int = 1
     tags: Dict[str, TagConfigFormat] = {}
 
+# 레지스터 맵 (직접 읽기 API)
+class RegisterRange(BaseModel):
+    start: int = Field(..., ge=0, le=65535, description="시작 레지스터 주소")
+    count: int = Field(..., ge=1, le=65536, description="읽을 레지스터 개수")
+
+
+class RegisterMapConfig(BaseModel):
+    ranges: List[RegisterRange] = Field(..., description="레지스터 범위 목록")
+
+
+# 레지스터 주소 공간 탐색 결과
+class ScanResult(BaseModel):
+    host: str
+    port: int
+    slave: int
+    start: int
+    count: int
+    ranges: List[RegisterRange] = Field(..., description="응답하는 레지스터 구간")
+    register_count: int
+    unknown_ranges: List[RegisterRange] = Field(
+        default=[], description="시간 초과나 통신 오류로 확인하지 못한 구간"
+    )
+    request_count: int
+    elapsed: float = Field(..., description="탐색 소요 시간 (초)")
+    config: Dict[str, MachineConfigFormat] = Field(
+        ..., description="/config/import 형식의 태그 설정 제안"
+    )
+
 # 자동 제어를 위한 태그 설정
 class AutoControlTagConfig(BaseModel):
     tag_name: str
@@ -115,4 +146,31 @@ class GlobalAutoControlConfig(BaseModel):
 class GlobalAutoControlStatus(BaseModel):
     enabled: bool
     machines: List[MachineAutoControlConfig]
-    last_executed: Optional[str] = None
\ No newline at end of file
+    last_executed: Optional[str] = None
+# 히스토리언 저장 압축 방식
+class CompressionMode(str, Enum):
+    NONE = "none"
+    DEADBAND = "deadband"
+    SWINGING_DOOR = "swinging_door"
+
+# 히스토리언 태그별 저장 압축 설정
+class HistorianCompression(BaseModel):
+    mode: CompressionMode = Field(default=CompressionMode.NONE, description="압축 방식")
+    deviation: float = Field(default=0, ge=0, description="허용 오차 (percent면 마지막 저장 값의 %)")
+    percent: bool = Field(default=False, description="deviation을 마지막 저장 값에 대한 %로 해석")
+    max_interval: float = Field(default=3600, gt=0, description="값이 그대로여도 이 간격(초)마다 한 번은 저장")
+
+# 히스토리 조회 집계 방식
+class HistoryAggregation(str, Enum):
+    RAW = "raw"
+    AVG = "avg"
+    MIN = "min"
+    MAX = "max"
+    MINMAX = "minmax"
+    LAST = "last"
+    INTERPOLATED = "interpolated"
+
+# 히스토리 내보내기 파일 형식
+class HistoryExportFormat(str, Enum):
+    ARROW = "arrow"
+    PARQUET = "parquet"
@@ -1,132 +1,380 @@
 import os
+import glob
+import hashlib
 import json
 from datetime import datetime
-from typing import Dict
-from app.models.schemas import MachineConfigFormat, TagConfig, TagType, Permission
-from app.services.exceptions import CustomException, ErrorCode
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from app.core.config import settings
+from app.models.schemas import MachineConfig, MachineConfigFormat, TagConfig
 from app.services.modbus.client import DatabaseClientManager
+from app.services.modbus.dao.config_change_dao import (
+    ChangeRow,
+    ConfigChangeDAO,
+    machine_change,
+    tag_change,
+)
+
+# 설정 스냅샷 저장 경로와 파일 이름에 붙일 내용 해시 길이
+CONFIG_SNAPSHOT_DIR = "logs/config"
+SNAPSHOT_HASH_LENGTH = 16
+
+# 태그 비교용 값: (tag_type, logical_register, real_register, permission)
+TagRow = Tuple[str, str, str, str]
 
 
 class ConfigService:
     def __init__(self, db: DatabaseClientManager):
         self.db = db
+        self.changes = ConfigChangeDAO(db)
 
-    async def import_config(self, config: Dict[str, MachineConfigFormat]):
-        """설정 일괄 등록"""
-        for machine_name, machine_config in config.items():
-            # 1. 기계 등록/업데이트
-            self.db.execute_query(
-                """INSERT INTO machines (name, ip_address, port, slave) 
-                    VALUES (?, ?, ?, ?) 
-                    ON CONFLICT(name) DO UPDATE SET 
-                    ip_address = ?, port = ?, slave = ?""",
-                (
-                    machine_name,
-                    machine_config.ip,
-                    machine_config.port,
-                    machine_config.slave,
-                    machine_config.ip,
-                    machine_config.port,
-                    machine_config.slave,
-                ),
-            )
+    def import_config(
+        self, config: Dict[str, MachineConfigFormat], dry_run: bool = False
+    ) -> Dict[str, Any]:
+        """설정 일괄 등록
 
-            # 2. 기존 태그 삭제
-            machine_id = self._get_machine_id(machine_name)
-            self.db.execute_query(
-                "DELETE FROM tags WHERE machine_id = ?",
-                (machine_id,),
-            )
+        현재 설정과 비교해 바뀐 기계와 태그만 하나의 트랜잭션으로 반영합니다.
+        요청에 포함된 기계에서 요청에 없는 태그는 삭제됩니다.
 
-            # 3. 새로운 태그 등록
-            for tag_name, tag_config in machine_config.tags.items():
-                tag_config_obj = TagConfig(
-                    tag_type=TagType(tag_config.tag_type),
-                    logical_register=tag_config.logical_register,
-                    real_register=tag_config.real_register,
-                    permission=Permission(tag_config.permission),
-                )
-                self._add_tag(machine_name, tag_name, tag_config_obj)
+        Args:
+            config: 기계 이름 -> 기계 설정
+            dry_run: True이면 변경 사항만 계산하고 반영하지 않음
 
-        # 4. 설정 리로드
-        self.db.load_modbus_config()
+        Returns:
+            Dict[str, Any]: 기계별 변경 사항과 요약
+        """
+        with self.db.get_connection(immediate=not dry_run) as conn:
+            existing = self._load_existing(conn, list(config.keys()))
+            diff = self._diff(config, existing)
+            if not dry_run:
+                self._apply(conn, config, existing, diff)
 
-    async def export_config(self) -> Dict:
-        """설정 추출 및 저장"""
-        machines = self.db.execute_query(
-            "SELECT name, ip_address, port, slave FROM machines"
-        )
+        if not dry_run:
+            # 설정 반영 (바뀐 기계만 교체)
+            settings.apply_machines(
+                {
+                    machine_name: _to_machine_config(config[machine_name])
+                    for machine_name in diff["machines"]
+                }
+            )
+        return diff
 
-        config = {}
-        for machine in machines:
-            machine_name = machine["name"]
-            tags = self.db.execute_query(
-                """
-                SELECT tag_name, tag_type, logical_register, real_register, permission 
-                FROM tags 
-                WHERE machine_id = (SELECT id FROM machines WHERE name = ?)
-                """,
-                (machine_name,),
+    def _load_existing(
+        self, conn, machine_names: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """가져올 기계들의 현재 설정을 한 번의 쿼리로 조회"""
+        if not machine_names:
+            return {}
+        placeholders = ", ".join("?" for _ in machine_names)
+        rows = conn.execute(
+            f"""
+            SELECT machines.id, machines.name, machines.ip_address, machines.port,
+                machines.slave, tags.tag_name, tags.tag_type, tags.logical_register,
+                tags.real_register, tags.permission
+            FROM machines
+            LEFT JOIN tags ON tags.machine_id = machines.id
+            WHERE machines.name IN ({placeholders})
+            """,
+            machine_names,
+        ).fetchall()
+
+        existing: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            machine = existing.setdefault(
+                row["name"],
+                {
+                    "id": row["id"],
+                    "connection": (row["ip_address"], row["port"], row["slave"]),
+                    "tags": {},
+                },
             )
+            if row["tag_name"] is not None:
+                machine["tags"][row["tag_name"]] = (
+                    row["tag_type"],
+                    row["logical_register"],
+                    row["real_register"],
+                    row["permission"],
+                )
+        return existing
 
-            tags_dict = {
-                tag["tag_name"]: {
-                    "tag_type": tag["tag_type"],
-                    "logical_register": tag["logical_register"],
-                    "real_register": tag["real_register"],
-                    "permission": tag["permission"],
-                }
-                for tag in tags
-            }
+    def _diff(
+        self,
+        config: Dict[str, MachineConfigFormat],
+        existing: Dict[str, Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """가져올 설정과 현재 설정의 차이 계산"""
+        machines: Dict[str, Any] = {}
+        summary = {
+            "machines_inserted": 0,
+            "machines_updated": 0,
+            "machines_unchanged": 0,
+            "tags_inserted": 0,
+            "tags_updated": 0,
+            "tags_deleted": 0,
+        }
 
-            config[machine_name] = {
-                "ip": machine["ip_address"],
-                "port": machine["port"],
-                "slave": machine["slave"],
-                "tags": tags_dict,
+        for machine_name, machine_config in config.items():
+            current = existing.get(machine_name)
+            current_tags: Dict[str, TagRow] = current["tags"] if current else {}
+            new_tags = {
+                tag_name: _tag_row(tag_config)
+                for tag_name, tag_config in machine_config.tags.items()
             }
 
-        # 설정 파일 저장
-        config_dir = "logs/config"
-        os.makedirs(config_dir, exist_ok=True)
+            if current is None:
+                action = "insert"
+            elif current["connection"] != (
+                machine_config.ip,
+                machine_config.port,
+                machine_config.slave,
+            ):
+                action = "update"
+            else:
+                action = "unchanged"
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"machine_config_{timestamp}.json"
-        file_path = os.path.join(config_dir, filename)
+            tag_changes = {
+                "insert": [t for t in new_tags if t not in current_tags],
+                "update": [
+                    t
+                    for t, row in new_tags.items()
+                    if t in current_tags and current_tags[t] != row
+                ],
+                "delete": [t for t in current_tags if t not in new_tags],
+            }
+            summary["tags_inserted"] += len(tag_changes["insert"])
+            summary["tags_updated"] += len(tag_changes["update"])
+            summary["tags_deleted"] += len(tag_changes["delete"])
 
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(config, f, ensure_ascii=False, indent=2)
+            if action == "unchanged" and not any(tag_changes.values()):
+                summary["machines_unchanged"] += 1
+                continue
+            if action == "insert":
+                summary["machines_inserted"] += 1
+            elif action == "update":
+                summary["machines_updated"] += 1
+            machines[machine_name] = {"action": action, "tags": tag_changes}
 
-        return {"config": config, "saved_path": file_path}
+        return {"machines": machines, "summary": summary}
 
-    def _get_machine_id(self, machine_name: str) -> int:
-        """기계 ID 조회"""
-        machine_result = self.db.execute_query(
-            "SELECT id FROM machines WHERE name = ?", (machine_name,)
+    def _apply(
+        self,
+        conn,
+        config: Dict[str, MachineConfigFormat],
+        existing: Dict[str, Dict[str, Any]],
+        diff: Dict[str, Any],
+    ):
+        """계산된 차이만 데이터베이스에 반영 (호출한 쪽의 트랜잭션 안에서 실행)"""
+        upserts = [
+            (name, config[name].ip, config[name].port, config[name].slave)
+            for name, change in diff["machines"].items()
+            if change["action"] != "unchanged"
+        ]
+        conn.executemany(
+            """INSERT INTO machines (name, ip_address, port, slave)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                ip_address = excluded.ip_address,
+                port = excluded.port,
+                slave = excluded.slave""",
+            upserts,
         )
-        if not machine_result:
-            raise CustomException(
-                error_code=ErrorCode.MACHINE_NOT_FOUND,
-                status_code=404,
-                message=f"기계 '{machine_name}'를 찾을 수 없습니다.",
+
+        machine_ids = {name: machine["id"] for name, machine in existing.items()}
+        inserted = [
+            name
+            for name, change in diff["machines"].items()
+            if change["action"] == "insert"
+        ]
+        if inserted:
+            placeholders = ", ".join("?" for _ in inserted)
+            for row in conn.execute(
+                f"SELECT id, name FROM machines WHERE name IN ({placeholders})",
+                inserted,
+            ):
+                machine_ids[row["name"]] = row["id"]
+
+        deletes, updates, inserts = [], [], []
+        for machine_name, change in diff["machines"].items():
+            machine_id = machine_ids[machine_name]
+            tags = config[machine_name].tags
+            deletes.extend((machine_id, t) for t in change["tags"]["delete"])
+            updates.extend(
+                (*_tag_row(tags[t]), machine_id, t) for t in change["tags"]["update"]
+            )
+            inserts.extend(
+                (machine_id, t, *_tag_row(tags[t])) for t in change["tags"]["insert"]
             )
-        return machine_result[0]["id"]
 
-    def _add_tag(self, machine_name: str, tag_name: str, tag_config: TagConfig):
-        """태그 추가"""
-        machine_id = self._get_machine_id(machine_name)
-        self.db.execute_query(
+        conn.executemany(
+            "DELETE FROM tags WHERE machine_id = ? AND tag_name = ?", deletes
+        )
+        conn.executemany(
+            """
+            UPDATE tags
+            SET tag_type = ?, logical_register = ?, real_register = ?, permission = ?
+            WHERE machine_id = ? AND tag_name = ?
+            """,
+            updates,
+        )
+        conn.executemany(
             """
-            INSERT INTO tags 
+            INSERT INTO tags
             (machine_id, tag_name, tag_type, logical_register, real_register, permission)
             VALUES (?, ?, ?, ?, ?, ?)
             """,
-            (
-                machine_id,
-                tag_name,
-                tag_config.tag_type,
-                tag_config.logical_register,
-                tag_config.real_register,
-                tag_config.permission,
-            ),
+            inserts,
         )
+        self.changes.record(_change_rows(config, diff))
+
+    def get_changes(self, since: int, limit: int) -> Dict[str, Any]:
+        """since 버전 이후의 설정 변경 이력 조회"""
+        return self.changes.list_since(since, limit)
+
+    def load_export_rows(self) -> List[Any]:
+        """모든 기계와 태그를 한 번의 JOIN 조회로 기계 이름 순으로 읽음
+
+        한 읽기 트랜잭션에서 모두 읽으므로 도중에 설정이 바뀌어도 한 시점의 설정이
+        나옵니다. 비동기 라우트는 db.run으로 DB 스레드에서 호출합니다.
+        """
+        with self.db.get_connection() as conn:
+            return conn.execute(
+                """
+                SELECT machines.name, machines.ip_address, machines.port, machines.slave,
+                    tags.tag_name, tags.tag_type, tags.logical_register,
+                    tags.real_register, tags.permission
+                FROM machines
+                LEFT JOIN tags ON tags.machine_id = machines.id
+                ORDER BY machines.name, tags.id
+                """
+            ).fetchall()
+
+    def iter_export_machines(
+        self, rows: Optional[List[Any]] = None
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """(기계 이름, 기계 설정) 쌍을 기계 단위로 차례로 생성 (rows가 없으면 직접 조회)"""
+        if rows is None:
+            rows = self.load_export_rows()
+        current_name: Optional[str] = None
+        current: Dict[str, Any] = {}
+        for row in rows:
+            if row["name"] != current_name:
+                if current_name is not None:
+                    yield current_name, current
+                current_name = row["name"]
+                current = {
+                    "ip": row["ip_address"],
+                    "port": row["port"],
+                    "slave": row["slave"],
+                    "tags": {},
+                }
+            if row["tag_name"] is not None:
+                current["tags"][row["tag_name"]] = {
+                    "tag_type": row["tag_type"],
+                    "logical_register": row["logical_register"],
+                    "real_register": row["real_register"],
+                    "permission": row["permission"],
+                }
+        if current_name is not None:
+            yield current_name, current
+
+    def iter_export_json(self, message: str, rows: List[Any]) -> Iterator[bytes]:
+        """load_export_rows로 읽은 행을 ApiResponse 형식의 추출 결과 JSON으로 기계 단위로 나누어 인코딩
+
+        DB는 응답을 시작하기 전에 모두 읽으므로, 조회가 실패하면 잘린 JSON 대신 오류 응답이 나갑니다.
+        """
+        yield (
+            '{"success": true, "message": %s, "data": {"config": {'
+            % json.dumps(message, ensure_ascii=False)
+        ).encode("utf-8")
+        separator = ""
+        for machine_name, machine_config in self.iter_export_machines(rows):
+            chunk = "%s%s: %s" % (
+                separator,
+                json.dumps(machine_name, ensure_ascii=False),
+                json.dumps(machine_config, ensure_ascii=False),
+            )
+            yield chunk.encode("utf-8")
+            separator = ", "
+        yield b'}, "saved_path": null}, "error": null}'
+
+    def export_config(self) -> Dict:
+        """설정 추출 및 스냅샷 파일 저장
+
+        내용이 같은 스냅샷이 이미 있으면 새로 저장하지 않고 기존 파일 경로를 반환합니다.
+        """
+        config = dict(self.iter_export_machines())
+        content = json.dumps(config, ensure_ascii=False, indent=2)
+        content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+        os.makedirs(CONFIG_SNAPSHOT_DIR, exist_ok=True)
+        existing = sorted(
+            glob.glob(
+                os.path.join(
+                    CONFIG_SNAPSHOT_DIR,
+                    f"machine_config_*_{content_hash[:SNAPSHOT_HASH_LENGTH]}.json",
+                )
+            )
+        )
+        if existing:
+            return {
+                "config": config,
+                "saved_path": existing[-1],
+                "content_hash": content_hash,
+                "deduplicated": True,
+            }
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = (
+            f"machine_config_{timestamp}_{content_hash[:SNAPSHOT_HASH_LENGTH]}.json"
+        )
+        file_path = os.path.join(CONFIG_SNAPSHOT_DIR, filename)
+
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+        return {
+            "config": config,
+            "saved_path": file_path,
+            "content_hash": content_hash,
+            "deduplicated": False,
+        }
+
+
+def _tag_row(tag_config) -> TagRow:
+    return (
+        tag_config.tag_type.value,
+        tag_config.logical_register,
+        tag_config.real_register,
+        tag_config.permission.value,
+    )
+
+
+def _change_rows(
+    config: Dict[str, MachineConfigFormat], diff: Dict[str, Any]
+) -> Iterator[ChangeRow]:
+    """일괄 등록으로 바뀐 기계와 태그의 변경 이력 행"""
+    for machine_name, change in diff["machines"].items():
+        machine_config = config[machine_name]
+        if change["action"] != "unchanged":
+            yield machine_change(machine_name, change["action"], machine_config)
+        for action in ("delete", "update", "insert"):
+            for tag_name in change["tags"][action]:
+                yield tag_change(
+                    machine_name,
+                    tag_name,
+                    action,
+                    TagConfig(**machine_config.tags[tag_name].model_dump())
+                    if action != "delete"
+                    else None,
+                )
+
+
+def _to_machine_config(machine_config: MachineConfigFormat) -> MachineConfig:
+    return MachineConfig(
+        ip=machine_config.ip,
+        port=machine_config.port,
+        slave=machine_config.slave,
+        tags={
+            tag_name: TagConfig(**tag_config.model_dump())
+            for tag_name, tag_config in machine_config.tags.items()
+        },
+    )
@@ -40,6 +40,9 @@ class ErrorCode(Enum):
     MACHINE_ALREADY_EXISTS = "MACHINE_ALREADY_EXISTS"
     MACHINE_ADD_ERROR = "MACHINE_ADD_ERROR"
 
+    # 레지스터 맵 관련 에러
+    REGISTER_MAP_NOT_FOUND = "REGISTER_MAP_NOT_FOUND"
+
     # 시스템 에러
     INVALID_INPUT = "INVALID_INPUT"
     DATABASE_ERROR = "DATABASE_ERROR"
@@ -0,0 +1,127 @@
+import os
+import sqlite3
+from typing import Iterator, List, Tuple
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# Parquet 파일 스키마 (SQLite 파티션 테이블과 같은 컬럼)
+ARCHIVE_SCHEMA = pa.schema(
+    [
+        ("tag_id", pa.int32()),
+        ("ts", pa.int64()),
+        ("value", pa.float64()),
+        ("quality", pa.int8()),
+    ]
+)
+
+# 파티션을 Parquet로 옮기거나 값을 내보낼 때 한 번에 읽는 행 수 (배치 하나, row group 하나)
+EXPORT_BATCH_ROWS = 100_000
+
+
+def rows_to_batch(rows: List[Tuple[int, int, float, int]]) -> pa.RecordBatch:
+    """(tag_id, ts, value, quality) 행 목록을 ARCHIVE_SCHEMA 배치로 변환"""
+    columns = list(zip(*rows))
+    return pa.RecordBatch.from_arrays(
+        [pa.array(column, type=field.type) for column, field in zip(columns, ARCHIVE_SCHEMA)],
+        schema=ARCHIVE_SCHEMA,
+    )
+
+
+def export_partition(conn: sqlite3.Connection, table: str, path: str) -> int:
+    """파티션 테이블을 (tag_id, ts) 순서로 압축 Parquet 파일에 기록하고 행 수를 반환
+
+    tag_id 순으로 정렬되어 있으므로 row group 통계만으로 태그별 조회 범위를 좁힐 수
+    있습니다. 임시 파일에 다 쓴 뒤 이름을 바꾸므로 중간에 실패해도 반쪽 파일이 남지 않습니다.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    count = 0
+    cursor = conn.execute(
+        f"SELECT tag_id, ts, value, quality FROM {table} ORDER BY tag_id, ts"
+    )
+    with pq.ParquetWriter(temp_path, ARCHIVE_SCHEMA, compression="zstd") as writer:
+        while True:
+            rows = cursor.fetchmany(EXPORT_BATCH_ROWS)
+            if not rows:
+                break
+            writer.write_batch(rows_to_batch(rows))
+            count += len(rows)
+    os.replace(temp_path, path)
+    return count
+
+
+def read_partition(
+    path: str, tag_id: int, start_ts: int, end_ts: int
+) -> Iterator[Tuple[int, float, int]]:
+    """Parquet 파티션에서 태그 하나의 [start_ts, end_ts) 값을 시간순으로 반환
+
+    Yields:
+        (ts, value, quality)
+    """
+    table = pq.read_table(
+        path,
+        columns=["ts", "value", "quality"],
+        filters=[("tag_id", "=", tag_id), ("ts", ">=", start_ts), ("ts", "<", end_ts)],
+    )
+    yield from zip(
+        table.column("ts").to_pylist(),
+        table.column("value").to_pylist(),
+        table.column("quality").to_pylist(),
+    )
+
+
+def iter_partition_batches(
+    path: str, tag_ids: List[int], start_ts: int, end_ts: int, batch_rows: int
+) -> Iterator[pa.RecordBatch]:
+    """Parquet 파티션에서 태그들의 [start_ts, end_ts) 값을 (tag_id, ts) 순 배치로 차례로 읽음
+
+    파일 전체를 읽지 않고 row group 단위로 읽어 batch_rows행 이하의 배치로 내보냅니다.
+    """
+    dataset = ds.dataset(path, format="parquet", schema=ARCHIVE_SCHEMA)
+    batches = dataset.to_batches(
+        filter=(
+            ds.field("tag_id").isin(tag_ids)
+            & (ds.field("ts") >= start_ts)
+            & (ds.field("ts") < end_ts)
+        ),
+        batch_size=batch_rows,
+    )
+    for batch in batches:
+        if batch.num_rows:
+            yield batch
+
+
+def aggregate_partition(
+    path: str, tag_id: int, start_ts: int, end_ts: int, width: int
+) -> List[Tuple[int, float, float, float, int, int, float]]:
+    """Parquet 파티션에서 태그 하나의 [start_ts, end_ts) 값을 width(ms) 구간별로 Arrow에서 집계
+
+    Returns:
+        구간 순 (bucket, min, max, sum, count, last_ts, last). 값이 하나도 없는 구간은 없음
+    """
+    table = pq.read_table(
+        path,
+        columns=["ts", "value"],
+        filters=[("tag_id", "=", tag_id), ("ts", ">=", start_ts), ("ts", "<", end_ts)],
+    )
+    table = table.filter(pc.is_valid(table["value"]))
+    # 정수 나눗셈이므로 구간 시작 시각이 됨
+    table = table.append_column("bucket", pc.multiply(pc.divide(table["ts"], width), width))
+    # 파일은 (tag_id, ts) 순으로 정렬되어 있으므로 단일 스레드 집계에서 last가 시간상 마지막 값
+    grouped = table.group_by("bucket", use_threads=False).aggregate(
+        [
+            ("value", "min"),
+            ("value", "max"),
+            ("value", "sum"),
+            ("value", "count"),
+            ("ts", "max"),
+            ("value", "last"),
+        ]
+    ).sort_by("bucket")
+    columns = [
+        grouped[name].to_pylist()
+        for name in ("bucket", "value_min", "value_max", "value_sum", "value_count", "ts_max", "value_last")
+    ]
+    return list(zip(*columns))
@@ -0,0 +1,358 @@
+import fnmatch
+import math
+from typing import Dict, List, Mapping, Optional, Tuple, Union
+import numpy as np
+from app.models.schemas import CompressionMode, HistorianCompression
+
+# (기계 이름, 태그 이름)
+TagKey = Tuple[str, str]
+# (ts(epoch ms), 값)
+Point = Tuple[int, Optional[float]]
+
+# 압축하지 않는 태그의 설정
+NO_COMPRESSION = HistorianCompression()
+
+
+def resolve_compression(
+    key: TagKey, rules: Mapping[str, HistorianCompression]
+) -> HistorianCompression:
+    """태그의 압축 설정 ("기계.태그"와 정확히 같은 규칙, 그다음 처음 맞는 패턴)"""
+    name = f"{key[0]}.{key[1]}"
+    if name in rules:
+        return rules[name]
+    for pattern, spec in rules.items():
+        if fnmatch.fnmatchcase(name, pattern.upper()):
+            return spec
+    return NO_COMPRESSION
+
+
+class DeadbandFilter:
+    """마지막 저장 값에서 deviation보다 많이 바뀐 값만 저장
+
+    저장하지 않은 값은 마지막 저장 값과 deviation 이내이므로, 조회할 때 마지막 저장
+    값을 다음 저장 시각까지 유지(step)하면 원래 값을 오차 안에서 복원합니다.
+    """
+
+    def __init__(self, spec: HistorianCompression):
+        self.spec = spec
+        self.max_interval_ms = int(spec.max_interval * 1000)
+        self._stored: Optional[Point] = None
+
+    def offer(self, ts: int, value: Optional[float]) -> List[Point]:
+        stored = self._stored
+        if (
+            stored is None
+            or value is None
+            or stored[1] is None
+            or ts - stored[0] >= self.max_interval_ms
+            or abs(value - stored[1]) > _deviation(self.spec, stored[1])
+        ):
+            self._stored = (ts, value)
+            return [(ts, value)]
+        return []
+
+    def flush(self) -> List[Point]:
+        return []
+
+
+class SwingingDoorFilter:
+    """스윙도어(swinging door) 압축
+
+    마지막 저장 점에서 가장 최근 값으로 그은 직선이 그 사이 값들의 ±deviation 범위를
+    모두 지나는 동안(문이 열린 동안)에는 값을 저장하지 않고 가장 최근 값만 들고
+    있다가, 새 값으로 문이 닫히면 들고 있던 값을 저장하고 그 점에서 다시 시작합니다. 조회할 때 저장 점 사이를
+    직선으로 이으면 원래 값을 deviation 안에서 복원합니다. 마지막 저장 점에서
+    max_interval이 지나면 문과 관계없이 저장합니다.
+    """
+
+    def __init__(self, spec: HistorianCompression):
+        self.spec = spec
+        self.max_interval_ms = int(spec.max_interval * 1000)
+        self._stored: Optional[Point] = None
+        self._held: Optional[Point] = None
+        self._upper = math.inf
+        self._lower = -math.inf
+
+    def offer(self, ts: int, value: Optional[float]) -> List[Point]:
+        stored = self._stored
+        if stored is None or value is None or stored[1] is None:
+            # 값 없음은 추세를 끊으므로 들고 있던 값과 함께 그대로 저장
+            points = self.flush()
+            points.append((ts, value))
+            self._store((ts, value))
+            return points
+        if ts <= stored[0]:
+            return []
+
+        upper, lower = self._slopes(stored, ts, value)
+        upper, lower = min(self._upper, upper), max(self._lower, lower)
+        # 마지막 저장 점에서 지금 값으로 그은 직선이 지금까지 모든 값의 범위 안에 있어야
+        # 이 값을 저장할 때 그 사이의 값이 직선에서 deviation 안에 있음
+        slope = (value - stored[1]) / (ts - stored[0])
+        if lower <= slope <= upper and ts - stored[0] < self.max_interval_ms:
+            self._upper, self._lower = upper, lower
+            self._held = (ts, value)
+            return []
+
+        # 문이 닫혔거나 저장 간격이 max_interval을 넘음
+        if self._held is None:
+            self._store((ts, value))
+            return [(ts, value)]
+        points = [self._held]
+        self._store(self._held)
+        stored = self._stored
+        if ts - stored[0] >= self.max_interval_ms:
+            points.append((ts, value))
+            self._store((ts, value))
+        else:
+            self._upper, self._lower = self._slopes(stored, ts, value)
+            self._held = (ts, value)
+        return points
+
+    def flush(self) -> List[Point]:
+        """들고 있는 값을 저장 (종료할 때)"""
+        if self._held is None:
+            return []
+        held = self._held
+        self._store(held)
+        return [held]
+
+    def _store(self, point: Point):
+        self._stored = point
+        self._held = None
+        self._upper = math.inf
+        self._lower = -math.inf
+
+    def _slopes(self, stored: Point, ts: int, value: float) -> Tuple[float, float]:
+        deviation = _deviation(self.spec, stored[1])
+        elapsed = ts - stored[0]
+        return (
+            (value + deviation - stored[1]) / elapsed,
+            (value - deviation - stored[1]) / elapsed,
+        )
+
+
+def _deviation(spec: HistorianCompression, reference: float) -> float:
+    if spec.percent:
+        return abs(reference) * spec.deviation / 100
+    return spec.deviation
+
+
+class Compressor:
+    """태그별 압축 필터를 들고 수집한 값 중 저장할 값만 골라냄 (수집 루프 한 곳에서만 사용)"""
+
+    def __init__(self, rules: Mapping[str, HistorianCompression]):
+        self.rules = rules
+        self._filters: Dict[TagKey, Optional[Union[DeadbandFilter, SwingingDoorFilter]]] = {}
+        self.received = 0
+        self.stored = 0
+
+    def spec(self, key: TagKey) -> HistorianCompression:
+        return resolve_compression(key, self.rules)
+
+    def process(
+        self, ts: int, values: Mapping[TagKey, Optional[float]]
+    ) -> List[Tuple[TagKey, int, Optional[float]]]:
+        """한 시점의 값을 넣고 저장할 (태그, ts, 값) 목록을 반환 (들고 있던 이전 시점 값 포함)"""
+        rows = []
+        for key, value in values.items():
+            if key not in self._filters:
+                self._filters[key] = _make_filter(self.spec(key))
+            value_filter = self._filters[key]
+            if value_filter is None:
+                rows.append((key, ts, value))
+            else:
+                rows.extend(
+                    (key, point_ts, point_value)
+                    for point_ts, point_value in value_filter.offer(ts, value)
+                )
+        self.received += len(values)
+        self.stored += len(rows)
+        return rows
+
+    def flush(self) -> List[Tuple[TagKey, int, Optional[float]]]:
+        """필터가 들고 있는 값을 모두 내보냄"""
+        rows = [
+            (key, ts, value)
+            for key, value_filter in self._filters.items()
+            if value_filter is not None
+            for ts, value in value_filter.flush()
+        ]
+        self.stored += len(rows)
+        return rows
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "received": self.received,
+            "stored": self.stored,
+            "ratio": round(self.received / self.stored, 2) if self.stored else 0.0,
+        }
+
+
+def _make_filter(
+    spec: HistorianCompression,
+) -> Optional[Union[DeadbandFilter, SwingingDoorFilter]]:
+    if spec.mode == CompressionMode.DEADBAND:
+        return DeadbandFilter(spec)
+    if spec.mode == CompressionMode.SWINGING_DOOR:
+        return SwingingDoorFilter(spec)
+    return None
+
+
+def reconstruct(
+    ts: np.ndarray,
+    values: np.ndarray,
+    mode: str,
+    start_ts: int,
+    end_ts: int,
+    step_ms: int,
+    max_gap_ms: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """저장된 점으로 [start_ts, end_ts)의 step_ms 간격 값을 복원
+
+    swinging_door 태그는 저장 점 사이를 직선으로 잇고, 나머지는 마지막 저장 값을
+    유지합니다. 마지막 저장 점에서 max_gap_ms가 지나도록 다음 점이 없으면 값이
+    없는 것(NaN)으로 봅니다. 시각마다 직전 저장 점을 이진 탐색으로 찾아(as-of 조인)
+    배열 연산으로 계산합니다.
+
+    Args:
+        ts: 시간순 저장 점의 시각 (int64). start_ts 이전의 마지막 점과 end_ts 이후의
+            첫 점을 포함해야 구간 양 끝도 복원됩니다.
+        values: 저장 점의 값 (float64, 값 없음은 NaN)
+
+    Returns:
+        (시각, 값) 배열. 값이 없는 시각은 NaN
+    """
+    grid = np.arange(start_ts, end_ts, step_ms, dtype=np.int64)
+    result = np.full(len(grid), np.nan)
+    if len(ts) == 0:
+        return grid, result
+    index = np.searchsorted(ts, grid, side="right") - 1
+    has_point = index >= 0
+    current = np.maximum(index, 0)
+    point_ts, point_value = ts[current], values[current]
+    held = has_point & (grid - point_ts <= max_gap_ms)
+    result[held] = point_value[held]
+    if mode == CompressionMode.SWINGING_DOOR.value:
+        following = np.minimum(index + 1, len(ts) - 1)
+        following_ts, following_value = ts[following], values[following]
+        linear = (
+            has_point
+            & (index + 1 < len(ts))
+            & ~np.isnan(point_value)
+            & ~np.isnan(following_value)
+            & (following_ts - point_ts <= max_gap_ms)
+        )
+        ratio = (grid[linear] - point_ts[linear]) / (following_ts[linear] - point_ts[linear])
+        result[linear] = point_value[linear] + (following_value[linear] - point_value[linear]) * ratio
+    return grid, result
+
+
+def aggregate_reconstructed(
+    ts: np.ndarray,
+    values: np.ndarray,
+    mode: str,
+    start_ts: int,
+    end_ts: int,
+    width: int,
+    max_gap_ms: int,
+) -> List[np.ndarray]:
+    """저장된 점으로 복원한 값을 [start_ts, end_ts)에서 width(ms) 구간별로 집계
+
+    reconstruct와 같은 방식으로 복원한 선(swinging_door는 직선, 나머지는 계단)을 구간
+    경계에서 잘라 계산하므로, 저장 점이 없는 구간도 값이 이어지는 동안에는 결과가 나오고
+    평균은 시간 가중 평균입니다. 선분의 누적 적분을 구간 경계에서 이진 탐색으로 읽어
+    빼므로 구간 수와 점 수에 비례하는 배열 연산만 합니다. 값이 있는 시간이 없는 구간은
+    반환하지 않습니다.
+
+    Args:
+        ts: 시간순 저장 점의 시각 (int64). start_ts 이전의 마지막 점과 end_ts 이후의
+            첫 점을 포함해야 구간 양 끝도 복원됩니다.
+        values: 저장 점의 값 (float64, 값 없음은 NaN)
+
+    Returns:
+        구간 순 [bucket, min, max, 시간 가중 평균, 구간 안의 저장 점 수, 구간 첫 값, 구간 마지막 값] 열 배열
+    """
+    count = -(-(end_ts - start_ts) // width)
+    bounds = np.minimum(start_ts + np.arange(count + 1, dtype=np.int64) * width, end_ts)
+    empty = [np.empty(0, dtype=np.int64)] + [np.empty(0)] * 3 + [np.empty(0, dtype=np.int64)] + [np.empty(0)] * 2
+    if len(ts) == 0 or count <= 0:
+        return empty
+
+    # 저장 점마다 다음 저장 점(또는 max_gap_ms)까지 이어지는 선분 (값 없음 점은 선분 없음)
+    next_ts = np.append(ts[1:], np.iinfo(np.int64).max)
+    next_value = np.append(values[1:], np.nan)
+    linear = (
+        (mode == CompressionMode.SWINGING_DOOR.value)
+        & ~np.isnan(next_value)
+        & (next_ts - ts <= max_gap_ms)
+    )
+    segment_end = np.where(linear, next_ts, np.minimum(ts + max_gap_ms + 1, next_ts))
+    end_value = np.where(linear, next_value, values)
+    valid = ~np.isnan(values)
+    starts, ends = ts[valid], segment_end[valid]
+    start_values, end_values = values[valid], end_value[valid]
+    if len(starts) == 0:
+        return empty
+    slopes = (end_values - start_values) / (ends - starts)
+    lengths = (ends - starts).astype(np.float64)
+    # 선분 j 앞까지의 값×시간 누적 합과 값이 있는 시간 누적 합
+    total_area = np.concatenate(([0.0], np.cumsum((start_values + end_values) / 2 * lengths)))
+    total_time = np.concatenate(([0.0], np.cumsum(lengths)))
+
+    def value_at(segment: np.ndarray, at: np.ndarray) -> np.ndarray:
+        return start_values[segment] + slopes[segment] * (at - starts[segment])
+
+    # 경계까지의 누적 적분: 경계 직전 선분 앞까지의 합 + 그 선분의 경계까지 부분
+    segment = np.searchsorted(starts, bounds, side="right") - 1
+    current = np.maximum(segment, 0)
+    clipped = np.minimum(bounds, ends[current])
+    partial = np.where(segment >= 0, clipped - starts[current], 0).astype(np.float64)
+    area = np.where(
+        segment >= 0,
+        total_area[current] + (start_values[current] + value_at(current, clipped)) / 2 * partial,
+        0.0,
+    )
+    covered = np.where(segment >= 0, total_time[current] + partial, 0.0)
+    bucket_area, bucket_time = np.diff(area), np.diff(covered)
+
+    # 선분 위의 최솟값과 최댓값은 선분 끝이나 구간 경계에 있음
+    minimum, maximum = np.full(count, np.inf), np.full(count, -np.inf)
+
+    def offer(buckets: np.ndarray, candidates: np.ndarray):
+        np.minimum.at(minimum, buckets, candidates)
+        np.maximum.at(maximum, buckets, candidates)
+
+    inside = (starts >= start_ts) & (starts < end_ts)
+    offer((starts[inside] - start_ts) // width, start_values[inside])
+    inside = (ends > start_ts) & (ends <= end_ts)
+    offer((ends[inside] - 1 - start_ts) // width, end_values[inside])
+    # 경계 값: 오른쪽 구간의 시작 값(s <= 경계 < e)과 왼쪽 구간의 끝 값(s < 경계 <= e)
+    right = (segment >= 0) & (bounds < ends[current])
+    right[-1] = False
+    offer(np.nonzero(right)[0], value_at(current[right], bounds[right]))
+    left_segment = np.searchsorted(starts, bounds, side="left") - 1
+    left_current = np.maximum(left_segment, 0)
+    left = (left_segment >= 0) & (bounds <= ends[left_current])
+    left[0] = False
+    offer(np.nonzero(left)[0] - 1, value_at(left_current[left], bounds[left]))
+
+    # 구간의 첫 값은 경계 뒤 처음 이어지는 선분에서, 마지막 값은 다음 경계 앞 마지막 선분에서 읽음
+    first_segment = np.minimum(np.searchsorted(ends, bounds[:-1], side="right"), len(starts) - 1)
+    first = value_at(first_segment, np.maximum(bounds[:-1], starts[first_segment]))
+    last_segment = np.maximum(np.searchsorted(starts, bounds[1:], side="left") - 1, 0)
+    last = value_at(last_segment, np.minimum(bounds[1:], ends[last_segment]))
+
+    in_range = (ts >= start_ts) & (ts < end_ts)
+    points = np.bincount((ts[in_range] - start_ts) // width, minlength=count)
+
+    keep = bucket_time > 0
+    return [
+        bounds[:-1][keep],
+        minimum[keep],
+        maximum[keep],
+        bucket_area[keep] / bucket_time[keep],
+        points[keep],
+        first[keep],
+        last[keep],
+    ]
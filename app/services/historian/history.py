@@ -0,0 +1,311 @@
+import json
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from app.core.config import settings
+from app.models.schemas import HistoryAggregation, HistoryExportFormat
+from app.services.exceptions import CustomException, ErrorCode
+from app.services.historian.store import HistorianStore, TagKey
+
+# 집계 방식별 응답 행의 열
+COLUMNS = {
+    HistoryAggregation.RAW: ["tag", "ts", "value", "quality"],
+    HistoryAggregation.MINMAX: ["tag", "ts", "min", "max"],
+}
+DEFAULT_COLUMNS = ["tag", "ts", "value"]
+
+# 내보내기 파일 스키마 (태그는 "기계.태그" 사전 인코딩, ts는 UTC 시각)
+EXPORT_SCHEMA = pa.schema(
+    [
+        ("tag", pa.dictionary(pa.int32(), pa.string())),
+        ("ts", pa.timestamp("ms", tz="UTC")),
+        ("value", pa.float64()),
+        ("quality", pa.int8()),
+    ]
+)
+# 내보내기 형식별 (Content-Type, 파일 확장자)
+EXPORT_MEDIA_TYPES = {
+    HistoryExportFormat.ARROW: ("application/vnd.apache.arrow.stream", "arrows"),
+    HistoryExportFormat.PARQUET: ("application/vnd.apache.parquet", "parquet"),
+}
+
+# (tag_id, ts(epoch ms)): 페이지 커서
+Cursor = Tuple[int, int]
+
+
+class HistoryService:
+    """히스토리언 값 조회와 내보내기 (GET /history, GET /history/export)
+
+    행은 (tag_id, ts) 순으로 나오며, limit개를 넘으면 마지막 행의 (tag_id, ts)를 커서로
+    돌려줍니다. 다음 페이지는 커서 다음 행부터 바로 읽으므로(keyset) 페이지가 뒤로 가도
+    앞의 행을 다시 읽지 않습니다.
+
+    raw가 아닌 집계는 HistorianStore.aggregate가 롤업이나 파티션에서 SQL(SQLite)/Arrow
+    (Parquet)로 계산하므로 원시 값을 파이썬으로 옮기지 않습니다. 압축해 저장한 태그와
+    interpolated는 저장 점을 Arrow로 읽어 배열 연산으로 복원·집계하며, 긴 구간은 창
+    단위로 나누어 계산하므로 첫 행이 바로 나갑니다. 구간은 epoch 기준 bucket의 배수
+    시각에서 시작합니다.
+    """
+
+    # 응답 JSON을 나누어 보내는 행 수
+    ROWS_PER_CHUNK = 1000
+
+    def __init__(self, store: HistorianStore):
+        self.store = store
+
+    def resolve_tags(self, names: List[str]) -> Dict[TagKey, int]:
+        """"기계.태그" 목록을 {태그: tag_id}로 변환 (히스토리언에 없는 태그가 있으면 예외)"""
+        keys = []
+        for name in names:
+            machine_name, _, tag_name = name.strip().upper().rpartition(".")
+            if not machine_name or not tag_name:
+                raise CustomException(
+                    ErrorCode.INVALID_INPUT,
+                    f"태그는 '기계.태그' 형식이어야 합니다: {name}",
+                    400,
+                )
+            keys.append((machine_name, tag_name))
+        tag_ids = self.store.lookup_tags(keys)
+        missing = [f"{key[0]}.{key[1]}" for key in keys if key not in tag_ids]
+        if missing:
+            raise CustomException(
+                ErrorCode.TAG_NOT_FOUND,
+                f"히스토리언에 저장된 값이 없는 태그입니다: {', '.join(missing)}",
+                404,
+                {"tags": missing},
+            )
+        return tag_ids
+
+    def resolve_all_tags(self) -> Dict[TagKey, int]:
+        """히스토리언에 등록된 모든 태그의 {태그: tag_id}"""
+        return self.store.lookup_tags()
+
+    @staticmethod
+    def parse_cursor(cursor: Optional[str]) -> Optional[Cursor]:
+        if cursor is None:
+            return None
+        try:
+            tag_id, ts = cursor.split(":")
+            return int(tag_id), int(ts)
+        except ValueError:
+            raise CustomException(
+                ErrorCode.INVALID_INPUT, f"잘못된 커서입니다: {cursor}", 400
+            )
+
+    def iter_rows(
+        self,
+        tag_ids: Dict[TagKey, int],
+        start_ts: int,
+        end_ts: int,
+        aggregation: HistoryAggregation,
+        width: int,
+        cursor: Optional[Cursor] = None,
+    ) -> Iterator[Tuple[Cursor, List[Any]]]:
+        """((tag_id, ts), 응답 행)을 (tag_id, ts) 순으로 생성 (cursor가 있으면 그 다음 행부터)"""
+        if aggregation != HistoryAggregation.RAW:
+            # 구간 경계에 맞춰 첫 구간과 마지막 구간도 온전히 집계
+            start_ts -= start_ts % width
+            end_ts += -end_ts % width
+        for key, tag_id in sorted(tag_ids.items(), key=lambda item: item[1]):
+            tag_start = start_ts
+            if cursor is not None:
+                if tag_id < cursor[0]:
+                    continue
+                if tag_id == cursor[0]:
+                    step = 1 if aggregation == HistoryAggregation.RAW else width
+                    tag_start = max(start_ts, cursor[1] + step)
+            if tag_start >= end_ts:
+                continue
+            name = f"{key[0]}.{key[1]}"
+            for ts, *values in self._iter_tag(key, tag_start, end_ts, aggregation, width):
+                yield (tag_id, ts), [name, ts, *values]
+
+    def _iter_tag(
+        self,
+        key: TagKey,
+        start_ts: int,
+        end_ts: int,
+        aggregation: HistoryAggregation,
+        width: int,
+    ) -> Iterator[Tuple]:
+        if aggregation == HistoryAggregation.RAW:
+            for _, ts, value, quality in self.store.read([key], start_ts, end_ts):
+                yield ts, value, quality
+            return
+        if aggregation == HistoryAggregation.INTERPOLATED:
+            for _, ts, value in self.store.read_sampled([key], start_ts, end_ts, width):
+                yield ts, value
+            return
+        for bucket, min_value, max_value, avg, last in self.store.aggregate(
+            key, start_ts, end_ts, width
+        ):
+            if aggregation == HistoryAggregation.AVG:
+                yield bucket, avg
+            elif aggregation == HistoryAggregation.MIN:
+                yield bucket, min_value
+            elif aggregation == HistoryAggregation.MAX:
+                yield bucket, max_value
+            elif aggregation == HistoryAggregation.MINMAX:
+                yield bucket, min_value, max_value
+            else:
+                yield bucket, last
+
+    def iter_history_json(
+        self,
+        message: str,
+        tag_ids: Dict[TagKey, int],
+        start_ts: int,
+        end_ts: int,
+        aggregation: HistoryAggregation,
+        width: int,
+        limit: int,
+        cursor: Optional[Cursor] = None,
+    ) -> Iterator[bytes]:
+        """ApiResponse 형식의 조회 결과 JSON을 ROWS_PER_CHUNK행 단위로 나누어 인코딩
+
+        limit개를 읽은 뒤에도 행이 남아 있으면 마지막 행의 커서를 next_cursor로 넣습니다.
+        """
+        data = {
+            "aggregation": aggregation.value,
+            "bucket": None if aggregation == HistoryAggregation.RAW else width // 1000,
+            "columns": COLUMNS.get(aggregation, DEFAULT_COLUMNS),
+        }
+        yield (
+            '{"success": true, "message": %s, "data": %s, "rows": ['
+            % (json.dumps(message, ensure_ascii=False), json.dumps(data)[:-1])
+        ).encode("utf-8")
+
+        rows = self.iter_rows(tag_ids, start_ts, end_ts, aggregation, width, cursor)
+        next_cursor: Optional[str] = None
+        last: Optional[Cursor] = None
+        chunk: List[str] = []
+        separator = ""
+        try:
+            for count, (position, row) in enumerate(rows):
+                if count == limit:
+                    next_cursor = f"{last[0]}:{last[1]}"
+                    break
+                chunk.append(json.dumps(row, ensure_ascii=False))
+                last = position
+                if len(chunk) == self.ROWS_PER_CHUNK:
+                    yield (separator + ", ".join(chunk)).encode("utf-8")
+                    chunk = []
+                    separator = ", "
+        finally:
+            # 읽다 만 조회의 읽기 트랜잭션을 바로 닫음
+            rows.close()
+        if chunk:
+            yield (separator + ", ".join(chunk)).encode("utf-8")
+        yield ('], "next_cursor": %s}, "error": null}' % json.dumps(next_cursor)).encode("utf-8")
+
+    def iter_export_batches(
+        self, tag_ids: Dict[TagKey, int], start_ts: int, end_ts: int
+    ) -> Iterator[pa.RecordBatch]:
+        """태그들의 [start_ts, end_ts) 원시 값을 EXPORT_SCHEMA 배치로 차례로 변환
+
+        tag_id는 Arrow 연산으로 "기계.태그" 사전의 인덱스로 바꾸므로 행마다 파이썬을
+        거치지 않습니다.
+        """
+        ordered = sorted(tag_ids.items(), key=lambda item: item[1])
+        ids = pa.array([tag_id for _, tag_id in ordered], type=pa.int32())
+        names = pa.array([f"{key[0]}.{key[1]}" for key, _ in ordered], type=pa.string())
+        for batch in self.store.read_batches(tag_ids, start_ts, end_ts):
+            tags = pa.DictionaryArray.from_arrays(
+                pc.index_in(batch.column("tag_id"), value_set=ids), names
+            )
+            yield pa.RecordBatch.from_arrays(
+                [
+                    tags,
+                    batch.column("ts").cast(pa.timestamp("ms", tz="UTC")),
+                    batch.column("value"),
+                    batch.column("quality"),
+                ],
+                schema=EXPORT_SCHEMA,
+            )
+
+    def iter_export(
+        self,
+        tag_ids: Dict[TagKey, int],
+        start_ts: int,
+        end_ts: int,
+        export_format: HistoryExportFormat,
+    ) -> Iterator[bytes]:
+        """원시 값을 Arrow IPC 스트림 또는 Parquet 파일로 인코딩하며 배치마다 쓴 바이트를 내보냄
+
+        전체를 DataFrame으로 모으지 않으므로 구간이 길어도 메모리는 배치 몇 개 크기입니다.
+        Parquet는 배치 하나가 row group 하나가 되고 끝에 footer가 붙습니다. 값은 파티션(기간)
+        순, 파티션 안에서는 태그 순입니다.
+        """
+        sink = _ChunkSink()
+        stream = pa.PythonFile(sink, mode="w")
+        if export_format == HistoryExportFormat.PARQUET:
+            writer = pq.ParquetWriter(stream, EXPORT_SCHEMA, compression="zstd")
+        else:
+            writer = pa.ipc.new_stream(stream, EXPORT_SCHEMA)
+        try:
+            for batch in self.iter_export_batches(tag_ids, start_ts, end_ts):
+                writer.write_batch(batch)
+                yield sink.take()
+        finally:
+            writer.close()
+        yield sink.take()
+
+
+def export_history_file(
+    path: str, names: Optional[List[str]], start_ts: int, end_ts: int
+) -> int:
+    """설정의 히스토리언 DB에서 [start_ts, end_ts) 원시 값을 파일로 내보내고 파일 크기를 반환 (조회 도구용)
+
+    확장자가 .parquet이면 Parquet, 그 밖에는 Arrow IPC 스트림으로 쓰며 열은
+    GET /history/export와 같습니다. names("기계.태그" 목록)가 없으면 모든 태그를 내보냅니다.
+    """
+    export_format = (
+        HistoryExportFormat.PARQUET
+        if path.lower().endswith(".parquet")
+        else HistoryExportFormat.ARROW
+    )
+    store = HistorianStore(
+        settings.historian_db_file,
+        partition=settings.HISTORIAN_PARTITION,
+        archive_dir=settings.historian_archive_dir,
+    )
+    try:
+        history_service = HistoryService(store)
+        tag_ids = history_service.resolve_tags(names) if names else history_service.resolve_all_tags()
+        size = 0
+        with open(path, "wb") as f:
+            for chunk in history_service.iter_export(tag_ids, start_ts, end_ts, export_format):
+                f.write(chunk)
+                size += len(chunk)
+        return size
+    finally:
+        store.close()
+
+
+class _ChunkSink:
+    """pyarrow 작성기가 쓴 바이트를 모아 두었다가 꺼내는 쓰기 전용 파일 객체"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
@@ -0,0 +1,209 @@
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from app.core.config import settings
+from app.services.historian.schema import to_epoch_ms
+from app.services.historian.store import HistorianStore
+from app.services.modbus.autocontrol import LOGS_DIR as AUTOCONTROL_LOGS_DIR
+from app.core.logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+# 자동 제어 로그 파일 이름 (auto_control_YYYYMMDD.parquet)
+_AUTOCONTROL_LOG_PATTERN = re.compile(r"^auto_control_(\d{8})\.parquet$")
+
+
+class RetentionService:
+    """보관 기간이 지난 데이터를 조금씩 정리하는 백그라운드 작업
+
+    원시 값은 파티션을 통째로 삭제하고(테이블 DROP 또는 Parquet 파일 삭제), 롤업과
+    외부 저장기 테이블은 작은 묶음으로 나눠 삭제합니다. 묶음마다 잠금을 놓고 잠깐
+    쉬므로 수집 값 저장이 막히거나 디스크 I/O가 한꺼번에 몰리지 않습니다. 삭제로 생긴
+    빈 페이지는 incremental vacuum으로 조금씩 파일에서 반환합니다. auto_vacuum이
+    INCREMENTAL이 아닌 기존 DB 파일에서는 반환하지 않고(빈 페이지는 재사용만 됨)
+    free_pages를 None으로 보고하며, 변환 명령을 경고로 한 번 알립니다.
+    """
+
+    # 한 번에 삭제하는 행 수와 묶음 사이 쉬는 시간 (초)
+    DELETE_BATCH_ROWS = 2000
+    BATCH_PAUSE = 0.05
+    # incremental vacuum 한 번에 반환하는 페이지 수와 한 번의 정리에서 반환하는 최대 페이지 수
+    VACUUM_STEP_PAGES = 256
+    VACUUM_MAX_PAGES = 65536
+
+    def __init__(self, store: HistorianStore, interval: Optional[int] = None):
+        self.store = store
+        self.interval = interval or settings.RETENTION_INTERVAL
+        self._task: Optional[asyncio.Task] = None
+        # 실행 중인 enforce (작업을 취소해도 스레드는 계속 돌므로 종료 시 끝날 때까지 기다림)
+        self._enforcing: Optional[asyncio.Task] = None
+        self._stopping = threading.Event()
+        self._vacuum_warned = False
+
+    def start(self):
+        self._task = asyncio.create_task(self._run(), name="retention")
+        logger.info(
+            f"보관 기간 정리 시작: 원시 {settings.RETENTION_RAW_DAYS}일, "
+            f"1분 롤업 {settings.RETENTION_ROLLUP_1M_DAYS}일, 1시간 롤업 {settings.RETENTION_ROLLUP_1H_DAYS}일, "
+            f"자동 제어 로그 {settings.RETENTION_AUTOCONTROL_LOG_DAYS}일 (0은 무기한), {self.interval}초 주기"
+        )
+
+    async def stop(self):
+        """정리를 멈추고, 실행 중인 정리가 묶음 사이에서 멈출 때까지 기다림 (그 뒤에 저장소를 닫아야 함)"""
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._enforcing is not None:
+            try:
+                await self._enforcing
+            except Exception as e:
+                logger.error(f"보관 기간 정리 중 오류: {e}")
+            self._enforcing = None
+
+    async def _run(self):
+        while True:
+            self._enforcing = asyncio.ensure_future(asyncio.to_thread(self.enforce))
+            try:
+                # 이 작업이 취소되어도 정리 스레드는 stop에서 기다릴 수 있도록 남겨 둠
+                await asyncio.shield(self._enforcing)
+            except Exception as e:
+                logger.error(f"보관 기간 정리 중 오류: {e}")
+            self._enforcing = None
+            await asyncio.sleep(self.interval)
+
+    def enforce(self, now: Optional[datetime] = None) -> Dict[str, Optional[int]]:
+        """보관 기간 정책을 한 번 적용하고 항목별 정리 결과를 반환
+
+        stop이 호출되면 다음 묶음으로 넘어가기 전에 멈춥니다. free_pages는 남은 빈
+        페이지 수이며, 공간 반환이 꺼진 DB 파일에서는 None입니다.
+        """
+        now = now or datetime.now()
+        started = time.perf_counter()
+        result = {
+            "raw_partitions": 0,
+            "wide_rows": 0,
+            "rollup_1m_rows": 0,
+            "rollup_1h_rows": 0,
+            "autocontrol_logs": 0,
+            "free_pages": 0,
+        }
+
+        if settings.RETENTION_RAW_DAYS:
+            cutoff = now - timedelta(days=settings.RETENTION_RAW_DAYS)
+            result["raw_partitions"] = len(self.store.drop_partitions_before(to_epoch_ms(cutoff)))
+            for deleted in self.store.delete_wide_before(cutoff, self.DELETE_BATCH_ROWS):
+                result["wide_rows"] += deleted
+                if self._stopping.is_set():
+                    return result
+                time.sleep(self.BATCH_PAUSE)
+
+        for name, days in (
+            ("1m", settings.RETENTION_ROLLUP_1M_DAYS),
+            ("1h", settings.RETENTION_ROLLUP_1H_DAYS),
+        ):
+            if not days:
+                continue
+            cutoff_ts = to_epoch_ms(now - timedelta(days=days))
+            for deleted in self.store.delete_rollups_before(name, cutoff_ts, self.DELETE_BATCH_ROWS):
+                result[f"rollup_{name}_rows"] += deleted
+                if self._stopping.is_set():
+                    return result
+                time.sleep(self.BATCH_PAUSE)
+
+        if self._stopping.is_set():
+            return result
+
+        if settings.RETENTION_AUTOCONTROL_LOG_DAYS:
+            result["autocontrol_logs"] = self._delete_autocontrol_logs(
+                now - timedelta(days=settings.RETENTION_AUTOCONTROL_LOG_DAYS)
+            )
+
+        result["free_pages"] = self._reclaim_space()
+
+        if any(value for key, value in result.items() if key != "free_pages"):
+            logger.info(f"보관 기간 정리 완료 ({time.perf_counter() - started:.1f}초): {result}")
+        return result
+
+    def _reclaim_space(self) -> Optional[int]:
+        """빈 페이지를 조금씩 파일에서 반환하고 남은 빈 페이지 수를 반환 (반환이 꺼져 있으면 None)"""
+        remaining = 0
+        for _ in range(self.VACUUM_MAX_PAGES // self.VACUUM_STEP_PAGES):
+            remaining = self.store.incremental_vacuum(self.VACUUM_STEP_PAGES)
+            if remaining is None:
+                if not self._vacuum_warned:
+                    logger.warning(
+                        f"{self.store.db_file}은 auto_vacuum = INCREMENTAL이 아니어서 삭제한 공간을 "
+                        "파일에서 반환하지 않습니다 (빈 페이지는 재사용만 됨). 서버와 외부 저장기를 "
+                        "멈춘 뒤 'python -m app.services.historian.retention "
+                        "--enable-incremental-vacuum'으로 변환하세요."
+                    )
+                    self._vacuum_warned = True
+                return None
+            if remaining == 0 or self._stopping.is_set():
+                break
+            time.sleep(self.BATCH_PAUSE)
+        return remaining
+
+    @staticmethod
+    def _delete_autocontrol_logs(cutoff: datetime) -> int:
+        if not os.path.isdir(AUTOCONTROL_LOGS_DIR):
+            return 0
+        deleted = 0
+        cutoff_date = cutoff.strftime("%Y%m%d")
+        for file_name in sorted(os.listdir(AUTOCONTROL_LOGS_DIR)):
+            match = _AUTOCONTROL_LOG_PATTERN.match(file_name)
+            if match is None or match.group(1) >= cutoff_date:
+                continue
+            try:
+                os.remove(os.path.join(AUTOCONTROL_LOGS_DIR, file_name))
+                deleted += 1
+            except OSError as e:
+                logger.warning(f"자동 제어 로그 삭제 실패: {file_name} - {e}")
+        return deleted
+
+
+def enable_incremental_vacuum(db_file: str):
+    """기존 DB 파일을 auto_vacuum=INCREMENTAL로 바꿈 (VACUUM 전체 실행, 서버와 저장기를 멈춘 뒤 실행)"""
+    conn = sqlite3.connect(db_file, isolation_level=None)
+    try:
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="히스토리언 보관 기간 정리")
+    parser.add_argument("--db", type=str, default=settings.historian_db_file, help="히스토리언 DB 파일")
+    parser.add_argument(
+        "--enable-incremental-vacuum",
+        action="store_true",
+        help="기존 DB 파일을 incremental vacuum 모드로 변환 (VACUUM 전체 실행)",
+    )
+    args = parser.parse_args()
+
+    if args.enable_incremental_vacuum:
+        enable_incremental_vacuum(args.db)
+        print("auto_vacuum = INCREMENTAL 로 변환했습니다.")
+    store = HistorianStore(
+        args.db,
+        wide_table=settings.SAVER_DB_NAME,
+        partition=settings.HISTORIAN_PARTITION,
+        archive_dir=settings.historian_archive_dir,
+    )
+    try:
+        print(RetentionService(store).enforce())
+    finally:
+        store.close()
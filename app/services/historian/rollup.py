@@ -0,0 +1,273 @@
+import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from app.services.historian.schema import TIER_HOT, partition_table
+from app.core.logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+# (이름, 구간 폭 ms). 구간은 epoch 기준으로 나뉘므로 정시 단위 시간대에서는 로컬 분/시와 같음
+ROLLUPS: List[Tuple[str, int]] = [("1m", 60_000), ("1h", 3_600_000)]
+
+# (tag_id, bucket, min, max, sum, count, first_ts, first, last_ts, last)
+RollupRow = Tuple[int, int, float, float, float, int, int, float, int, float]
+
+ROLLUP_COLUMNS = "tag_id, bucket, min, max, sum, count, first_ts, first, last_ts, last"
+
+
+def rollup_table(name: str) -> str:
+    return f"historian_rollup_{name}"
+
+
+def aggregate_sql(table: str, width: int, finer_width: Optional[int] = None) -> str:
+    """table의 행을 (tag_id, width 구간)별로 집계하는 SELECT
+
+    finer_width가 없으면 table은 원시 값 파티션이고, 있으면 그 폭의 롤업 테이블입니다.
+    구간 조건은 기본 키의 시각 컬럼에 걸리므로 인덱스 범위 검색이 되고, first/last는
+    집계한 시각으로 기본 키를 다시 찾아 읽습니다.
+    인자는 tag_id 목록(JSON 배열)과 구간 범위 [시작, 끝)입니다.
+    """
+    if finer_width is None:
+        key, first, last = "ts", "value", "value"
+        aggregates = (
+            "MIN(value) AS min, MAX(value) AS max, SUM(value) AS sum, COUNT(value) AS count, "
+            "MIN(ts) AS first_ts, MAX(ts) AS last_ts"
+        )
+        condition = "AND value IS NOT NULL"
+        first_key, last_key = "a.first_ts", "a.last_ts"
+    else:
+        key, first, last = "bucket", "first", "last"
+        aggregates = (
+            "MIN(min) AS min, MAX(max) AS max, SUM(sum) AS sum, SUM(count) AS count, "
+            "MIN(first_ts) AS first_ts, MAX(last_ts) AS last_ts"
+        )
+        condition = ""
+        first_key = f"a.first_ts - a.first_ts % {finer_width}"
+        last_key = f"a.last_ts - a.last_ts % {finer_width}"
+    return f"""
+        SELECT a.tag_id, a.bucket, a.min, a.max, a.sum, a.count,
+               a.first_ts, f.{first}, a.last_ts, l.{last}
+        FROM (
+            SELECT tag_id, {key} - {key} % {width} AS bucket, {aggregates}
+            FROM {table}
+            WHERE tag_id IN (SELECT value FROM json_each(?)) AND {key} >= ? AND {key} < ? {condition}
+            GROUP BY tag_id, {key} - {key} % {width}
+        ) AS a
+        JOIN {table} AS f ON f.tag_id = a.tag_id AND f.{key} = {first_key}
+        JOIN {table} AS l ON l.tag_id = a.tag_id AND l.{key} = {last_key}
+    """
+
+
+def update_rollups(conn: sqlite3.Connection, table: str, points: Iterable[Tuple[int, int]]):
+    """새로 저장한 값이 걸친 구간의 롤업만 다시 계산
+
+    해당 구간을 원시 테이블(table)에서 다시 집계하므로 중복 저장이나 순서가 바뀐 값이
+    있어도 결과가 같습니다. 1분 롤업을 먼저 갱신하고, 1시간 롤업은 갱신된 1분
+    롤업에서 다시 집계합니다.
+
+    Args:
+        points: 새로 저장한 (tag_id, ts)
+    """
+    points = list(points)
+    source, finer_width = table, None
+    for name, width in ROLLUPS:
+        sql = f"INSERT OR REPLACE INTO {rollup_table(name)} ({ROLLUP_COLUMNS}) {aggregate_sql(source, width, finer_width)}"
+        buckets: Dict[int, Set[int]] = {}
+        for tag_id, ts in points:
+            buckets.setdefault(tag_id, set()).add(ts - ts % width)
+        # 보통은 모든 태그가 같은 구간에 저장되므로 같은 범위의 태그를 한 번에 다시 집계
+        tags_by_run: Dict[Tuple[int, int], List[int]] = {}
+        for tag_id, tag_buckets in buckets.items():
+            for run in _runs(sorted(tag_buckets), width):
+                tags_by_run.setdefault(run, []).append(tag_id)
+        for (start, end), tag_ids in tags_by_run.items():
+            conn.execute(sql, (json.dumps(tag_ids), start, end))
+        source, finer_width = rollup_table(name), width
+
+
+def _runs(buckets: List[int], width: int) -> Iterable[Tuple[int, int]]:
+    """정렬된 구간 시작 시각들을 연속된 [시작, 끝) 범위로 묶음"""
+    start = end = None
+    for bucket in buckets:
+        if end is not None and bucket == end:
+            end += width
+            continue
+        if start is not None:
+            yield start, end
+        start, end = bucket, bucket + width
+    if start is not None:
+        yield start, end
+
+
+def choose_rollup(start_ts: int, end_ts: int, points: int) -> Optional[str]:
+    """구간에 최소 points개의 점이 나오는 가장 거친 롤업 (없으면 None: 원시 값)"""
+    for name, width in reversed(ROLLUPS):
+        if (end_ts - start_ts) // width >= points:
+            return name
+    return None
+
+
+def _partition_rollup(
+    db_file: str, key: str, tier: str, file_path: Optional[str], tag_ids: Sequence[int]
+) -> List[RollupRow]:
+    """파티션 하나의 1분 롤업 계산 (백필 작업 스레드에서 실행, 읽기만 함)"""
+    width = ROLLUPS[0][1]
+    if tier != TIER_HOT:
+        return _parquet_rollup(file_path, width)
+    conn = sqlite3.connect(f"file:{db_file}?mode=ro", uri=True)
+    try:
+        sql = aggregate_sql(partition_table(key), width)
+        return conn.execute(sql, (json.dumps(list(tag_ids)), 0, 2**62)).fetchall()
+    finally:
+        conn.close()
+
+
+def _parquet_rollup(file_path: str, width: int) -> List[RollupRow]:
+    table = pq.read_table(file_path, columns=["tag_id", "ts", "value"])
+    table = table.filter(pc.is_valid(table["value"]))
+    # 정수 나눗셈이므로 구간 시작 시각이 됨
+    table = table.append_column("bucket", pc.multiply(pc.divide(table["ts"], width), width))
+    # 파일은 (tag_id, ts) 순으로 정렬되어 있으므로 단일 스레드 집계에서 first/last가 시간순
+    grouped = table.group_by(["tag_id", "bucket"], use_threads=False).aggregate(
+        [
+            ("value", "min"),
+            ("value", "max"),
+            ("value", "sum"),
+            ("value", "count"),
+            ("ts", "min"),
+            ("value", "first"),
+            ("ts", "max"),
+            ("value", "last"),
+        ]
+    )
+    columns = [
+        grouped[name].to_pylist()
+        for name in (
+            "tag_id", "bucket", "value_min", "value_max", "value_sum", "value_count",
+            "ts_min", "value_first", "ts_max", "value_last",
+        )
+    ]
+    return list(zip(*columns))
+
+
+def backfill(
+    db_file: str,
+    workers: int = 4,
+    start_ts: Optional[int] = None,
+    end_ts: Optional[int] = None,
+) -> int:
+    """기존 원시 값으로 롤업을 다시 만듦 (파티션별로 병렬 계산, 저장은 한 연결에서)
+
+    Returns:
+        int: 저장한 1분 롤업 행 수
+    """
+    conn = sqlite3.connect(db_file)
+    conn.execute("PRAGMA journal_mode = WAL")
+    try:
+        partitions = conn.execute(
+            """
+            SELECT key, tier, file_path FROM historian_partitions
+            WHERE start_ts < ? AND end_ts > ? ORDER BY start_ts
+            """,
+            (end_ts if end_ts is not None else 2**62, start_ts or 0),
+        ).fetchall()
+        tag_ids = [row[0] for row in conn.execute("SELECT tag_id FROM historian_tags")]
+        logger.info(f"롤업 백필 시작: 파티션 {len(partitions)}개, 작업 스레드 {workers}개")
+
+        started = time.perf_counter()
+        written = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rollup") as executor:
+            futures = [
+                (key, executor.submit(_partition_rollup, db_file, key, tier, file_path, tag_ids))
+                for key, tier, file_path in partitions
+            ]
+            for key, future in futures:
+                rows = future.result()
+                with conn:
+                    _store_partition_rollup(conn, key, rows, tag_ids)
+                written += len(rows)
+                logger.info(f"롤업 백필: 파티션 {key} - 1분 롤업 {len(rows)}행")
+        logger.info(f"롤업 백필 완료: {written}행, {time.perf_counter() - started:.1f}초")
+        return written
+    finally:
+        conn.close()
+
+
+def rebuild_all(conn: sqlite3.Connection) -> int:
+    """모든 파티션의 원시 값으로 롤업을 다시 만들고 저장한 1분 롤업 행 수를 반환
+
+    backfill과 달리 conn의 현재 트랜잭션 안에서 계산하므로, 마이그레이션에서 아직
+    커밋하지 않은 값도 집계되고 실패하면 마이그레이션과 함께 롤백됩니다.
+    """
+    width = ROLLUPS[0][1]
+    tag_ids = [row[0] for row in conn.execute("SELECT tag_id FROM historian_tags")]
+    written = 0
+    for key, tier, file_path in conn.execute(
+        "SELECT key, tier, file_path FROM historian_partitions ORDER BY start_ts"
+    ).fetchall():
+        if tier == TIER_HOT:
+            rows = conn.execute(
+                aggregate_sql(partition_table(key), width), (json.dumps(tag_ids), 0, 2**62)
+            ).fetchall()
+        else:
+            rows = _parquet_rollup(file_path, width)
+        _store_partition_rollup(conn, key, rows, tag_ids)
+        written += len(rows)
+    return written
+
+
+def _store_partition_rollup(
+    conn: sqlite3.Connection, key: str, rows: List[RollupRow], tag_ids: Sequence[int]
+):
+    """파티션 하나의 1분 롤업을 바꿔 넣고 그 기간의 더 큰 구간 롤업을 다시 만듦"""
+    start, end = _partition_span(conn, key)
+    conn.execute(
+        f"DELETE FROM {rollup_table(ROLLUPS[0][0])} WHERE bucket >= ? AND bucket < ?",
+        (start, end),
+    )
+    conn.executemany(
+        f"INSERT OR REPLACE INTO {rollup_table(ROLLUPS[0][0])} ({ROLLUP_COLUMNS}) VALUES ({', '.join('?' * 10)})",
+        rows,
+    )
+    _rebuild_coarser(conn, tag_ids, start, end)
+
+
+def _partition_span(conn: sqlite3.Connection, key: str) -> Tuple[int, int]:
+    return conn.execute(
+        "SELECT start_ts, end_ts FROM historian_partitions WHERE key = ?", (key,)
+    ).fetchone()
+
+
+def _rebuild_coarser(conn: sqlite3.Connection, tag_ids: Sequence[int], start: int, end: int):
+    """[start, end) 구간의 1분 롤업으로 더 큰 구간의 롤업을 다시 만듦"""
+    for (finer, finer_width), (name, width) in zip(ROLLUPS, ROLLUPS[1:]):
+        conn.execute(
+            f"DELETE FROM {rollup_table(name)} WHERE bucket >= ? AND bucket < ?",
+            (start - start % width, end),
+        )
+        sql = f"INSERT OR REPLACE INTO {rollup_table(name)} ({ROLLUP_COLUMNS}) {aggregate_sql(rollup_table(finer), width, finer_width)}"
+        conn.execute(sql, (json.dumps(list(tag_ids)), start - start % width, end))
+
+
+if __name__ == "__main__":
+    import argparse
+    from datetime import datetime
+    from app.core.config import settings
+    from app.services.historian.schema import to_epoch_ms
+
+    parser = argparse.ArgumentParser(description="히스토리언 롤업(1분/1시간) 백필")
+    parser.add_argument("--workers", type=int, default=4, help="파티션을 동시에 계산할 스레드 수")
+    parser.add_argument("--start", type=str, help="시작 시간 (YYYY-MM-DD HH:MM:SS)")
+    parser.add_argument("--end", type=str, help="종료 시간 (YYYY-MM-DD HH:MM:SS)")
+    parser.add_argument("--db", type=str, default=settings.historian_db_file, help="히스토리언 DB 파일")
+    args = parser.parse_args()
+
+    def _parse(value: Optional[str]) -> Optional[int]:
+        return to_epoch_ms(datetime.strptime(value, "%Y-%m-%d %H:%M:%S")) if value else None
+
+    count = backfill(args.db, args.workers, _parse(args.start), _parse(args.end))
+    print(f"1분 롤업 {count}행을 저장했습니다.")
@@ -0,0 +1,86 @@
+from typing import Dict, Optional, Sequence, Set
+from pymodbus.client import ModbusTcpClient
+from app.core.config import settings
+from app.models.schemas import MachineConfig
+from app.services.modbus.client import ModbusClientManager
+from app.services.modbus.read_plan import get_read_plan
+from app.services.modbus.register_map import coalesce_ranges
+from app.core.logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def sample_machine(
+    machine_name: str, machine_config: MachineConfig, tag_names: Sequence[str]
+) -> Dict[str, Optional[float]]:
+    """기계의 태그 값을 Modbus에서 직접 읽어 반환 (동기, 스레드에서 실행)
+
+    필요한 레지스터를 가까운 것끼리 묶어 읽고, 아날로그 태그는 저장용으로 변환한 값
+    (scale_value), 디지털 태그는 비트 값(0/1)으로 반환합니다.
+    등록되지 않았거나 읽지 못한 태그는 None입니다.
+
+    Raises:
+        ModbusConnectionError: 기계에 연결하지 못한 경우
+    """
+    plan = get_read_plan(machine_config)
+    registers: Dict[str, int] = {}
+    for tag_name in tag_names:
+        if tag_name in plan.analog:
+            registers[tag_name] = plan.analog[tag_name]
+        elif tag_name in plan.digital:
+            registers[tag_name] = plan.digital[tag_name][0]
+
+    client_manager = ModbusClientManager(
+        host=machine_config.ip, port=machine_config.port, slave=machine_config.slave
+    )
+    values: Dict[int, int] = {}
+    if registers:
+        blocks = coalesce_ranges(
+            [(register, 1) for register in registers.values()],
+            settings.MODBUS_COALESCE_GAP,
+        )
+        wanted = set(registers.values())
+        with client_manager.connect() as client:
+            for start, count in blocks:
+                _read_block(client, client_manager.slave, start, count, wanted, values)
+
+    result: Dict[str, Optional[float]] = {}
+    for tag_name in tag_names:
+        register = registers.get(tag_name)
+        if register is None or register not in values:
+            result[tag_name] = None
+        elif tag_name in plan.digital:
+            result[tag_name] = (values[register] >> plan.digital[tag_name][1]) & 1
+        else:
+            result[tag_name] = scale_value(machine_name, values[register])
+    return result
+
+
+def _read_block(
+    client: ModbusTcpClient,
+    slave: int,
+    start: int,
+    count: int,
+    wanted: Set[int],
+    values: Dict[int, int],
+):
+    response = client.read_holding_registers(start, count=count, slave=slave)
+    if not response.isError():
+        for i, value in enumerate(response.registers):
+            values[start + i] = value
+        return
+    if count == 1:
+        logger.warning(f"히스토리언 레지스터 {start} 읽기 실패")
+        return
+    # 묶은 구간에 장비가 지원하지 않는 주소가 끼어 있을 수 있으므로 필요한 주소만 다시 읽음
+    for register in range(start, start + count):
+        if register in wanted:
+            _read_block(client, slave, register, 1, wanted, values)
+
+
+def scale_value(machine_name: str, value: float) -> float:
+    """아날로그 값의 저장용 변환 (소수점 한 자리, 기계별 배율 적용)"""
+    if machine_name in settings.HISTORIAN_UNSCALED_MACHINES:
+        return round(float(value), 1)
+    return round(value / settings.HISTORIAN_SCALE, 1)
+
@@ -0,0 +1,153 @@
+import asyncio
+import math
+import time
+from datetime import datetime
+from typing import Callable, NamedTuple, Optional
+
+
+class Tick(NamedTuple):
+    """수집 주기 하나"""
+
+    # 기준 시각부터 센 주기 번호
+    index: int
+    # 주기의 기준 시각 (벽시계, 저장 시각으로 사용)
+    timestamp: datetime
+    # 이 주기 직전에 건너뛴 주기 수
+    missed: int
+    # 주기 시각보다 늦게 시작한 시간 (초)
+    lateness: float
+
+
+class PeriodicScheduler:
+    """단조 시계(time.monotonic) 기준으로 일정한 주기를 내주는 스케줄러
+
+    주기 시각은 시작할 때 벽시계의 "period의 배수 + phase" 시각에 한 번 맞춘 뒤
+    단조 시계로 기준 시각 + n * period를 계산하므로, 작업 시간이 쌓여 밀리거나 시계
+    조정으로 주기가 빠지지 않습니다. 1초보다 짧은 주기도 쓸 수 있습니다.
+
+    wait()/wait_async()는 이전 주기의 작업이 끝난 뒤 호출하므로 주기가 겹쳐 실행되지
+    않습니다. 작업이 길어져 주기 시각을 넘기면 가장 최근 주기만 late_tolerance 안에서
+    늦게라도 실행하고, 그보다 이전 주기는 건너뛴 주기로 셉니다. 한 주기는 많아야 한
+    번 실행됩니다.
+    """
+
+    def __init__(
+        self,
+        period: float,
+        phase: float = 0.0,
+        late_tolerance: Optional[float] = None,
+        resync_threshold: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            period: 주기 (초)
+            phase: 주기 시각을 period의 배수에서 미루는 시간 (초, 0 이상 period 미만)
+            late_tolerance: 이 시간 안에 시작하면 늦어도 그 주기를 실행 (기본 period의 절반)
+            resync_threshold: 벽시계가 기준 시각에서 이만큼 벗어나면 다시 맞춤 (기본 max(period, 1초))
+        """
+        if period <= 0:
+            raise ValueError("period는 0보다 커야 합니다")
+        if not 0 <= phase < period:
+            raise ValueError("phase는 0 이상 period 미만이어야 합니다")
+        self.period = period
+        self.phase = phase
+        self.late_tolerance = period / 2 if late_tolerance is None else late_tolerance
+        self.resync_threshold = (
+            max(period, 1.0) if resync_threshold is None else resync_threshold
+        )
+        self._clock = clock
+        self._wall_clock = wall_clock
+
+        self._anchor_mono = 0.0
+        self._anchor_wall = 0.0
+        self._next_index = 0
+        # 아직 Tick으로 알리지 않은 건너뛴 주기 수
+        self._pending_missed = 0
+        self.ticks = 0
+        self.missed = 0
+        self.resyncs = 0
+        self.max_lateness = 0.0
+        self._align()
+
+    def _align(self):
+        """현재 벽시계 다음의 주기 시각을 0번 주기로 삼아 두 시계의 기준을 맞춤"""
+        mono, wall = self._clock(), self._wall_clock()
+        first = math.ceil((wall - self.phase) / self.period) * self.period + self.phase
+        self._anchor_wall = first
+        self._anchor_mono = mono + (first - wall)
+        self._next_index = 0
+
+    def _due(self, index: int) -> float:
+        return self._anchor_mono + index * self.period
+
+    def next_tick(self) -> float:
+        """다음 주기 시각까지 남은 시간 (초). 이미 지났으면 0"""
+        return max(0.0, self._due(self._next_index) - self._clock())
+
+    def take(self) -> Optional[Tick]:
+        """다음 주기 시각이 되었을 때 실행할 주기를 정함 (가장 최근 주기도 너무 늦었으면 None)"""
+        now = self._clock()
+        index = self._next_index
+        # 지금까지 지난 가장 최근 주기
+        latest = max(index, math.floor((now - self._anchor_mono) / self.period))
+        missed = latest - index
+        if now - self._due(latest) > self.late_tolerance:
+            # 가장 최근 주기도 너무 늦었으면 다음 주기까지 기다림
+            self.missed += missed + 1
+            self._pending_missed += missed + 1
+            self._next_index = latest + 1
+            return None
+        self.missed += missed
+        missed += self._pending_missed
+        self._pending_missed = 0
+        self._next_index = latest + 1
+        self.ticks += 1
+
+        lateness = max(0.0, now - self._due(latest))
+        self.max_lateness = max(self.max_lateness, lateness)
+        timestamp = self._anchor_wall + latest * self.period
+        return Tick(latest, datetime.fromtimestamp(timestamp), missed, lateness)
+
+    def wait(self) -> Tick:
+        """다음 주기 시각까지 잠든 뒤 그 주기를 반환"""
+        while True:
+            self._check_wall_clock()
+            time.sleep(self.next_tick())
+            tick = self.take()
+            if tick is not None:
+                return tick
+
+    async def wait_async(self) -> Tick:
+        """wait의 asyncio 버전"""
+        while True:
+            self._check_wall_clock()
+            await asyncio.sleep(self.next_tick())
+            tick = self.take()
+            if tick is not None:
+                return tick
+
+    def _check_wall_clock(self):
+        """벽시계가 크게 바뀌었으면(NTP 보정 등) 저장 시각이 계속 어긋나지 않도록 기준을 다시 맞춤"""
+        expected = self._anchor_wall + (self._clock() - self._anchor_mono)
+        if abs(self._wall_clock() - expected) <= self.resync_threshold:
+            return
+        # 시계가 뒤로 갔으면 이미 저장한 시각이 다시 나오지 않도록 그 다음 주기 시각부터 시작
+        last_timestamp = self._anchor_wall + (self._next_index - 1) * self.period
+        self._align()
+        if self._anchor_wall <= last_timestamp:
+            skip = math.floor((last_timestamp - self._anchor_wall) / self.period) + 1
+            self._anchor_wall += skip * self.period
+            self._anchor_mono += skip * self.period
+        self.resyncs += 1
+
+    def stats(self) -> dict:
+        return {
+            "period": self.period,
+            "phase": self.phase,
+            "ticks": self.ticks,
+            "missed": self.missed,
+            "resyncs": self.resyncs,
+            "max_lateness": round(self.max_lateness, 3),
+        }
@@ -0,0 +1,334 @@
+import sqlite3
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from app.core.logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+# 값 품질 코드
+QUALITY_GOOD = 0
+# 수집 주기에 값을 읽지 못함 (value는 NULL)
+QUALITY_NO_DATA = 1
+
+# 파티션 저장 위치
+TIER_HOT = "hot"  # SQLite 테이블 (historian_values_{key})
+TIER_COLD = "cold"  # Parquet 파일
+
+# 히스토리언 DB 스키마 버전 (PRAGMA user_version)
+SCHEMA_VERSION = 4
+
+# v1: 태그 차원과 단일 값 테이블
+SCHEMA = [
+    # 태그 차원: 설정 DB의 기계/태그로부터 생성되며 tag_id는 삭제 후에도 재사용하지 않음
+    """
+    CREATE TABLE IF NOT EXISTS historian_tags (
+        tag_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        machine_name TEXT NOT NULL,
+        tag_name TEXT NOT NULL,
+        UNIQUE (machine_name, tag_name)
+    )
+    """,
+    # 값: 태그별로 시간순 저장되므로 태그 하나의 구간 조회는 그 태그의 행만 읽음
+    """
+    CREATE TABLE IF NOT EXISTS historian_values (
+        tag_id INTEGER NOT NULL,
+        ts INTEGER NOT NULL,
+        value REAL,
+        quality INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (tag_id, ts)
+    ) WITHOUT ROWID
+    """,
+]
+
+# v2: 값 테이블을 기간별 파티션으로 분할하고 파티션 목록을 관리
+PARTITION_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS historian_partitions (
+        key TEXT PRIMARY KEY,
+        start_ts INTEGER NOT NULL,
+        end_ts INTEGER NOT NULL,
+        tier TEXT NOT NULL DEFAULT 'hot',
+        row_count INTEGER,
+        file_path TEXT,
+        archived_at TEXT
+    )
+    """,
+]
+
+# v3: 1분/1시간 롤업 (avg = sum / count, first/last는 구간 안 가장 이른/늦은 값)
+ROLLUP_SCHEMA = [
+    f"""
+    CREATE TABLE IF NOT EXISTS historian_rollup_{name} (
+        tag_id INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        min REAL,
+        max REAL,
+        sum REAL,
+        count INTEGER NOT NULL,
+        first_ts INTEGER,
+        first REAL,
+        last_ts INTEGER,
+        last REAL,
+        PRIMARY KEY (tag_id, bucket)
+    ) WITHOUT ROWID
+    """
+    for name in ("1m", "1h")
+]
+
+# v4: 태그별 저장 압축 방식과 최대 저장 간격 (조회 시 복원 방법을 정함)
+COMPRESSION_SCHEMA = [
+    "ALTER TABLE historian_tags ADD COLUMN compression TEXT NOT NULL DEFAULT 'none'",
+    "ALTER TABLE historian_tags ADD COLUMN max_interval_ms INTEGER",
+]
+
+# (tag_id, ts, value, quality)
+ValueRow = Tuple[int, int, Optional[float], int]
+
+# 넓은 테이블 이전 시 한 번에 읽는 행 수
+WIDE_MIGRATION_BATCH = 5000
+
+
+def to_epoch_ms(timestamp: datetime) -> int:
+    """로컬 시각을 epoch 밀리초로 변환"""
+    return round(timestamp.timestamp() * 1000)
+
+
+def migrate(
+    conn: sqlite3.Connection, wide_table: Optional[str] = None, partition: str = "month"
+) -> int:
+    """히스토리언 스키마를 최신 버전으로 만듦
+
+    v1에서 기존 넓은 테이블이 있으면 한 번 이전하고, v2에서 값을 partition 단위
+    테이블로 나누며, v3에서 롤업 테이블을 만들어 그때까지의 값으로 채우고, v4에서
+    태그별 압축 방식 컬럼을 만듭니다.
+    트랜잭션이 열려 있지 않으면 BEGIN IMMEDIATE로 직접 열므로, 호출한 쪽이 끝에서
+    커밋하기 전에 실패하면(with conn 등) 버전 기록까지 모두 롤백됩니다.
+
+    Returns:
+        int: 적용 후 스키마 버전
+    """
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        return SCHEMA_VERSION
+    if not conn.in_transaction:
+        # 기본 isolation_level에서는 CREATE/ALTER가 트랜잭션을 열지 않으므로 직접 시작
+        conn.execute("BEGIN IMMEDIATE")
+    # 쓰기 잠금을 기다리는 동안 다른 프로세스가 먼저 마이그레이션했을 수 있으므로 다시 읽음
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+    if current < 1:
+        for statement in SCHEMA:
+            conn.execute(statement)
+        if wide_table and table_exists(conn, wide_table):
+            migrated = migrate_wide_table(conn, wide_table)
+            logger.info(f"히스토리언: {wide_table} 테이블에서 값 {migrated}건 이전")
+        conn.execute("PRAGMA user_version = 1")
+        logger.info("히스토리언 DB 마이그레이션 적용: v1 - 태그별 값 테이블")
+    if current < 2:
+        for statement in PARTITION_SCHEMA:
+            conn.execute(statement)
+        moved = _split_into_partitions(conn, partition)
+        conn.execute("PRAGMA user_version = 2")
+        logger.info(f"히스토리언 DB 마이그레이션 적용: v2 - 기간별 파티션 (값 {moved}건 이동)")
+    if current < 3:
+        # rollup이 이 모듈을 가져오므로 여기서 가져옴
+        from app.services.historian.rollup import rebuild_all
+
+        for statement in ROLLUP_SCHEMA:
+            conn.execute(statement)
+        # v1/v2에서 옮겼거나 이전 버전에서 쌓인 값의 롤업을 같은 트랜잭션에서 만듦
+        built = rebuild_all(conn)
+        conn.execute("PRAGMA user_version = 3")
+        logger.info(f"히스토리언 DB 마이그레이션 적용: v3 - 1분/1시간 롤업 (1분 롤업 {built}행)")
+    if current < 4:
+        for statement in COMPRESSION_SCHEMA:
+            conn.execute(statement)
+        conn.execute("PRAGMA user_version = 4")
+        logger.info("히스토리언 DB 마이그레이션 적용: v4 - 태그별 저장 압축")
+    return SCHEMA_VERSION
+
+
+def _split_into_partitions(conn: sqlite3.Connection, partition: str) -> int:
+    """v1의 historian_values를 파티션 테이블로 옮기고 삭제"""
+    if not table_exists(conn, "historian_values"):
+        return 0
+    moved = 0
+    known: Dict[str, str] = {}
+    cursor = conn.execute(
+        "SELECT tag_id, ts, value, quality FROM historian_values ORDER BY tag_id, ts"
+    )
+    while True:
+        rows = cursor.fetchmany(WIDE_MIGRATION_BATCH)
+        if not rows:
+            break
+        moved += insert_values(conn, rows, partition, known)
+    conn.execute("DROP TABLE historian_values")
+    return moved
+
+
+def migrate_wide_table(conn: sqlite3.Connection, wide_table: str) -> int:
+    """"timestamp + {machine}_{tag}" 컬럼 구조의 테이블을 태그별 행으로 복사
+
+    원본 테이블은 기존 조회 도구를 위해 그대로 둡니다. 이전한 값의 수를 반환합니다.
+    """
+    migrated = 0
+    for values in iter_wide_values(conn, wide_table):
+        conn.executemany(
+            "INSERT OR IGNORE INTO historian_values (tag_id, ts, value, quality) VALUES (?, ?, ?, ?)",
+            values,
+        )
+        migrated += len(values)
+    return migrated
+
+
+def iter_wide_values(
+    conn: sqlite3.Connection, wide_table: str, after: Optional[str] = None
+) -> Iterator[List[ValueRow]]:
+    """넓은 테이블의 값을 시각 순으로 WIDE_MIGRATION_BATCH행씩 읽어 태그별 행 목록으로 변환
+
+    태그 차원에 없는 컬럼은 등록하며, 값이 없는(NULL) 칸은 건너뜁니다. after가 있으면
+    그 시각("YYYY-MM-DD HH:MM:SS") 뒤의 행만 읽습니다.
+    """
+    columns = [
+        row[1]
+        for row in conn.execute(f"PRAGMA table_info({wide_table})")
+        if row[1] != "timestamp" and row[2].upper() == "REAL"
+    ]
+    if not columns:
+        return
+    tag_ids = ensure_tags(conn, [split_column(column) for column in columns])
+    column_ids = [tag_ids[split_column(column)] for column in columns]
+
+    cursor = conn.execute(
+        f"SELECT timestamp, {', '.join(columns)} FROM {wide_table} WHERE timestamp > ? ORDER BY timestamp",
+        (after or "",),
+    )
+    while True:
+        rows = cursor.fetchmany(WIDE_MIGRATION_BATCH)
+        if not rows:
+            break
+        values: List[ValueRow] = []
+        for row in rows:
+            try:
+                ts = to_epoch_ms(datetime.strptime(row[0], "%Y-%m-%d %H:%M:%S"))
+            except (TypeError, ValueError):
+                logger.warning(f"히스토리언: 이전할 수 없는 시각 {row[0]!r}")
+                continue
+            for tag_id, value in zip(column_ids, row[1:]):
+                if value is not None:
+                    values.append((tag_id, ts, value, QUALITY_GOOD))
+        yield values
+
+
+def partition_key(ts: int, partition: str) -> str:
+    """ts(epoch ms)가 속한 파티션 키 (로컬 시각 기준 "YYYYMMDD" 또는 "YYYYMM")"""
+    return datetime.fromtimestamp(ts / 1000).strftime("%Y%m%d" if partition == "day" else "%Y%m")
+
+
+def partition_bounds(key: str) -> Tuple[int, int]:
+    """파티션 키의 [시작, 끝) 구간 (epoch ms)"""
+    if len(key) == 8:
+        start = datetime.strptime(key, "%Y%m%d")
+        end = start + timedelta(days=1)
+    else:
+        start = datetime.strptime(key, "%Y%m")
+        end = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return to_epoch_ms(start), to_epoch_ms(end)
+
+
+def partition_table(key: str) -> str:
+    return f"historian_values_{key}"
+
+
+def ensure_partition(conn: sqlite3.Connection, key: str) -> str:
+    """파티션이 없으면 테이블과 목록 행을 만들고, 파티션의 저장 위치(tier)를 반환"""
+    row = conn.execute(
+        "SELECT tier FROM historian_partitions WHERE key = ?", (key,)
+    ).fetchone()
+    if row is not None:
+        return row[0]
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {partition_table(key)} (
+            tag_id INTEGER NOT NULL,
+            ts INTEGER NOT NULL,
+            value REAL,
+            quality INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (tag_id, ts)
+        ) WITHOUT ROWID
+        """
+    )
+    start_ts, end_ts = partition_bounds(key)
+    conn.execute(
+        "INSERT INTO historian_partitions (key, start_ts, end_ts, tier) VALUES (?, ?, ?, ?)",
+        (key, start_ts, end_ts, TIER_HOT),
+    )
+    logger.info(f"히스토리언 파티션 생성: {key}")
+    return TIER_HOT
+
+
+def insert_values(
+    conn: sqlite3.Connection,
+    rows: Iterable[ValueRow],
+    partition: str,
+    known: Dict[str, str],
+    after_insert: Optional[Callable[[sqlite3.Connection, str, List[ValueRow]], None]] = None,
+) -> int:
+    """값을 파티션별 테이블에 저장하고 새로 저장한 행 수를 반환
+
+    known은 호출한 쪽이 유지하는 {파티션 키: tier} 캐시입니다. 이미 Parquet로 옮긴
+    파티션에 속한 값은 저장하지 않습니다. after_insert는 파티션마다 저장 직후
+    (연결, 테이블 이름, 저장한 행)으로 같은 트랜잭션 안에서 호출됩니다.
+    """
+    groups: Dict[str, List[ValueRow]] = defaultdict(list)
+    for row in rows:
+        groups[partition_key(row[1], partition)].append(row)
+
+    inserted = 0
+    for key, group in groups.items():
+        if key not in known:
+            known[key] = ensure_partition(conn, key)
+        if known[key] != TIER_HOT:
+            logger.warning(f"히스토리언: 이미 보관된 파티션 {key}의 값 {len(group)}행을 저장하지 않음")
+            continue
+        cursor = conn.executemany(
+            f"INSERT OR IGNORE INTO {partition_table(key)} (tag_id, ts, value, quality) VALUES (?, ?, ?, ?)",
+            group,
+        )
+        inserted += cursor.rowcount
+        if after_insert is not None:
+            after_insert(conn, partition_table(key), group)
+    return inserted
+
+
+def ensure_tags(
+    conn: sqlite3.Connection, keys: Iterable[Tuple[str, str]]
+) -> Dict[Tuple[str, str], int]:
+    """(기계, 태그)가 태그 차원에 없으면 추가하고 tag_id를 반환"""
+    keys = list(dict.fromkeys(keys))
+    conn.executemany(
+        "INSERT OR IGNORE INTO historian_tags (machine_name, tag_name) VALUES (?, ?)",
+        keys,
+    )
+    wanted = set(keys)
+    return {
+        (machine_name, tag_name): tag_id
+        for tag_id, machine_name, tag_name in conn.execute(
+            "SELECT tag_id, machine_name, tag_name FROM historian_tags"
+        )
+        if (machine_name, tag_name) in wanted
+    }
+
+
+def split_column(column: str) -> Tuple[str, str]:
+    """넓은 테이블의 "{machine}_{tag}" 컬럼 이름을 (기계, 태그)로 분리"""
+    machine_name, _, tag_name = column.rpartition("_")
+    return machine_name.upper(), tag_name.upper()
+
+
+def table_exists(conn: sqlite3.Connection, table: str) -> bool:
+    return (
+        conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone()
+        is not None
+    )
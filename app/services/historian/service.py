@@ -0,0 +1,201 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.services.historian.compression import Compressor
+from app.services.historian.sampler import sample_machine
+from app.services.historian.scheduler import PeriodicScheduler
+from app.services.historian.spool import Spool
+from app.services.historian.schema import to_epoch_ms
+from app.services.historian.store import HistorianStore, TagKey
+from app.services.historian.writer import HistorianWriter
+from app.core.logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class HistorianService:
+    """서버 안에서 태그 값을 주기적으로 수집해 히스토리언 DB에 저장하는 서비스
+
+    외부 저장기(modbus_database_saver.py)처럼 자기 API를 HTTP로 다시 호출하지 않고
+    Modbus 계층에서 직접 읽습니다. 수집 주기는 PeriodicScheduler가 단조 시계로 정하고,
+    기계별 읽기는 스레드에서 동시에 실행되며(한 기계의 읽기는 겹치지 않음), 저장 시각은 그
+    주기의 기준 시각입니다.
+    태그별 압축 설정(HISTORIAN_COMPRESSION)에 따라 저장할 값만 골라 HistorianWriter에
+    넘기며, 저장은 HistorianWriter가 모아서 합니다.
+    지난 파티션의 Parquet 보관은 수집과 별도의 작업으로 주기적으로 확인합니다.
+    """
+
+    # 지난 파티션 보관 여부를 확인하는 간격 (초)
+    ARCHIVE_CHECK_INTERVAL = 3600
+
+    def __init__(
+        self,
+        store: Optional[HistorianStore] = None,
+        interval: Optional[float] = None,
+        phase: Optional[float] = None,
+        machines: Optional[List[str]] = None,
+        tags: Optional[List[str]] = None,
+    ):
+        self.store = store or HistorianStore(
+            settings.historian_db_file,
+            wide_table=settings.SAVER_DB_NAME,
+            synchronous=settings.HISTORIAN_SYNCHRONOUS,
+            partition=settings.HISTORIAN_PARTITION,
+            hot_partitions=settings.HISTORIAN_HOT_PARTITIONS,
+            archive_dir=settings.historian_archive_dir,
+        )
+        spool = (
+            Spool(
+                settings.historian_spool_dir,
+                max_bytes=settings.HISTORIAN_SPOOL_MAX_MB * 1024 * 1024,
+            )
+            if settings.HISTORIAN_SPOOL_ENABLED
+            else None
+        )
+        self.writer = HistorianWriter(self.store, spool=spool)
+        self.compressor = Compressor(settings.HISTORIAN_COMPRESSION)
+        self.interval = interval or settings.HISTORIAN_INTERVAL
+        self.phase = settings.HISTORIAN_PHASE if phase is None else phase
+        self.scheduler: Optional[PeriodicScheduler] = None
+        self.machines = [m.upper() for m in (machines or settings.HISTORIAN_MACHINES)]
+        self.tags = [t.upper() for t in (tags or settings.HISTORIAN_TAGS)]
+        self._task: Optional[asyncio.Task] = None
+        self._archive_task: Optional[asyncio.Task] = None
+        self._next_archive_check = 0.0
+        # 기계별로 진행 중인 읽기 (시간 초과로 기다리기를 그만둬도 스레드는 끝까지 읽음)
+        self._reads: Dict[str, asyncio.Task] = {}
+        self.skipped_reads = 0
+
+    async def start(self):
+        """스키마와 태그 차원(설정의 모든 기계/태그와 수집 대상)을 준비하고 수집 루프 시작"""
+        snapshot = settings.config
+        tags = [
+            (machine_name, tag_name)
+            for machine_name, machine_config in snapshot.machines.items()
+            for tag_name in machine_config.tags
+        ]
+        tags += [(m, t) for m in self.machines for t in self.tags]
+        await asyncio.to_thread(self.store.ensure_schema, tags)
+        await asyncio.to_thread(
+            self.store.set_compression, {key: self.compressor.spec(key) for key in tags}
+        )
+        self.writer.start()
+        self.scheduler = PeriodicScheduler(self.interval, self.phase)
+        self._task = asyncio.create_task(self._run(), name="historian")
+        logger.info(
+            f"히스토리언 시작: {len(self.machines)}대 x {len(self.tags)}개 태그, {self.interval}초 주기"
+        )
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._archive_task is not None:
+            # 스레드에서 실행 중인 보관 작업은 중단할 수 없으므로 끝날 때까지 기다림
+            await self._archive_task
+            self._archive_task = None
+        # 압축 필터가 들고 있던 마지막 값까지 저장
+        self.writer.append_rows(self.compressor.flush())
+        await asyncio.to_thread(self.writer.stop)
+        await asyncio.to_thread(self.store.close)
+        logger.info("히스토리언 종료")
+
+    async def _run(self):
+        # 수집이 끝난 뒤 다음 주기를 기다리므로 두 주기의 수집이 겹치지 않음
+        while True:
+            tick = await self.scheduler.wait_async()
+            if tick.missed:
+                logger.warning(
+                    f"히스토리언: 수집이 늦어 {tick.missed}개 주기를 건너뜀 "
+                    f"(누적 {self.scheduler.missed}개)"
+                )
+            try:
+                await self.collect(tick.timestamp)
+            except Exception as e:
+                logger.error(f"히스토리언 수집 중 오류: {e}")
+            self._schedule_archive()
+
+    def _schedule_archive(self):
+        now = time.monotonic()
+        if now < self._next_archive_check:
+            return
+        if self._archive_task is not None and not self._archive_task.done():
+            return
+        self._next_archive_check = now + self.ARCHIVE_CHECK_INTERVAL
+        self._archive_task = asyncio.create_task(self._archive(), name="historian-archive")
+
+    async def _archive(self):
+        try:
+            await asyncio.to_thread(self.store.archive_closed_partitions)
+        except Exception as e:
+            logger.error(f"히스토리언 파티션 보관 중 오류: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """저장 버퍼 지표와 수집 주기 지표"""
+        stats = self.writer.stats()
+        stats["compression"] = self.compressor.stats()
+        stats["schedule"] = self.scheduler.stats() if self.scheduler is not None else None
+        stats["skipped_reads"] = self.skipped_reads
+        return stats
+
+    def _start_read(self, machine_name: str, machine_config) -> asyncio.Task:
+        task = asyncio.create_task(
+            asyncio.to_thread(sample_machine, machine_name, machine_config, self.tags),
+            name=f"historian-read-{machine_name}",
+        )
+        # 기다리기를 그만둔 읽기의 예외도 꺼내 두어 "never retrieved" 경고가 남지 않게 함
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+
+    async def collect(self, timestamp: datetime) -> Dict[TagKey, Optional[float]]:
+        """모든 기계를 동시에 읽어 한 시점의 값을 저장 버퍼에 넣고 그 값을 반환
+
+        읽지 못한 기계의 태그는 값 없음(None)으로 기록됩니다. 한 주기 안에 끝나지 않은
+        읽기는 기다리지 않지만 스레드는 계속 읽으므로, 그 읽기가 끝날 때까지는 그 기계를
+        새로 읽지 않고 값 없음으로 기록합니다 (기계마다 동시에 하나의 읽기만 실행).
+        """
+        snapshot = settings.config
+        machines = [name for name in self.machines if name in snapshot.machines]
+        unknown = [name for name in self.machines if name not in snapshot.machines]
+        if unknown:
+            logger.warning(f"히스토리언: 설정에 없는 기계 {unknown}")
+
+        # 이전 주기의 읽기가 아직 끝나지 않은 기계는 같은 기계를 겹쳐 읽지 않도록 이번 시점에서 제외
+        busy = [name for name in machines if name in self._reads and not self._reads[name].done()]
+        if busy:
+            self.skipped_reads += len(busy)
+            logger.warning(f"히스토리언: 이전 읽기가 끝나지 않은 기계 {busy} 건너뜀")
+        for name in machines:
+            if name not in busy:
+                self._reads[name] = self._start_read(name, snapshot.machines[name])
+
+        # 한 주기 안에 끝나지 않은 기계는 기다리지 않고 이번 시점에서 값 없음으로 기록
+        reading = [name for name in machines if name not in busy]
+        results = await asyncio.gather(
+            *[
+                asyncio.wait_for(asyncio.shield(self._reads[name]), timeout=self.interval * 0.8)
+                for name in reading
+            ],
+            return_exceptions=True,
+        )
+        results = dict(zip(reading, results))
+
+        row: Dict[TagKey, Optional[float]] = {}
+        for machine_name in machines:
+            result = results.get(machine_name)
+            if result is None:
+                result = dict.fromkeys(self.tags)
+            elif isinstance(result, BaseException):
+                logger.warning(f"히스토리언: 기계 {machine_name} 읽기 실패 - {result!r}")
+                result = dict.fromkeys(self.tags)
+            for tag_name, value in result.items():
+                row[(machine_name, tag_name)] = value
+
+        self.writer.append_rows(self.compressor.process(to_epoch_ms(timestamp), row))
+        return row
@@ -0,0 +1,182 @@
+import json
+import os
+import struct
+import zlib
+from typing import Any, BinaryIO, Callable, Dict, Iterable, List, Optional, Tuple
+
+# (시각 epoch ms, JSON으로 저장할 수 있는 값)
+SpoolRecord = Tuple[int, Any]
+
+# 레코드 머리: 본문 길이, 본문 CRC32
+_HEADER = struct.Struct("<II")
+_SEGMENT_PREFIX = "spool_"
+_SEGMENT_SUFFIX = ".seg"
+
+
+class Spool:
+    """저장소를 쓸 수 없는 동안 샘플을 모아 두는 추가 전용 디스크 스풀
+
+    레코드는 세그먼트 파일(spool_{번호}.seg)에 [길이, CRC32, JSON 본문] 형식으로 덧붙이고
+    append마다 fsync하므로, 프로세스가 죽어도 이미 append한 레코드는 남습니다. 쓰다가
+    끊긴 마지막 레코드는 CRC로 걸러냅니다. 프로세스가 새로 시작하면 이전 세그먼트에는
+    더 쓰지 않고 새 세그먼트를 엽니다.
+
+    drain은 세그먼트를 오래된 순서로 읽어 시각 순으로 정렬한 레코드를 한 번에
+    sink에 넘기고, sink가 성공하면 그 세그먼트를 지웁니다. sink가 실패하면 세그먼트가
+    남아 다음 drain에서 다시 넘기므로, sink는 같은 레코드를 다시 받아도 결과가 같아야
+    합니다 (INSERT OR IGNORE 등).
+
+    한 스레드에서만 사용합니다. 이 모듈은 외부 저장기 스크립트에서도 쓰므로 표준
+    라이브러리만 사용합니다.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = 4 * 1024 * 1024,
+        max_bytes: Optional[int] = None,
+    ):
+        """
+        Args:
+            directory: 세그먼트 파일 디렉토리
+            segment_bytes: 세그먼트 하나의 최대 크기. 넘으면 새 세그먼트에 씀
+            max_bytes: 스풀 전체 최대 크기. 넘으면 가장 오래된 세그먼트부터 지움 (None이면 제한 없음)
+        """
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        segments = self._segments()
+        self._next_seq = self._seq(segments[-1]) + 1 if segments else 0
+        self._file: Optional[BinaryIO] = None
+        self._path: Optional[str] = None
+        self._file_bytes = 0
+        # 지표
+        self.appended_records = 0
+        self.drained_records = 0
+        self.corrupt_records = 0
+        self.dropped_segments = 0
+
+    @property
+    def pending(self) -> bool:
+        """아직 sink로 넘기지 않은 세그먼트가 있는지"""
+        return bool(self._segments())
+
+    def append(self, records: Iterable[SpoolRecord]) -> int:
+        """레코드를 현재 세그먼트에 덧붙이고 디스크에 기록될 때까지 기다림"""
+        bodies = [
+            json.dumps([ts, payload], separators=(",", ":")).encode("utf-8")
+            for ts, payload in records
+        ]
+        if not bodies:
+            return 0
+        data = b"".join(_HEADER.pack(len(body), zlib.crc32(body)) + body for body in bodies)
+        if self._file is None or self._file_bytes >= self.segment_bytes:
+            self._open_segment()
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file_bytes += len(data)
+        self.appended_records += len(bodies)
+        self._enforce_max_bytes()
+        return len(bodies)
+
+    def drain(self, sink: Callable[[List[SpoolRecord]], Any]) -> int:
+        """쌓인 레코드를 세그먼트 단위로 sink에 넘기고 넘긴 레코드 수를 반환
+
+        sink에서 난 예외는 그대로 올라가며, 그 세그먼트와 이후 세그먼트는 남습니다.
+        """
+        drained = 0
+        for path in self._segments():
+            if path == self._path:
+                # 지금 쓰는 세그먼트도 넘길 수 있도록 닫음 (이후 append는 새 세그먼트에 씀)
+                self._close_segment()
+            records = self._read_segment(path)
+            records.sort(key=lambda record: record[0])
+            if records:
+                sink(records)
+            os.remove(path)
+            drained += len(records)
+            self.drained_records += len(records)
+        return drained
+
+    def close(self):
+        self._close_segment()
+
+    def stats(self) -> Dict[str, int]:
+        segments = self._segments()
+        return {
+            "segments": len(segments),
+            "bytes": sum(os.path.getsize(path) for path in segments),
+            "appended_records": self.appended_records,
+            "drained_records": self.drained_records,
+            "corrupt_records": self.corrupt_records,
+            "dropped_segments": self.dropped_segments,
+        }
+
+    def _segments(self) -> List[str]:
+        return [
+            os.path.join(self.directory, name)
+            for name in sorted(os.listdir(self.directory))
+            if name.startswith(_SEGMENT_PREFIX) and name.endswith(_SEGMENT_SUFFIX)
+        ]
+
+    @staticmethod
+    def _seq(path: str) -> int:
+        return int(os.path.basename(path)[len(_SEGMENT_PREFIX) : -len(_SEGMENT_SUFFIX)])
+
+    def _open_segment(self):
+        self._close_segment()
+        path = os.path.join(
+            self.directory, f"{_SEGMENT_PREFIX}{self._next_seq:012d}{_SEGMENT_SUFFIX}"
+        )
+        self._next_seq += 1
+        self._file = open(path, "ab")
+        self._path = path
+        self._file_bytes = 0
+        # 새 파일 이름도 디스크에 기록 (디렉토리 fsync를 지원하지 않는 OS는 건너뜀)
+        if hasattr(os, "O_DIRECTORY"):
+            fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def _close_segment(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._path = None
+
+    def _read_segment(self, path: str) -> List[SpoolRecord]:
+        """세그먼트의 레코드를 읽음. 끊기거나 CRC가 맞지 않는 레코드부터는 버림"""
+        with open(path, "rb") as f:
+            data = f.read()
+        records: List[SpoolRecord] = []
+        offset = 0
+        while offset + _HEADER.size <= len(data):
+            length, crc = _HEADER.unpack_from(data, offset)
+            body = data[offset + _HEADER.size : offset + _HEADER.size + length]
+            if len(body) < length or zlib.crc32(body) != crc:
+                break
+            ts, payload = json.loads(body)
+            records.append((ts, payload))
+            offset += _HEADER.size + length
+        if offset < len(data):
+            # 이후 레코드의 경계를 알 수 없으므로 세그먼트의 나머지는 버림
+            self.corrupt_records += 1
+        return records
+
+    def _enforce_max_bytes(self):
+        if self.max_bytes is None:
+            return
+        segments = self._segments()
+        sizes = [os.path.getsize(path) for path in segments]
+        total = sum(sizes)
+        # 지금 쓰는 세그먼트(마지막)는 지우지 않음
+        for path, size in zip(segments[:-1], sizes):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            self.dropped_segments += 1
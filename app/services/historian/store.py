@@ -0,0 +1,797 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+import pyarrow as pa
+from app.models.schemas import CompressionMode, HistorianCompression
+from app.services.historian.archive import (
+    EXPORT_BATCH_ROWS,
+    aggregate_partition,
+    export_partition,
+    iter_partition_batches,
+    read_partition,
+    rows_to_batch,
+)
+from app.services.historian.compression import aggregate_reconstructed, reconstruct
+from app.services.historian.rollup import (
+    ROLLUPS,
+    aggregate_sql,
+    choose_rollup,
+    rollup_table,
+    update_rollups,
+)
+from app.services.historian.schema import (
+    QUALITY_GOOD,
+    QUALITY_NO_DATA,
+    TIER_COLD,
+    TIER_HOT,
+    ensure_tags,
+    insert_values,
+    iter_wide_values,
+    migrate,
+    partition_bounds,
+    partition_key,
+    partition_table,
+    split_column,
+    to_epoch_ms,
+    ValueRow,
+    table_exists,
+)
+from app.core.logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+# (기계 이름, 태그 이름)
+TagKey = Tuple[str, str]
+# (태그, ts(epoch ms), 값)
+Row = Tuple[TagKey, int, Optional[float]]
+# 조회 결과 (태그, ts(epoch ms), 값, 품질)
+HistoryRow = Tuple[TagKey, int, Optional[float], int]
+# 복원 조회 결과 (태그, ts(epoch ms), 값)
+SampleRow = Tuple[TagKey, int, Optional[float]]
+# 구간 집계 결과 (구간 시작 ts, min, max, avg, 마지막 값)
+AggregateRow = Tuple[int, float, float, float, float]
+# 추세 조회 결과 (태그, 구간 시작 ts, min, max, avg, count, first, last)
+TrendRow = Tuple[TagKey, int, Optional[float], Optional[float], Optional[float], int, Optional[float], Optional[float]]
+
+
+class HistorianStore:
+    """히스토리언 DB (태그별 행: tag_id, ts(epoch ms), value, quality)
+
+    태그는 historian_tags 차원 테이블에서 tag_id를 받으므로 새 태그를 저장할 때
+    DDL이 필요 없습니다. 처음 열 때 기존 저장기의 넓은 테이블(wide_table)이
+    있으면 값을 한 번 이전합니다.
+
+    값은 partition("day" 또는 "month") 단위 테이블에 나뉘어 저장되고, 최근
+    hot_partitions개를 제외한 지난 파티션은 archive_dir의 Parquet 파일로 옮겨집니다.
+    조회는 historian_partitions 목록에서 구간이 겹치는 파티션만 골라 두 저장소를
+    함께 읽습니다.
+    """
+
+    # 다른 연결이 쓰기 잠금을 잡고 있을 때 기다릴 최대 시간 (ms)
+    BUSY_TIMEOUT_MS = 5000
+    # 압축 설정이 기록되지 않은 태그의 최대 저장 간격 (복원 조회 시 앞뒤로 더 읽는 구간, ms)
+    DEFAULT_MAX_INTERVAL_MS = 3_600_000
+    # 복원 조회와 압축 태그 집계를 한 번에 계산하는 시각(구간) 수
+    WINDOW_POINTS = 10_000
+
+    def __init__(
+        self,
+        db_file: str,
+        wide_table: Optional[str] = None,
+        synchronous: str = "NORMAL",
+        partition: str = "month",
+        hot_partitions: int = 2,
+        archive_dir: Optional[str] = None,
+    ):
+        self.db_file = db_file
+        self.wide_table = wide_table
+        # WAL에서 NORMAL은 체크포인트 때만 fsync (전원 차단 시 마지막 트랜잭션만 잃을 수 있음)
+        self.synchronous = synchronous
+        self.partition = partition
+        self.hot_partitions = hot_partitions
+        self.archive_dir = archive_dir or os.path.join(
+            os.path.dirname(os.path.abspath(db_file)), "historian_archive"
+        )
+        self._connection: Optional[sqlite3.Connection] = None
+        self._tag_ids: Dict[TagKey, int] = {}
+        # {파티션 키: tier}
+        self._partitions: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _ensure_connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.db_file, check_same_thread=False)
+            # 새 DB 파일에만 적용됨. 기존 파일은 VACUUM이 필요하며 그 전까지 보관 기간 정리는
+            # 공간을 반환하지 않음 (retention --enable-incremental-vacuum 참고)
+            connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            connection.execute("PRAGMA journal_mode = WAL")
+            # 외부 저장기/조회 도구가 같은 파일을 쓰는 동안 잠깐 기다림
+            connection.execute(f"PRAGMA busy_timeout = {self.BUSY_TIMEOUT_MS}")
+            connection.execute(f"PRAGMA synchronous = {self.synchronous}")
+            self._connection = connection
+        return self._connection
+
+    def ensure_schema(self, tags: Iterable[TagKey]):
+        """스키마를 준비하고 태그 차원에 tags를 등록"""
+        with self._lock:
+            conn = self._ensure_connection()
+            with conn:
+                migrate(conn, self.wide_table, self.partition)
+                self._tag_ids.update(ensure_tags(conn, tags))
+                self._partitions = dict(
+                    conn.execute("SELECT key, tier FROM historian_partitions")
+                )
+
+    def set_compression(self, specs: Dict[TagKey, HistorianCompression]):
+        """태그별 저장 압축 방식을 기록 (조회할 때 이 방식으로 값을 복원)"""
+        with self._lock:
+            conn = self._ensure_connection()
+            with conn:
+                self._tag_ids.update(ensure_tags(conn, specs))
+                conn.executemany(
+                    """
+                    UPDATE historian_tags SET compression = ?, max_interval_ms = ?
+                    WHERE machine_name = ? AND tag_name = ?
+                    """,
+                    [
+                        (spec.mode.value, int(spec.max_interval * 1000), machine_name, tag_name)
+                        for (machine_name, tag_name), spec in specs.items()
+                    ],
+                )
+
+    def write(self, timestamp: datetime, values: Dict[TagKey, Optional[float]]) -> bool:
+        """한 시점의 값을 바로 저장 (같은 시점이 이미 있으면 저장하지 않고 False 반환)"""
+        ts = to_epoch_ms(timestamp)
+        inserted = self.write_rows([(key, ts, value) for key, value in values.items()])
+        if values and inserted == 0:
+            logger.warning(f"히스토리언: {timestamp} 시점 데이터가 이미 있어 저장하지 않았습니다.")
+        return inserted > 0
+
+    def write_rows(self, rows: List[Row]) -> int:
+        """여러 시점의 값을 한 트랜잭션으로 저장하고 새로 저장한 행 수를 반환
+
+        값이 None인 행은 값 없이 QUALITY_NO_DATA로 기록하며, 이미 있는 (태그, 시점)은 건너뜁니다.
+        """
+        if not rows:
+            return 0
+        with self._lock:
+            conn = self._ensure_connection()
+            with conn:
+                missing = {key for key, _, _ in rows if key not in self._tag_ids}
+                if missing:
+                    self._tag_ids.update(ensure_tags(conn, missing))
+                return insert_values(
+                    conn,
+                    [
+                        (
+                            self._tag_ids[key],
+                            ts,
+                            value,
+                            QUALITY_GOOD if value is not None else QUALITY_NO_DATA,
+                        )
+                        for key, ts, value in rows
+                    ],
+                    self.partition,
+                    self._partitions,
+                    self._update_rollups,
+                )
+
+    def sync_wide_table(self) -> int:
+        """넓은 테이블에서 태그별 테이블의 마지막 값보다 뒤에 저장된 행을 옮기고 옮긴 값 수를 반환
+
+        마이그레이션은 넓은 테이블을 한 번만 복사하므로, 그 뒤에 넓은 테이블에만 저장된
+        값(예: 이전 버전 저장기가 쓴 값)을 채울 때 씁니다. 롤업도 함께 갱신합니다.
+        """
+        if not self.wide_table:
+            return 0
+        with self._lock:
+            conn = self._ensure_connection()
+            if not table_exists(conn, self.wide_table):
+                return 0
+            with conn:
+                after = self._last_wide_timestamp(conn)
+                synced = 0
+                for values in iter_wide_values(conn, self.wide_table, after):
+                    synced += insert_values(
+                        conn, values, self.partition, self._partitions, self._update_rollups
+                    )
+        if synced:
+            logger.info(f"히스토리언: {self.wide_table} 테이블에서 {after} 이후 값 {synced}건 이전")
+        return synced
+
+    def _last_wide_timestamp(self, conn: sqlite3.Connection) -> Optional[str]:
+        """넓은 테이블 태그의 값이 태그별 테이블에 저장된 마지막 시각 ("YYYY-MM-DD HH:MM:SS")"""
+        tag_ids = list(self._lookup_tag_ids(conn, self._wide_tag_keys(conn)).values())
+        for key, tier in conn.execute(
+            "SELECT key, tier FROM historian_partitions ORDER BY start_ts DESC"
+        ).fetchall():
+            if tier != TIER_HOT:
+                # 보관된 파티션에는 더 저장할 수 없으므로 그 파티션 끝까지 옮긴 것으로 봄
+                end_ts = partition_bounds(key)[1]
+                return datetime.fromtimestamp((end_ts - 1) / 1000).strftime("%Y-%m-%d %H:%M:%S")
+            last_ts = conn.execute(
+                f"SELECT MAX(ts) FROM {partition_table(key)} WHERE tag_id IN (SELECT value FROM json_each(?))",
+                (json.dumps(tag_ids),),
+            ).fetchone()[0]
+            if last_ts is not None:
+                return datetime.fromtimestamp(last_ts / 1000).strftime("%Y-%m-%d %H:%M:%S")
+        return None
+
+    def _wide_tag_keys(self, conn: sqlite3.Connection) -> List[TagKey]:
+        return [
+            split_column(row[1])
+            for row in conn.execute(f"PRAGMA table_info({self.wide_table})")
+            if row[1] != "timestamp" and row[2].upper() == "REAL"
+        ]
+
+    @staticmethod
+    def _update_rollups(conn: sqlite3.Connection, table: str, rows: List[ValueRow]):
+        update_rollups(
+            conn, table, ((tag_id, ts) for tag_id, ts, value, _ in rows if value is not None)
+        )
+
+    def read(
+        self, keys: Iterable[TagKey], start_ts: int, end_ts: int
+    ) -> Iterator[HistoryRow]:
+        """태그들의 [start_ts, end_ts) 값을 태그(tag_id) 순, 태그 안에서는 시간순으로 반환
+
+        구간이 겹치는 파티션만 읽으며, SQLite 파티션과 Parquet 파티션을 함께 읽습니다.
+        쓰기와 잠금을 공유하지 않도록 읽기 전용 연결을 따로 열고, 한 읽기 트랜잭션
+        안에서 읽으므로 도중에 파티션이 Parquet로 옮겨져도 결과가 어긋나지 않습니다.
+        """
+        conn = sqlite3.connect(f"file:{self.db_file}?mode=ro", uri=True)
+        try:
+            conn.execute("BEGIN")
+            tag_ids = self._lookup_tag_ids(conn, keys)
+            partitions = conn.execute(
+                """
+                SELECT key, tier, file_path FROM historian_partitions
+                WHERE start_ts < ? AND end_ts > ?
+                ORDER BY start_ts
+                """,
+                (end_ts, start_ts),
+            ).fetchall()
+            for tag_id, key in sorted((tag_id, key) for key, tag_id in tag_ids.items()):
+                for partition, tier, file_path in partitions:
+                    if tier == TIER_HOT:
+                        rows = conn.execute(
+                            f"""
+                            SELECT ts, value, quality FROM {partition_table(partition)}
+                            WHERE tag_id = ? AND ts >= ? AND ts < ?
+                            ORDER BY ts
+                            """,
+                            (tag_id, start_ts, end_ts),
+                        )
+                    else:
+                        rows = read_partition(file_path, tag_id, start_ts, end_ts)
+                    for ts, value, quality in rows:
+                        yield key, ts, value, quality
+        finally:
+            conn.close()
+
+    def read_batches(
+        self,
+        keys: Iterable[TagKey],
+        start_ts: int,
+        end_ts: int,
+        batch_rows: int = EXPORT_BATCH_ROWS,
+    ) -> Iterator[pa.RecordBatch]:
+        """태그들의 [start_ts, end_ts) 값을 batch_rows행 이하의 Arrow 배치(ARCHIVE_SCHEMA)로 반환
+
+        파티션(기간) 순, 파티션 안에서는 (tag_id, ts) 순입니다. SQLite 파티션은 커서에서
+        batch_rows행씩 가져오고 Parquet 파티션은 row group 단위로 읽으므로, 구간이 길어도
+        배치 몇 개 크기의 메모리만 씁니다. read와 같이 한 읽기 트랜잭션 안에서 읽습니다.
+        """
+        conn = sqlite3.connect(f"file:{self.db_file}?mode=ro", uri=True)
+        try:
+            conn.execute("BEGIN")
+            tag_ids = sorted(self._lookup_tag_ids(conn, keys).values())
+            if not tag_ids:
+                return
+            partitions = conn.execute(
+                """
+                SELECT key, tier, file_path FROM historian_partitions
+                WHERE start_ts < ? AND end_ts > ?
+                ORDER BY start_ts
+                """,
+                (end_ts, start_ts),
+            ).fetchall()
+            for partition, tier, file_path in partitions:
+                if tier != TIER_HOT:
+                    yield from iter_partition_batches(file_path, tag_ids, start_ts, end_ts, batch_rows)
+                    continue
+                # 기본 키 (tag_id, ts) 순으로 읽으므로 정렬 없이 순서가 맞음
+                cursor = conn.execute(
+                    f"""
+                    SELECT tag_id, ts, value, quality FROM {partition_table(partition)}
+                    WHERE tag_id IN (SELECT value FROM json_each(?)) AND ts >= ? AND ts < ?
+                    ORDER BY tag_id, ts
+                    """,
+                    (json.dumps(tag_ids), start_ts, end_ts),
+                )
+                while True:
+                    rows = cursor.fetchmany(batch_rows)
+                    if not rows:
+                        break
+                    yield rows_to_batch(rows)
+        finally:
+            conn.close()
+
+    def read_sampled(
+        self, keys: Iterable[TagKey], start_ts: int, end_ts: int, step_ms: int
+    ) -> Iterator[SampleRow]:
+        """태그들의 [start_ts, end_ts) 값을 step_ms 간격으로 복원해 태그 순, 시간순으로 반환
+
+        압축해 저장한 태그도 원래 주기의 값처럼 읽을 수 있도록, 태그에 기록된 압축
+        방식대로 스윙도어는 저장 점 사이를 직선으로 잇고 나머지는 마지막 저장 값을
+        유지합니다. 구간을 WINDOW_POINTS개 시각씩 나누어 그 구간의 저장 점만 Arrow로
+        읽고 배열 연산으로 복원하므로, 구간이 길고 간격이 짧아도 메모리는 창 하나
+        크기이고 첫 값이 바로 나옵니다.
+        """
+        modes = self._compression_modes(keys)
+        for key, (_, compression, max_interval_ms) in sorted(
+            modes.items(), key=lambda item: item[1][0]
+        ):
+            window = step_ms * self.WINDOW_POINTS
+            for window_start in range(start_ts, end_ts, window):
+                window_end = min(window_start + window, end_ts)
+                ts, values = self._read_points(key, window_start, window_end, max_interval_ms)
+                grid, sampled = reconstruct(
+                    ts, values, compression, window_start, window_end, step_ms, max_interval_ms * 2
+                )
+                # NaN(값 없음)은 None으로 바뀜
+                for point_ts, value in zip(
+                    grid.tolist(), pa.array(sampled, from_pandas=True).to_pylist()
+                ):
+                    yield key, point_ts, value
+
+    def _compression_modes(self, keys: Iterable[TagKey]) -> Dict[TagKey, Tuple[int, str, int]]:
+        """태그별 (tag_id, 압축 방식, 최대 저장 간격 ms)"""
+        wanted = set(keys)
+        conn = sqlite3.connect(f"file:{self.db_file}?mode=ro", uri=True)
+        try:
+            return {
+                (machine_name, tag_name): (
+                    tag_id,
+                    compression,
+                    max_interval_ms or self.DEFAULT_MAX_INTERVAL_MS,
+                )
+                for tag_id, machine_name, tag_name, compression, max_interval_ms in conn.execute(
+                    """
+                    SELECT tag_id, machine_name, tag_name, compression, max_interval_ms
+                    FROM historian_tags
+                    """
+                )
+                if (machine_name, tag_name) in wanted
+            }
+        finally:
+            conn.close()
+
+    def _read_points(
+        self, key: TagKey, start_ts: int, end_ts: int, max_interval_ms: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """[start_ts, end_ts)를 복원하는 데 필요한 저장 점 (구간 앞의 마지막 점과 뒤의 첫 점 포함)
+
+        최대 저장 간격 직후의 수집 주기에 저장되므로 간격의 두 배까지는 값이 이어진 것으로
+        보고, 구간 앞뒤를 그만큼 더 읽습니다.
+
+        Returns:
+            (시각 int64 배열, 값 float64 배열, 값 없음은 NaN)
+        """
+        batches = list(
+            self.read_batches([key], start_ts - max_interval_ms * 2, end_ts + max_interval_ms * 2)
+        )
+        if not batches:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        table = pa.Table.from_batches(batches)
+        return (
+            table.column("ts").to_numpy(),
+            table.column("value").cast(pa.float64()).fill_null(np.nan).to_numpy(),
+        )
+
+    def _aggregate_reconstructed(
+        self,
+        key: TagKey,
+        compression: str,
+        max_interval_ms: int,
+        start_ts: int,
+        end_ts: int,
+        width: int,
+    ) -> Iterator[Tuple[int, float, float, float, int, float, float]]:
+        """압축 태그의 복원한 값을 width 구간별로 집계 (WINDOW_POINTS개 구간씩 나누어 읽고 계산)
+
+        Yields:
+            (bucket, min, max, 시간 가중 평균, 저장 점 수, 첫 값, 마지막 값)
+        """
+        window = width * self.WINDOW_POINTS
+        for window_start in range(start_ts, end_ts, window):
+            window_end = min(window_start + window, end_ts)
+            ts, values = self._read_points(key, window_start, window_end, max_interval_ms)
+            columns = aggregate_reconstructed(
+                ts, values, compression, window_start, window_end, width, max_interval_ms * 2
+            )
+            yield from zip(*(column.tolist() for column in columns))
+
+    def aggregate(
+        self, key: TagKey, start_ts: int, end_ts: int, width: int
+    ) -> Iterator[AggregateRow]:
+        """태그 하나의 [start_ts, end_ts) 값을 width(ms) 구간별로 집계해 구간 순으로 반환
+
+        width가 롤업 폭의 배수이면 가장 거친 롤업을 다시 집계하므로 Parquet로 옮긴
+        기간도 SQLite만 읽습니다. 그 밖에는, 그리고 롤업이 시작되기 전 기간은 SQLite
+        파티션은 SQL로, Parquet 파티션은 Arrow로 집계합니다. 구간은 epoch 기준으로 나뉘므로 start_ts와 end_ts는 width의
+        배수여야 합니다. 값이 하나도 없는 구간은 반환하지 않습니다.
+
+        압축해 저장한 태그는 저장 점만으로는 빈 구간이 생기고 평균이 치우치므로, 저장
+        점을 읽어 read_sampled와 같은 방식으로 복원한 값을 배열 연산으로 집계합니다
+        (시간 가중 평균). 이때도 WINDOW_POINTS개 구간씩 나누어 읽습니다.
+        """
+        mode = self._compression_modes([key]).get(key)
+        if mode is None:
+            return
+        tag_id, compression, max_interval_ms = mode
+        if compression != CompressionMode.NONE.value:
+            for bucket, min_value, max_value, avg, _, _, last in self._aggregate_reconstructed(
+                key, compression, max_interval_ms, start_ts, end_ts, width
+            ):
+                yield bucket, min_value, max_value, avg, last
+            return
+
+        conn = sqlite3.connect(f"file:{self.db_file}?mode=ro", uri=True)
+        try:
+            conn.execute("BEGIN")
+            rollup = next(
+                (
+                    (name, rollup_width)
+                    for name, rollup_width in reversed(ROLLUPS)
+                    if width % rollup_width == 0
+                ),
+                None,
+            )
+            # 롤업이 있는 구간은 롤업에서, 그 앞(롤업을 만들기 전에 쌓였거나 롤업만 먼저
+            # 정리된 값)은 파티션에서 집계
+            covered_ts = end_ts
+            if rollup is not None:
+                name, rollup_width = rollup
+                first_bucket = conn.execute(
+                    f"SELECT MIN(bucket) FROM {rollup_table(name)} WHERE tag_id = ?", (tag_id,)
+                ).fetchone()[0]
+                if first_bucket is not None:
+                    covered_ts = min(max(first_bucket, start_ts), end_ts)
+            sources = []
+            if covered_ts > start_ts:
+                partitions = conn.execute(
+                    """
+                    SELECT key, tier, file_path FROM historian_partitions
+                    WHERE start_ts < ? AND end_ts > ?
+                    ORDER BY start_ts
+                    """,
+                    (covered_ts, start_ts),
+                ).fetchall()
+                sources.extend(
+                    _aggregate_table(conn, partition_table(partition), tag_id, start_ts, covered_ts, width)
+                    if tier == TIER_HOT
+                    else aggregate_partition(file_path, tag_id, start_ts, covered_ts, width)
+                    for partition, tier, file_path in partitions
+                )
+            if covered_ts < end_ts:
+                sources.append(
+                    _aggregate_table(
+                        conn, rollup_table(name), tag_id, covered_ts, end_ts, width, rollup_width
+                    )
+                )
+            # 구간이 파티션 경계에 걸치면 같은 구간이 이어서 나오므로 합침
+            pending: Optional[list] = None
+            for source in sources:
+                for bucket, min_value, max_value, total, count, last_ts, last in source:
+                    if pending is not None and pending[0] == bucket:
+                        pending[1] = min(pending[1], min_value)
+                        pending[2] = max(pending[2], max_value)
+                        pending[3] += total
+                        pending[4] += count
+                        if last_ts > pending[5]:
+                            pending[5], pending[6] = last_ts, last
+                        continue
+                    if pending is not None:
+                        yield _finish_bucket(pending)
+                    pending = [bucket, min_value, max_value, total, count, last_ts, last]
+            if pending is not None:
+                yield _finish_bucket(pending)
+        finally:
+            conn.close()
+
+    def read_trend(
+        self,
+        keys: Iterable[TagKey],
+        start_ts: int,
+        end_ts: int,
+        points: int = 300,
+        resolution: Optional[str] = None,
+    ) -> Tuple[str, Iterator[TrendRow]]:
+        """태그들의 추세를 롤업으로 조회
+
+        resolution을 주지 않으면 구간에 최소 points개의 점이 나오는 가장 거친 롤업을
+        고르고, 그런 롤업이 없으면 원시 값을 같은 형식으로 반환합니다. 롤업은 Parquet로
+        옮긴 기간도 SQLite에 남아 있으므로 긴 구간도 파일을 읽지 않습니다. 압축해 저장한
+        태그는 롤업 대신 복원한 값을 같은 폭으로 집계합니다 (avg는 시간 가중 평균).
+
+        Returns:
+            (사용한 해상도 "1m"/"1h"/"raw", 태그 순·시간순 행)
+        """
+        keys = list(keys)
+        if resolution is None:
+            resolution = choose_rollup(start_ts, end_ts, points) or "raw"
+        if resolution == "raw":
+            rows = (
+                (key, ts, value, value, value, int(value is not None), value, value)
+                for key, ts, value, _ in self.read(keys, start_ts, end_ts)
+            )
+            return resolution, rows
+        if resolution not in dict(ROLLUPS):
+            raise ValueError(f"지원하지 않는 해상도: {resolution}")
+        return resolution, self._read_rollup(keys, start_ts, end_ts, resolution)
+
+    def _read_rollup(
+        self, keys: List[TagKey], start_ts: int, end_ts: int, resolution: str
+    ) -> Iterator[TrendRow]:
+        width = dict(ROLLUPS)[resolution]
+        modes = self._compression_modes(keys)
+        conn = sqlite3.connect(f"file:{self.db_file}?mode=ro", uri=True)
+        try:
+            for key, (tag_id, compression, max_interval_ms) in sorted(
+                modes.items(), key=lambda item: item[1][0]
+            ):
+                if compression != CompressionMode.NONE.value:
+                    # 롤업은 저장 점만 집계하므로 압축 태그는 복원한 값을 집계 (aggregate 참고)
+                    for row in self._aggregate_reconstructed(
+                        key, compression, max_interval_ms, start_ts - start_ts % width, end_ts, width
+                    ):
+                        yield (key, *row)
+                    continue
+                rows = conn.execute(
+                    f"""
+                    SELECT bucket, min, max, sum / count, count, first, last
+                    FROM {rollup_table(resolution)}
+                    WHERE tag_id = ? AND bucket >= ? AND bucket < ?
+                    ORDER BY bucket
+                    """,
+                    (tag_id, start_ts - start_ts % width, end_ts),
+                )
+                for row in rows:
+                    yield (key, *row)
+        finally:
+            conn.close()
+
+    def lookup_tags(self, keys: Optional[Iterable[TagKey]] = None) -> Dict[TagKey, int]:
+        """keys 중 히스토리언에 등록된 태그의 {태그: tag_id} (keys가 없으면 모든 태그, DB가 아직 없으면 빈 사전)"""
+        try:
+            conn = sqlite3.connect(f"file:{self.db_file}?mode=ro", uri=True)
+            try:
+                if keys is None:
+                    return {
+                        (machine_name, tag_name): tag_id
+                        for tag_id, machine_name, tag_name in conn.execute(
+                            "SELECT tag_id, machine_name, tag_name FROM historian_tags"
+                        )
+                    }
+                return self._lookup_tag_ids(conn, keys)
+            finally:
+                conn.close()
+        except sqlite3.OperationalError:
+            return {}
+
+    def _lookup_tag_ids(
+        self, conn: sqlite3.Connection, keys: Iterable[TagKey]
+    ) -> Dict[TagKey, int]:
+        wanted = set(keys)
+        return {
+            (machine_name, tag_name): tag_id
+            for tag_id, machine_name, tag_name in conn.execute(
+                "SELECT tag_id, machine_name, tag_name FROM historian_tags"
+            )
+            if (machine_name, tag_name) in wanted
+        }
+
+    def archive_closed_partitions(self, now: Optional[datetime] = None) -> List[str]:
+        """최근 hot_partitions개보다 오래된 SQLite 파티션을 Parquet 파일로 옮기고 키 목록을 반환
+
+        파일 기록은 읽기 전용 연결로 하므로 그동안 수집 값 저장은 막히지 않습니다.
+        기록한 행 수가 테이블과 같을 때만 목록을 cold로 바꾸고 테이블을 삭제합니다.
+        """
+        cutoff = partition_bounds(
+            partition_key(to_epoch_ms(now or datetime.now()), self.partition)
+        )[0]
+        for _ in range(self.hot_partitions - 1):
+            cutoff = partition_bounds(partition_key(cutoff - 1, self.partition))[0]
+
+        with self._lock:
+            conn = self._ensure_connection()
+            closed = [
+                row[0]
+                for row in conn.execute(
+                    "SELECT key FROM historian_partitions WHERE tier = ? AND end_ts <= ? ORDER BY start_ts",
+                    (TIER_HOT, cutoff),
+                )
+            ]
+
+        archived = []
+        for key in closed:
+            table = partition_table(key)
+            path = os.path.join(self.archive_dir, f"{table}.parquet")
+            started = time.perf_counter()
+            reader = sqlite3.connect(f"file:{self.db_file}?mode=ro", uri=True)
+            try:
+                exported = export_partition(reader, table, path)
+            finally:
+                reader.close()
+
+            with self._lock:
+                conn = self._ensure_connection()
+                with conn:
+                    count = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                    if count != exported:
+                        logger.warning(
+                            f"히스토리언: 파티션 {key} 보관 중 값이 바뀌어 다음에 다시 시도 ({exported} -> {count}행)"
+                        )
+                        continue
+                    conn.execute(
+                        """
+                        UPDATE historian_partitions
+                        SET tier = ?, row_count = ?, file_path = ?, archived_at = ?
+                        WHERE key = ?
+                        """,
+                        (
+                            TIER_COLD,
+                            exported,
+                            path,
+                            datetime.now().isoformat(timespec="seconds"),
+                            key,
+                        ),
+                    )
+                    conn.execute(f"DROP TABLE {table}")
+                self._partitions[key] = TIER_COLD
+            archived.append(key)
+            logger.info(
+                f"히스토리언 파티션 보관: {key} ({exported}행, {os.path.getsize(path) / 1024:.0f}KB, {(time.perf_counter() - started) * 1000:.0f}ms)"
+            )
+        return archived
+
+    def drop_partitions_before(self, cutoff_ts: int) -> List[str]:
+        """cutoff_ts 이전에 끝나는 파티션을 삭제 (SQLite 테이블 또는 Parquet 파일)하고 키 목록을 반환"""
+        with self._lock:
+            conn = self._ensure_connection()
+            if not table_exists(conn, "historian_partitions"):
+                return []
+            expired = conn.execute(
+                "SELECT key, tier, file_path FROM historian_partitions WHERE end_ts <= ? ORDER BY start_ts",
+                (cutoff_ts,),
+            ).fetchall()
+        dropped = []
+        for key, tier, file_path in expired:
+            # 파티션 하나씩 짧은 트랜잭션으로 삭제해 그 사이에 수집 값 저장이 끼어들 수 있도록 함
+            with self._lock:
+                conn = self._ensure_connection()
+                with conn:
+                    if tier == TIER_HOT:
+                        conn.execute(f"DROP TABLE IF EXISTS {partition_table(key)}")
+                    conn.execute("DELETE FROM historian_partitions WHERE key = ?", (key,))
+                self._partitions.pop(key, None)
+            if tier != TIER_HOT and file_path:
+                try:
+                    os.remove(file_path)
+                except FileNotFoundError:
+                    pass
+            dropped.append(key)
+            logger.info(f"히스토리언 보관 기간 지난 파티션 삭제: {key} ({tier})")
+        return dropped
+
+    def delete_rollups_before(self, name: str, cutoff_ts: int, batch_rows: int) -> Iterator[int]:
+        """롤업 name에서 cutoff_ts 이전 구간을 batch_rows행씩 삭제하며 삭제한 행 수를 하나씩 반환
+
+        한 묶음마다 잠금과 트랜잭션을 놓으므로 호출한 쪽이 묶음 사이에 쉬어 갈 수 있습니다.
+        """
+        table = rollup_table(name)
+        with self._lock:
+            conn = self._ensure_connection()
+            if not table_exists(conn, table):
+                return
+            tag_ids = [row[0] for row in conn.execute("SELECT tag_id FROM historian_tags")]
+        for tag_id in tag_ids:
+            while True:
+                with self._lock:
+                    conn = self._ensure_connection()
+                    with conn:
+                        deleted = conn.execute(
+                            f"""
+                            DELETE FROM {table} WHERE tag_id = ? AND bucket IN (
+                                SELECT bucket FROM {table} WHERE tag_id = ? AND bucket < ?
+                                ORDER BY bucket LIMIT ?
+                            )
+                            """,
+                            (tag_id, tag_id, cutoff_ts, batch_rows),
+                        ).rowcount
+                if deleted:
+                    yield deleted
+                if deleted < batch_rows:
+                    break
+
+    def delete_wide_before(self, cutoff: datetime, batch_rows: int) -> Iterator[int]:
+        """외부 저장기의 넓은 테이블에서 cutoff 이전 행을 batch_rows행씩 삭제"""
+        if not self.wide_table:
+            return
+        with self._lock:
+            conn = self._ensure_connection()
+            if not table_exists(conn, self.wide_table):
+                return
+        timestamp = cutoff.strftime("%Y-%m-%d %H:%M:%S")
+        while True:
+            with self._lock:
+                conn = self._ensure_connection()
+                with conn:
+                    deleted = conn.execute(
+                        f"""
+                        DELETE FROM {self.wide_table} WHERE timestamp IN (
+                            SELECT timestamp FROM {self.wide_table} WHERE timestamp < ?
+                            ORDER BY timestamp LIMIT ?
+                        )
+                        """,
+                        (timestamp, batch_rows),
+                    ).rowcount
+            if deleted:
+                yield deleted
+            if deleted < batch_rows:
+                break
+
+    def incremental_vacuum(self, pages: int) -> Optional[int]:
+        """빈 페이지를 최대 pages개 파일에서 반환하고 남은 빈 페이지 수를 반환
+
+        auto_vacuum이 INCREMENTAL이 아닌 파일(PRAGMA 전에 만들어진 기존 파일)에서는
+        반환할 수 없으므로 아무것도 하지 않고 None을 반환합니다.
+        """
+        if pages <= 0:
+            # incremental_vacuum(0)은 빈 페이지를 모두 반환하므로 허용하지 않음
+            raise ValueError("pages는 1 이상이어야 합니다.")
+        with self._lock:
+            conn = self._ensure_connection()
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                return None
+            conn.execute(f"PRAGMA incremental_vacuum({pages})").fetchall()
+            return conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+def _finish_bucket(pending: list) -> AggregateRow:
+    bucket, min_value, max_value, total, count, _, last = pending
+    return bucket, min_value, max_value, total / count if count else None, last
+
+
+def _aggregate_table(
+    conn: sqlite3.Connection,
+    table: str,
+    tag_id: int,
+    start_ts: int,
+    end_ts: int,
+    width: int,
+    finer_width: Optional[int] = None,
+) -> Iterator[Tuple[int, float, float, float, int, int, float]]:
+    """원시 값 파티션 또는 롤업 테이블(finer_width)을 SQL로 구간 집계
+
+    Yields:
+        (bucket, min, max, sum, count, 마지막 값의 ts, 마지막 값)
+    """
+    rows = conn.execute(
+        f"{aggregate_sql(table, width, finer_width)} ORDER BY a.bucket",
+        (json.dumps([tag_id]), start_ts, end_ts),
+    )
+    for _, bucket, min_value, max_value, total, count, _, _, last_ts, last in rows:
+        yield bucket, min_value, max_value, total, count, last_ts, last
@@ -0,0 +1,221 @@
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.services.historian.schema import to_epoch_ms
+from app.services.historian.spool import Spool, SpoolRecord
+from app.services.historian.store import HistorianStore, Row, TagKey
+from app.core.logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class HistorianWriter:
+    """샘플을 메모리에 모았다가 한 트랜잭션으로 묶어 저장하는 쓰기 스레드
+
+    수집 쪽은 append로 버퍼에 넣기만 하고 바로 돌아갑니다. 쓰기 스레드는 버퍼가
+    flush_rows 행 이상 쌓이거나 flush_interval_ms가 지나면 executemany 한 번으로
+    저장합니다.
+
+    spool이 있으면 저장에 실패한 행은 디스크 스풀에 옮기고, 스풀이 비기 전까지는
+    새 행도 스풀 뒤에 이어 씁니다. 저장소가 돌아오면 스풀을 시각 순으로 먼저 저장한
+    뒤 버퍼를 저장하므로 장애 중의 값이 빠지지 않고, 서버가 재시작되어도 다음 시작 때
+    이어서 저장합니다. spool이 없거나 스풀에 쓸 수 없으면 실패한 행을 버퍼 앞에 되돌려
+    다음 저장 때 다시 시도하며, 버퍼가 max_buffer_rows를 넘으면 가장 오래된 행부터 버립니다.
+    """
+
+    # 저장 시간이 이 값을 넘으면 경고 로그를 남김 (ms)
+    SLOW_FLUSH_MS = 500
+    # 저장소 장애 중 스풀 저장을 다시 시도하는 간격 (초)
+    SPOOL_RETRY_INTERVAL = 5
+
+    def __init__(
+        self,
+        store: HistorianStore,
+        flush_rows: Optional[int] = None,
+        flush_interval_ms: Optional[int] = None,
+        max_buffer_rows: Optional[int] = None,
+        spool: Optional[Spool] = None,
+    ):
+        self.store = store
+        self.spool = spool
+        self._next_drain = 0.0
+        self.flush_rows = flush_rows or settings.HISTORIAN_FLUSH_ROWS
+        self.flush_interval = (flush_interval_ms or settings.HISTORIAN_FLUSH_INTERVAL_MS) / 1000
+        self.max_buffer_rows = max_buffer_rows or settings.HISTORIAN_MAX_BUFFER_ROWS
+        self._buffer: List[Row] = []
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        # 지표 (_condition 안에서 갱신)
+        self.max_buffered = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.written_rows = 0
+        self.duplicate_rows = 0
+        self.dropped_rows = 0
+        self.spooled_rows = 0
+        self.drained_rows = 0
+        self._flush_total_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.last_flush_ms = 0.0
+        self.last_flush_at: Optional[datetime] = None
+
+    def start(self):
+        self._stopping = False
+        self._thread = threading.Thread(
+            target=self._run, name="historian-writer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """남은 버퍼를 저장하고 쓰기 스레드 종료"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.spool is not None:
+            self.spool.close()
+
+    def append(self, timestamp: datetime, values: Dict[TagKey, Optional[float]]):
+        """한 시점의 값을 버퍼에 추가 (저장은 쓰기 스레드에서)"""
+        ts = to_epoch_ms(timestamp)
+        self.append_rows([(key, ts, value) for key, value in values.items()])
+
+    def append_rows(self, rows: List[Row]):
+        """(태그, ts, 값) 행들을 버퍼에 추가"""
+        if not rows:
+            return
+        with self._condition:
+            self._buffer.extend(rows)
+            self._trim()
+            self.max_buffered = max(self.max_buffered, len(self._buffer))
+            if len(self._buffer) >= self.flush_rows:
+                self._condition.notify()
+
+    def _run(self):
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._stopping or len(self._buffer) >= self.flush_rows,
+                    timeout=max(deadline - time.monotonic(), 0),
+                )
+                stopping = self._stopping
+            deadline = time.monotonic() + self.flush_interval
+            self.flush()
+            if stopping:
+                return
+
+    def flush(self) -> int:
+        """버퍼의 행을 지금 저장하고 새로 저장한 행 수를 반환"""
+        with self._condition:
+            rows, self._buffer = self._buffer, []
+        # 스풀에 남은 값이 있으면 시각 순서를 지키도록 먼저 저장
+        if self.spool is not None and self.spool.pending and not self._drain_spool():
+            self._spill(rows)
+            return 0
+        if not rows:
+            return 0
+
+        started = time.perf_counter()
+        try:
+            inserted = self.store.write_rows(rows)
+        except Exception as e:
+            logger.error(f"히스토리언 저장 실패 ({len(rows)}행): {e}")
+            with self._condition:
+                self.failed_flushes += 1
+            self._spill(rows)
+            return 0
+        flush_ms = (time.perf_counter() - started) * 1000
+
+        with self._condition:
+            self.flushes += 1
+            self.written_rows += inserted
+            self.duplicate_rows += len(rows) - inserted
+            self._flush_total_ms += flush_ms
+            self.max_flush_ms = max(self.max_flush_ms, flush_ms)
+            self.last_flush_ms = flush_ms
+            self.last_flush_at = datetime.now()
+        if inserted < len(rows):
+            logger.warning(f"히스토리언: 이미 저장된 시점의 값 {len(rows) - inserted}행을 건너뜀")
+        if flush_ms > self.SLOW_FLUSH_MS:
+            logger.warning(f"히스토리언 저장 지연: {len(rows)}행 {flush_ms:.1f}ms")
+        return inserted
+
+    def _drain_spool(self) -> bool:
+        """스풀의 값을 저장하고 스풀이 비었는지 반환 (실패하면 SPOOL_RETRY_INTERVAL 뒤에 다시 시도)"""
+        if time.monotonic() < self._next_drain:
+            return False
+        inserted = 0
+
+        def sink(records: List[SpoolRecord]):
+            nonlocal inserted
+            inserted += self.store.write_rows(
+                [((machine, tag), ts, value) for ts, values in records for machine, tag, value in values]
+            )
+
+        try:
+            drained = self.spool.drain(sink)
+        except Exception as e:
+            self._next_drain = time.monotonic() + self.SPOOL_RETRY_INTERVAL
+            logger.warning(f"히스토리언: 스풀 저장 실패 ({self.SPOOL_RETRY_INTERVAL}초 뒤 재시도): {e}")
+            return False
+        with self._condition:
+            self.drained_rows += drained
+            self.written_rows += inserted
+        logger.info(f"히스토리언: 스풀에 보관했던 값 {drained}행 저장 (새로 저장 {inserted}행)")
+        return True
+
+    def _spill(self, rows: List[Row]):
+        """저장하지 못한 행을 스풀에 옮김 (스풀이 없거나 쓸 수 없으면 버퍼 앞에 되돌림)"""
+        if not rows:
+            return
+        if self.spool is not None:
+            by_ts: Dict[int, list] = {}
+            for (machine, tag), ts, value in rows:
+                by_ts.setdefault(ts, []).append([machine, tag, value])
+            try:
+                self.spool.append(sorted(by_ts.items()))
+                with self._condition:
+                    self.spooled_rows += len(rows)
+                return
+            except OSError as e:
+                logger.error(f"히스토리언: 스풀 쓰기 실패, 메모리에 보관: {e}")
+        with self._condition:
+            self._buffer[:0] = rows
+            self._trim()
+
+    def _trim(self):
+        overflow = len(self._buffer) - self.max_buffer_rows
+        if overflow > 0:
+            del self._buffer[:overflow]
+            self.dropped_rows += overflow
+            logger.warning(f"히스토리언 버퍼 초과: 오래된 값 {overflow}행을 버림")
+
+    def stats(self) -> Dict[str, Any]:
+        """버퍼와 저장 지연 지표"""
+        with self._condition:
+            return {
+                "buffered": len(self._buffer),
+                "max_buffered": self.max_buffered,
+                "flushes": self.flushes,
+                "failed_flushes": self.failed_flushes,
+                "written_rows": self.written_rows,
+                "duplicate_rows": self.duplicate_rows,
+                "dropped_rows": self.dropped_rows,
+                "spooled_rows": self.spooled_rows,
+                "drained_rows": self.drained_rows,
+                "spool": self.spool.stats() if self.spool is not None else None,
+                "avg_flush_ms": round(self._flush_total_ms / self.flushes, 3)
+                if self.flushes
+                else 0.0,
+                "max_flush_ms": round(self.max_flush_ms, 3),
+                "last_flush_ms": round(self.last_flush_ms, 3),
+                "last_flush_at": self.last_flush_at.isoformat(timespec="seconds")
+                if self.last_flush_at
+                else None,
+            }
@@ -1,7 +1,14 @@
 # app/services/modbus/analog.py
-from typing import Dict
+import asyncio
+from typing import Dict, Iterable, List, Tuple
+from pymodbus.client import ModbusTcpClient
 from app.services.exceptions import ModbusReadError, ModbusWriteError
 from app.services.modbus.client import ModbusClientManager
+from app.services.modbus.register_map import (
+    DEFAULT_REGISTER_RANGES,
+    coalesce_ranges,
+    split_range,
+)
 
 
 class AnalogService:
@@ -26,32 +33,66 @@ class AnalogService:
                 raise ModbusWriteError(f"아날로그 레지스터 {register}의 값 쓰기 실패")
             return result.registers[0]
 
+    async def read_range(self, start: int, count: int) -> List[int]:
+        """연속된 레지스터 범위를 읽어 주소 순서의 값 목록으로 반환"""
+        register_map = await self._read_blocks(split_range(start, count))
+        return [register_map[start + i] for i in range(count)]
+
+    async def read_ranges(
+        self, ranges: Iterable[Tuple[int, int]], max_gap: int = 0
+    ) -> Dict[int, int]:
+        """여러 레지스터 범위를 합쳐서 읽기
+
+        겹치거나 max_gap 이내로 가까운 범위는 하나의 요청으로 합칩니다.
+        합친 요청이 실패하면(빈 구간이 장비에 없는 주소인 경우 등) 원래 범위로
+        나누어 다시 읽습니다.
+
+        Returns:
+            Dict[int, int]: 요청한 범위에 속한 레지스터 주소 -> 값
+        """
+        requested = coalesce_ranges(ranges)
+        if max_gap <= 0:
+            return await self._read_blocks(requested)
+
+        blocks = coalesce_ranges(requested, max_gap)
+        try:
+            values = await self._read_blocks(blocks)
+        except ModbusReadError:
+            return await self._read_blocks(requested)
+
+        register_map = {}
+        for start, count in requested:
+            for register in range(start, start + count):
+                register_map[register] = values[register]
+        return register_map
+
     async def read_all_values(self) -> Dict[int, int]:
         """모든 아날로그 값 읽기"""
-        register_map = {}
-        register_ranges = [
-            (1220, 6),  # 1220-1225
-            (2000, 11),  # 2000-2010
-            (2100, 21),  # 2100-2120
-            (2300, 11),  # 2300-2310
-            (2330, 6),  # 2330-2335
-            (2500, 11),  # 2500-2510
-            (2701, 5),  # 2701-2705
-            (2901, 2),  # 2901-2902
-            (1200, 11),  # 1200-1210
-        ]
+        return await self.read_ranges(DEFAULT_REGISTER_RANGES)
 
-        with self.client_manager.connect() as client:
-            for start_addr, count in register_ranges:
-                response = client.read_holding_registers(
-                    start_addr, count=count, slave=self.client_manager.slave
-                )
-                if response.isError():
-                    raise ModbusReadError(
-                        f"레지스터 범위 {start_addr}-{start_addr+count-1} 읽기 실패"
-                    )
-
-                for i, value in enumerate(response.registers):
-                    register_map[start_addr + i] = value
+    async def _read_blocks(self, blocks: List[Tuple[int, int]]) -> Dict[int, int]:
+        """블록들을 동시에 요청하고 주소 -> 값 매핑으로 합침
 
+        블록 요청은 스레드에서 실행되어 이벤트 루프를 막지 않으며,
+        같은 연결을 공유하는 요청은 pymodbus 트랜잭션 잠금으로 순서가 보장됩니다.
+        """
+        register_map: Dict[int, int] = {}
+        with self.client_manager.connect() as client:
+            results = await asyncio.gather(
+                *[
+                    asyncio.to_thread(self._read_block, client, start, count)
+                    for start, count in blocks
+                ]
+            )
+        for (start, _), values in zip(blocks, results):
+            for i, value in enumerate(values):
+                register_map[start + i] = value
         return register_map
+
+    def _read_block(self, client: ModbusTcpClient, start: int, count: int) -> List[int]:
+        response = client.read_holding_registers(
+            start, count=count, slave=self.client_manager.slave
+        )
+        if response.isError():
+            raise ModbusReadError(f"레지스터 범위 {start}-{start+count-1} 읽기 실패")
+        return response.registers
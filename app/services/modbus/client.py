@@ -1,17 +1,24 @@
 # app/services/modbus/client.py
+import asyncio
 from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 import sqlite3
-from typing import Dict, Optional
+import time
+from typing import Any, Callable, Dict, Optional, TypeVar
 from pymodbus.client import ModbusTcpClient
 from contextlib import contextmanager
 import os
+import threading
 from app.core.logging_config import setup_logger
 from app.models.schemas import TagType, MachineConfig, Permission, TagConfig
 from app.core.config import settings
 from app.services.exceptions import CustomException, ErrorCode, ModbusConnectionError
+from app.services.modbus.migrations import get_schema_version, migrate
 
 logger = setup_logger(__name__)
 
+T = TypeVar("T")
+
 
 class ModbusClientManager:
     _instances: Dict[str, "ModbusClientManager"] = {}
@@ -91,38 +98,153 @@ class ModbusClientManager:
         cls._clients.clear()
 
 
+class DatabaseExecutor:
+    """SQLite 작업을 전용 스레드 하나에서 순서대로 실행하는 실행기
+
+    async 라우트가 동기 SQLite 호출로 이벤트 루프를 막지 않도록 작업을 이 스레드로
+    넘기고 결과를 await 합니다. 쓰기는 어차피 하나씩만 가능하므로 스레드도 하나만 둡니다.
+    """
+
+    # 대기 시간이 이 값을 넘으면 경고 로그를 남김 (ms)
+    SLOW_WAIT_MS = 500
+
+    def __init__(self, name: str = "sqlite"):
+        self.name = name
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stats_lock = threading.Lock()
+        self.pending = 0
+        self.max_pending = 0
+        self.completed = 0
+        self.failed = 0
+        self._wait_total = 0.0
+        self._run_total = 0.0
+        self.max_wait_ms = 0.0
+        self.max_run_ms = 0.0
+
+    def submit(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> Future:
+        """fn(*args, **kwargs)를 DB 스레드 대기열에 넣고 바로 Future를 반환
+
+        결과를 기다릴 필요가 없는 쓰기(write-behind)는 이 메소드를 직접 사용합니다.
+        어느 스레드에서든 호출할 수 있습니다.
+        """
+        submitted = time.perf_counter()
+
+        def call():
+            started = time.perf_counter()
+            failed = False
+            try:
+                return fn(*args, **kwargs)
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                self._record(fn, submitted, started, time.perf_counter(), failed)
+
+        with self._stats_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix=self.name
+                )
+            self.pending += 1
+            self.max_pending = max(self.max_pending, self.pending)
+            return self._executor.submit(call)
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """fn(*args, **kwargs)를 DB 스레드에서 실행하고 결과를 반환"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def _record(
+        self,
+        fn: Callable,
+        submitted: float,
+        started: float,
+        finished: float,
+        failed: bool,
+    ):
+        wait_ms = (started - submitted) * 1000
+        run_ms = (finished - started) * 1000
+        with self._stats_lock:
+            self.pending -= 1
+            self.completed += 1
+            if failed:
+                self.failed += 1
+            self._wait_total += wait_ms
+            self._run_total += run_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            self.max_run_ms = max(self.max_run_ms, run_ms)
+        if wait_ms > self.SLOW_WAIT_MS:
+            logger.warning(
+                f"DB 작업 대기 지연: {getattr(fn, '__qualname__', repr(fn))} - 대기 {wait_ms:.1f}ms, 실행 {run_ms:.1f}ms (대기열 {self.pending})"
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """DB 작업 대기열 지표"""
+        return {
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_wait_ms": round(self._wait_total / self.completed, 3)
+            if self.completed
+            else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 3),
+            "avg_run_ms": round(self._run_total / self.completed, 3)
+            if self.completed
+            else 0.0,
+            "max_run_ms": round(self.max_run_ms, 3),
+        }
+
+    def shutdown(self):
+        """남은 작업이 끝날 때까지 기다린 뒤 스레드 종료 (다음 작업 시 다시 생성)"""
+        with self._stats_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
 class DatabaseClientManager:
+    # 연결마다 유지할 준비된 SQL 문 캐시 크기
+    STATEMENT_CACHE_SIZE = 256
+    # 다른 프로세스가 쓰기 잠금을 잡고 있을 때 기다릴 최대 시간 (ms)
+    BUSY_TIMEOUT_MS = 5000
+
     def __init__(self, db_name: str):
         """데이터베이스 클라이언트 매니저 초기화
 
+        하나의 연결을 계속 재사용하며, 여러 스레드에서의 접근은 잠금으로 직렬화합니다.
+
         Args:
             db_name (str): 데이터베이스 파일 경로
         """
         self.db_name = db_name
         self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._depth = 0
+        self.executor = DatabaseExecutor()
         self.initialize_database()
         self.load_modbus_config()
 
-    @contextmanager
-    def get_connection(self):
-        """데이터베이스 연결을 제공하는 컨텍스트 매니저
-
-        Yields:
-            sqlite3.Connection: 데이터베이스 연결 객체
-
-        Raises:
-            sqlite3.Error: 데이터베이스 연결 또는 조작 중 발생하는 오류
-        """
+    def _ensure_connection(self) -> sqlite3.Connection:
+        """연결이 없으면 WAL 모드의 장기 연결을 생성"""
         if self._connection is None:
             try:
-                self._connection = sqlite3.connect(
+                connection = sqlite3.connect(
                     self.db_name,
                     detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+                    check_same_thread=False,
+                    # 트랜잭션은 get_connection에서 직접 BEGIN/COMMIT으로 관리
+                    isolation_level=None,
+                    cached_statements=self.STATEMENT_CACHE_SIZE,
                 )
+                connection.execute("PRAGMA journal_mode = WAL")
+                # WAL 모드에서는 NORMAL로도 전원 차단 시 DB 손상이 없음 (마지막 커밋만 유실 가능)
+                connection.execute("PRAGMA synchronous = NORMAL")
+                connection.execute(f"PRAGMA busy_timeout = {self.BUSY_TIMEOUT_MS}")
                 # 외래 키 제약 조건 활성화
-                self._connection.execute("PRAGMA foreign_keys = ON")
+                connection.execute("PRAGMA foreign_keys = ON")
                 # Row를 딕셔너리 형태로 반환하도록 설정
-                self._connection.row_factory = sqlite3.Row
+                connection.row_factory = sqlite3.Row
+                self._connection = connection
 
             except sqlite3.Error as e:
                 logger.error(f"데이터베이스 연결 실패: {e}")
@@ -131,82 +253,130 @@ class DatabaseClientManager:
                     status_code=500,
                     message=f"데이터베이스 연결 실패: {e}",
                 )
+        return self._connection
 
-        try:
-            yield self._connection
-            self._connection.commit()
-        except Exception as e:
-            self._connection.rollback()
-            logger.error(f"데이터베이스 작업 실패: {e}")
-            raise CustomException(
-                error_code=ErrorCode.DATABASE_ERROR,
-                status_code=500,
-                message=f"데이터베이스 작업 실패: {e}",
-            )
-        finally:
-            if self._connection:
-                self._connection.close()
-                self._connection = None
+    @contextmanager
+    def get_connection(self, immediate: bool = False):
+        """트랜잭션 범위를 제공하는 컨텍스트 매니저
 
-    def initialize_database(self):
-        db_exists = os.path.exists(self.db_name)
+        가장 바깥 범위에서 트랜잭션을 시작하고 끝나면 커밋합니다. 중첩된 범위는
+        SAVEPOINT로 처리되어 안쪽에서 오류가 나면 그 범위만 롤백됩니다.
 
-        if not db_exists:
-            try:
-                with self.get_connection() as conn:
-                    cursor = conn.cursor()
-
-                    # machines 테이블 생성
-                    cursor.execute(
-                        """
-                    CREATE TABLE machines (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        name TEXT UNIQUE NOT NULL,
-                        ip_address TEXT NOT NULL,
-                        port INTEGER NOT NULL,
-                        slave INTEGER NOT NULL
-                    )
-                    """
-                    )
+        Args:
+            immediate (bool): 쓰기 작업용으로 시작 시점에 쓰기 잠금을 잡을지 여부
 
-                    # tags 테이블 생성
-                    cursor.execute(
-                        """
-                    CREATE TABLE tags (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        machine_id INTEGER NOT NULL,
-                        tag_name TEXT NOT NULL,
-                        tag_type TEXT NOT NULL,
-                        logical_register TEXT NOT NULL,
-                        real_register TEXT NOT NULL,
-                        permission TEXT NOT NULL,
-                        FOREIGN KEY (machine_id) REFERENCES machines(id) ON DELETE CASCADE
-                    )
-                    """
-                    )
+        Yields:
+            sqlite3.Connection: 데이터베이스 연결 객체
 
-                    cursor.execute(
-                        """
-                    CREATE TABLE autocontrol (
-                        id INTEGER PRIMARY KEY CHECK (id = 1),
-                        enabled BOOLEAN NOT NULL DEFAULT 0,
-                        last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                    """
-                    )
-                    logger.info(
-                        f"데이터베이스 '{self.db_name}'와 테이블들이 성공적으로 생성되었습니다."
-                    )
+        Raises:
+            CustomException: 데이터베이스 연결 또는 조작 중 발생하는 오류
+            sqlite3.IntegrityError: 제약 조건 위반 (롤백 후 그대로 전달)
+        """
+        with self._lock:
+            connection = self._ensure_connection()
+            savepoint = f"sp_{self._depth}"
+            try:
+                if self._depth == 0:
+                    connection.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+                else:
+                    connection.execute(f"SAVEPOINT {savepoint}")
             except sqlite3.Error as e:
-                logger.error(f"데이터베이스 생성 중 오류 발생: {e}")
+                # 쓰기 잠금 대기 시간 초과 등 (트랜잭션은 시작되지 않았으므로 롤백할 것이 없음)
+                logger.error(f"데이터베이스 트랜잭션 시작 실패: {e}")
                 raise CustomException(
                     error_code=ErrorCode.DATABASE_ERROR,
                     status_code=500,
-                    message=f"데이터베이스 생성 중 오류 발생: {e}",
+                    message=f"데이터베이스 트랜잭션 시작 실패: {e}",
                 )
+            self._depth += 1
+
+            try:
+                yield connection
+            except Exception as e:
+                self._depth -= 1
+                self._rollback(connection, savepoint)
+                if isinstance(e, (CustomException, sqlite3.IntegrityError)):
+                    raise
+                logger.error(f"데이터베이스 작업 실패: {e}")
+                raise CustomException(
+                    error_code=ErrorCode.DATABASE_ERROR,
+                    status_code=500,
+                    message=f"데이터베이스 작업 실패: {e}",
+                )
+            else:
+                self._depth -= 1
+                try:
+                    if self._depth == 0:
+                        connection.execute("COMMIT")
+                    else:
+                        connection.execute(f"RELEASE {savepoint}")
+                except sqlite3.Error as e:
+                    # 커밋에 실패하면 트랜잭션이 열린 채 남아 이후 BEGIN이 모두 실패하므로 롤백
+                    self._rollback(connection, savepoint)
+                    logger.error(f"데이터베이스 커밋 실패: {e}")
+                    raise CustomException(
+                        error_code=ErrorCode.DATABASE_ERROR,
+                        status_code=500,
+                        message=f"데이터베이스 커밋 실패: {e}",
+                    )
+
+    def transaction(self):
+        """쓰기 잠금을 먼저 잡는 명시적 트랜잭션 범위"""
+        return self.get_connection(immediate=True)
+
+    def _rollback(self, connection: sqlite3.Connection, savepoint: str):
+        try:
+            if self._depth == 0:
+                connection.execute("ROLLBACK")
+            else:
+                connection.execute(f"ROLLBACK TO {savepoint}")
+                connection.execute(f"RELEASE {savepoint}")
+        except sqlite3.Error as e:
+            logger.error(f"데이터베이스 롤백 실패: {e}")
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """동기 DB 작업을 전용 DB 스레드에서 실행하고 결과를 기다림
+
+        async 라우트에서는 DB를 건드리는 서비스 메소드를 직접 호출하지 않고
+        ``await db.run(service.method, ...)`` 형태로 호출합니다.
+        """
+        return await self.executor.run(fn, *args, **kwargs)
+
+    def close(self):
+        """장기 연결 종료 (서버 종료 시 사용)"""
+        self.executor.shutdown()
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+                logger.info(f"데이터베이스 연결 종료: {self.db_name}")
+
+    def initialize_database(self):
+        """스키마를 생성하거나 기존 데이터베이스를 최신 버전으로 마이그레이션"""
+        db_exists = os.path.exists(self.db_name)
+        try:
+            with self.transaction() as conn:
+                previous = get_schema_version(conn)
+                version = migrate(conn)
+        except sqlite3.Error as e:
+            logger.error(f"데이터베이스 초기화 중 오류 발생: {e}")
+            raise CustomException(
+                error_code=ErrorCode.DATABASE_ERROR,
+                status_code=500,
+                message=f"데이터베이스 초기화 중 오류 발생: {e}",
+            )
+
+        if not db_exists:
+            logger.info(
+                f"데이터베이스 '{self.db_name}'와 테이블들이 성공적으로 생성되었습니다. (스키마 v{version})"
+            )
+        elif previous != version:
+            logger.info(
+                f"데이터베이스 '{self.db_name}' 스키마를 v{previous}에서 v{version}으로 마이그레이션했습니다."
+            )
         else:
             logger.info(
-                f"데이터베이스 '{self.db_name}'가 이미 존재해서 생성을 건너뜁니다."
+                f"데이터베이스 '{self.db_name}'가 이미 최신 스키마(v{version})입니다."
             )
 
     def execute_query(self, query: str, params: tuple = ()) -> list:
@@ -235,6 +405,35 @@ class DatabaseClientManager:
                     message=f"쿼리 실행 실패: {e}\n쿼리: {query}\n파라미터: {params}",
                 )
 
+    def execute_write(self, query: str, params: tuple = ()) -> int:
+        """INSERT/UPDATE/DELETE 쿼리를 실행하고 영향받은 행 수를 반환
+
+        제약 조건 위반은 호출한 쪽에서 상황에 맞는 오류로 바꿀 수 있도록
+        sqlite3.IntegrityError를 그대로 전달합니다.
+
+        Args:
+            query (str): 실행할 SQL 쿼리
+            params (tuple, optional): 쿼리 파라미터. Defaults to ().
+
+        Returns:
+            int: 영향받은 행 수
+
+        Raises:
+            sqlite3.IntegrityError: UNIQUE, FOREIGN KEY 등 제약 조건 위반
+        """
+        with self.get_connection(immediate=True) as conn:
+            try:
+                return conn.execute(query, params).rowcount
+            except sqlite3.IntegrityError:
+                raise
+            except sqlite3.Error as e:
+                logger.error(f"쿼리 실행 실패: {e}\n쿼리: {query}\n파라미터: {params}")
+                raise CustomException(
+                    error_code=ErrorCode.DATABASE_ERROR,
+                    status_code=500,
+                    message=f"쿼리 실행 실패: {e}\n쿼리: {query}\n파라미터: {params}",
+                )
+
     def execute_many(self, query: str, params_list: list[tuple]) -> None:
         """여러 SQL 쿼리를 한 번에 실행
 
@@ -1,4 +1,6 @@
 from datetime import datetime
+import threading
+from typing import Any, Dict, Optional
 from zoneinfo import ZoneInfo
 from app.services.modbus.client import DatabaseClientManager
 from app.models.schemas import ServiceResult
@@ -7,99 +9,98 @@ from app.core.logging_config import setup_logger
 logger = setup_logger(__name__)
 
 class AutoControllDAO:
-    """자동운전 상태를 데이터베이스에서 관리하는 클래스"""
-    
+    """자동운전 상태를 관리하는 클래스
+
+    상태(활성화 여부, 마지막 변경 시각)는 메모리에 두고 이를 기준으로 응답합니다.
+    데이터베이스는 재시작 후 복원용으로, 변경 시 DB 스레드에서 뒤늦게(write-behind) 저장합니다.
+    테이블은 설정 DB 마이그레이션에서 생성됩니다.
+    """
+
+    # 프로세스 전체에서 공유하는 자동운전 상태 (None이면 아직 DB에서 읽지 않음)
+    _state: Optional[Dict[str, Any]] = None
+    _lock = threading.Lock()
+
     def __init__(self, db_client: DatabaseClientManager):
         self.db_client = db_client
-        self._ensure_table()
-    
-    def _ensure_table(self):
-        """자동운전 테이블이 있는지 확인하고 없으면 생성합니다."""
-        with self.db_client.get_connection() as conn:
-            cursor = conn.cursor()
 
-            # 테이블 존재 여부 확인
-            cursor.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table' AND name='autocontrol'
-            """)
+    def load(self) -> Dict[str, Any]:
+        """저장된 자동운전 상태를 메모리로 읽어옴 (이미 읽었으면 그대로 반환)"""
+        with AutoControllDAO._lock:
+            if AutoControllDAO._state is None:
+                AutoControllDAO._state = self._read_state()
+            return AutoControllDAO._state
+
+    def _read_state(self) -> Dict[str, Any]:
+        rows = self.db_client.execute_query(
+            "SELECT enabled, last_updated FROM autocontrol WHERE id = 1"
+        )
+        if not rows:
+            return {"enabled": False, "last_updated": None}
+
+        utc_time = rows[0]["last_updated"]
+        if utc_time.tzinfo is None:
+            utc_time = utc_time.replace(tzinfo=ZoneInfo("UTC"))
+        return {
+            "enabled": bool(rows[0]["enabled"]),
+            "last_updated": utc_time.astimezone(ZoneInfo("Asia/Seoul")).isoformat(),
+        }
 
-            if not cursor.fetchone():
-                # 테이블 생성
-                cursor.execute("""
-                    CREATE TABLE autocontrol (
-                        id INTEGER PRIMARY KEY CHECK (id = 1),
-                        enabled BOOLEAN NOT NULL DEFAULT 0,
-                        last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                logger.info("autocontrol 테이블이 생성되었습니다.")
-    
     def set_autocontrol(self, enabled: bool) -> ServiceResult:
-        """시스템 전체의 자동운전 상태를 설정합니다."""
-        with self.db_client.get_connection() as conn:
-            cursor = conn.cursor()
-            try:
-                # 레코드가 있는지 확인
-                cursor.execute("SELECT COUNT(*) as count FROM autocontrol")
-                if cursor.fetchone()["count"] == 0:
-                    # 첫 번째 레코드 삽입
-                    cursor.execute(
-                        "INSERT INTO autocontrol (id, enabled, last_updated) VALUES (1, ?, CURRENT_TIMESTAMP)",
-                        (enabled,)
-                    )
-                else:
-                    # 기존 레코드 업데이트
-                    cursor.execute(
-                        "UPDATE autocontrol SET enabled = ?, last_updated = CURRENT_TIMESTAMP WHERE id = 1",
-                        (enabled,)
-                    )
+        """시스템 전체의 자동운전 상태를 설정합니다.
 
-                state_text = "활성화" if enabled else "비활성화"
-                return ServiceResult(
-                    success=True,
-                    message=f"자동운전이 {state_text} 되었습니다.",
-                    data={"enabled": enabled}
-                )
-            except Exception as e:
-                logger.error(f"자동운전 상태 변경 중 오류: {e}")
-                return ServiceResult(
-                    success=False,
-                    message=f"자동운전 상태 변경 중 오류가 발생했습니다: {e}"
-                )
-    
-    def get_autocontrol(self) -> ServiceResult:
-        """시스템의 자동운전 상태를 조회합니다."""
-        with self.db_client.get_connection() as conn:
-            cursor = conn.cursor()
-            try:
-                cursor.execute("SELECT enabled, last_updated FROM autocontrol WHERE id = 1")
-                result = cursor.fetchone()
+        메모리 상태를 즉시 바꾸고, DB 저장은 DB 스레드 대기열에 넣은 뒤 기다리지 않습니다.
+        """
+        now = datetime.now(ZoneInfo("UTC")).replace(microsecond=0)
+        with AutoControllDAO._lock:
+            AutoControllDAO._state = {
+                "enabled": enabled,
+                "last_updated": now.astimezone(ZoneInfo("Asia/Seoul")).isoformat(),
+            }
+        future = self.db_client.executor.submit(self._persist, enabled, now)
+        future.add_done_callback(self._log_persist_error)
+
+        state_text = "활성화" if enabled else "비활성화"
+        return ServiceResult(
+            success=True,
+            message=f"자동운전이 {state_text} 되었습니다.",
+            data={"enabled": enabled}
+        )
+
+    def _persist(self, enabled: bool, updated_at: datetime):
+        self.db_client.execute_write(
+            """
+            INSERT INTO autocontrol (id, enabled, last_updated) VALUES (1, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                enabled = excluded.enabled, last_updated = excluded.last_updated
+            """,
+            (enabled, updated_at.strftime("%Y-%m-%d %H:%M:%S")),
+        )
 
-                if not result:
-                    # 설정이 없는 경우
-                    return ServiceResult(
-                        success=True,
-                        message="자동운전 상태가 설정되지 않았습니다. 기본값은 비활성화입니다.",
-                        data={"enabled": False}
-                    )
-                
-                utc_time = result["last_updated"]
-                if utc_time.tzinfo is None:
-                    utc_time = utc_time.replace(tzinfo=ZoneInfo("UTC"))
-                kst_time = utc_time.astimezone(ZoneInfo("Asia/Seoul"))
+    @staticmethod
+    def _log_persist_error(future):
+        if future.exception() is not None:
+            logger.error(f"자동운전 상태 저장 중 오류: {future.exception()}")
+
+    def get_autocontrol(self) -> ServiceResult:
+        """시스템의 자동운전 상태를 조회합니다. (메모리 상태 반환)"""
+        try:
+            state = AutoControllDAO._state or self.load()
+        except Exception as e:
+            logger.error(f"자동운전 상태 조회 중 오류: {e}")
+            return ServiceResult(
+                success=False,
+                message=f"자동운전 상태 조회 중 오류가 발생했습니다: {e}"
+            )
 
-                return ServiceResult(
-                    success=True,
-                    message="자동운전 상태를 조회했습니다.",
-                    data={
-                        "enabled": bool(result["enabled"]),
-                        "last_updated": kst_time.isoformat()
-                    }
-                )
-            except Exception as e:
-                logger.error(f"자동운전 상태 조회 중 오류: {e}")
-                return ServiceResult(
-                    success=False,
-                    message=f"자동운전 상태 조회 중 오류가 발생했습니다: {e}"
-                )
\ No newline at end of file
+        if state["last_updated"] is None:
+            # 설정이 없는 경우
+            return ServiceResult(
+                success=True,
+                message="자동운전 상태가 설정되지 않았습니다. 기본값은 비활성화입니다.",
+                data={"enabled": False}
+            )
+        return ServiceResult(
+            success=True,
+            message="자동운전 상태를 조회했습니다.",
+            data=dict(state)
+        )
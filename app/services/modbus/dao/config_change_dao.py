@@ -0,0 +1,136 @@
+import json
+from typing import Any, Dict, Iterable, Optional, Tuple
+from zoneinfo import ZoneInfo
+from app.models.schemas import MachineConfig, TagConfig
+from app.services.modbus.client import DatabaseClientManager
+from app.core.logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+# (entity, machine_name, tag_name, action, data)
+ChangeRow = Tuple[str, str, Optional[str], str, Optional[str]]
+
+
+def machine_change(
+    machine_name: str, action: str, machine_config: Optional[MachineConfig] = None
+) -> ChangeRow:
+    """기계 변경 이력 행 (태그는 별도의 태그 변경으로 기록)"""
+    data = (
+        json.dumps(
+            {
+                "ip": machine_config.ip,
+                "port": machine_config.port,
+                "slave": machine_config.slave,
+            }
+        )
+        if machine_config is not None
+        else None
+    )
+    return ("machine", machine_name, None, action, data)
+
+
+def tag_change(
+    machine_name: str,
+    tag_name: str,
+    action: str,
+    tag_config: Optional[TagConfig] = None,
+) -> ChangeRow:
+    """태그 변경 이력 행"""
+    data = tag_config.model_dump_json() if tag_config is not None else None
+    return ("tag", machine_name, tag_name, action, data)
+
+
+class ConfigChangeDAO:
+    """기계/태그 설정 변경 이력(config_changes)을 기록하고 조회하는 클래스
+
+    각 변경은 단조 증가하는 버전 번호를 받습니다. 같은 대상(기계 또는 태그)의
+    이전 이력은 최신 이력에 의해 대체되므로 주기적으로 정리(compaction)합니다.
+    정리 후에도 어떤 버전 이후의 이력을 순서대로 적용하면 같은 최종 상태가 됩니다.
+    테이블은 설정 DB 마이그레이션(v4)에서 생성됩니다.
+    """
+
+    # 버전이 이 수만큼 늘어날 때마다 대체된 이력을 정리
+    COMPACT_EVERY = 1000
+
+    def __init__(self, db_client: DatabaseClientManager):
+        self.db_client = db_client
+
+    def record(self, changes: Iterable[ChangeRow]):
+        """변경 이력을 기록합니다.
+
+        설정 변경과 같은 트랜잭션 안에서 호출해야 이력과 설정이 어긋나지 않습니다.
+        """
+        rows = list(changes)
+        if not rows:
+            return
+        with self.db_client.get_connection(immediate=True) as conn:
+            conn.executemany(
+                """
+                INSERT INTO config_changes (entity, machine_name, tag_name, action, data)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            version = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            if version // self.COMPACT_EVERY != (version - len(rows)) // self.COMPACT_EVERY:
+                self.compact()
+
+    def list_since(self, since: int, limit: int) -> Dict[str, Any]:
+        """since 이후의 변경 이력을 버전 순으로 반환합니다.
+
+        Returns:
+            Dict[str, Any]: since, 마지막으로 반환한 버전(version), 현재 최신 버전(latest),
+                남은 이력이 있는지(has_more), 변경 목록(changes)
+        """
+        with self.db_client.get_connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT version, entity, machine_name, tag_name, action, data, changed_at
+                FROM config_changes
+                WHERE version > ?
+                ORDER BY version
+                LIMIT ?
+                """,
+                (since, limit + 1),
+            ).fetchall()
+            latest = conn.execute(
+                "SELECT COALESCE(MAX(version), 0) FROM config_changes"
+            ).fetchone()[0]
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "since": since,
+            "version": rows[-1]["version"] if rows else latest,
+            "latest": latest,
+            "has_more": has_more,
+            "changes": [
+                {
+                    "version": row["version"],
+                    "entity": row["entity"],
+                    "action": row["action"],
+                    "machine_name": row["machine_name"],
+                    "tag_name": row["tag_name"],
+                    "config": json.loads(row["data"]) if row["data"] else None,
+                    "changed_at": row["changed_at"]
+                    .replace(tzinfo=ZoneInfo("UTC"))
+                    .astimezone(ZoneInfo("Asia/Seoul"))
+                    .isoformat(),
+                }
+                for row in rows
+            ],
+        }
+
+    def compact(self) -> int:
+        """같은 대상의 최신 이력만 남기고 대체된 이력을 삭제합니다. 삭제한 행 수를 반환합니다."""
+        deleted = self.db_client.execute_write(
+            """
+            DELETE FROM config_changes WHERE version NOT IN (
+                SELECT MAX(version) FROM config_changes
+                GROUP BY entity, machine_name, tag_name
+            )
+            """
+        )
+        if deleted:
+            logger.info(f"설정 변경 이력 정리: {deleted}건 삭제")
+        return deleted
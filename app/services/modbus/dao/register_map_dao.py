@@ -0,0 +1,50 @@
+import json
+from typing import Dict, List, Optional, Tuple
+from app.services.modbus.client import DatabaseClientManager
+from app.core.logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class RegisterMapDAO:
+    """이름이 붙은 레지스터 맵을 데이터베이스에서 관리하는 클래스"""
+
+    def __init__(self, db_client: DatabaseClientManager):
+        # register_maps 테이블은 설정 DB 마이그레이션(v2)에서 생성됩니다.
+        self.db_client = db_client
+
+    def list_maps(self) -> Dict[str, List[Tuple[int, int]]]:
+        """저장된 모든 레지스터 맵을 반환합니다."""
+        rows = self.db_client.execute_query("SELECT name, ranges FROM register_maps")
+        return {row["name"]: _decode_ranges(row["ranges"]) for row in rows}
+
+    def get_map(self, name: str) -> Optional[List[Tuple[int, int]]]:
+        """저장된 레지스터 맵을 조회합니다. 없으면 None을 반환합니다."""
+        rows = self.db_client.execute_query(
+            "SELECT ranges FROM register_maps WHERE name = ?", (name,)
+        )
+        return _decode_ranges(rows[0]["ranges"]) if rows else None
+
+    def save_map(self, name: str, ranges: List[Tuple[int, int]]):
+        """레지스터 맵을 저장합니다. 같은 이름이 있으면 덮어씁니다."""
+        self.db_client.execute_query(
+            """
+            INSERT INTO register_maps (name, ranges) VALUES (?, ?)
+            ON CONFLICT(name) DO UPDATE SET ranges = excluded.ranges
+            """,
+            (name, json.dumps([list(r) for r in ranges])),
+        )
+        logger.info(f"레지스터 맵 저장: {name} ({len(ranges)}개 범위)")
+
+    def delete_map(self, name: str) -> bool:
+        """레지스터 맵을 삭제합니다. 삭제되었으면 True를 반환합니다."""
+        deleted = self.db_client.execute_write(
+            "DELETE FROM register_maps WHERE name = ?", (name,)
+        )
+        if deleted:
+            logger.info(f"레지스터 맵 삭제: {name}")
+        return deleted > 0
+
+
+def _decode_ranges(raw: str) -> List[Tuple[int, int]]:
+    return [(int(start), int(count)) for start, count in json.loads(raw)]
@@ -1,3 +1,5 @@
+from typing import List, Sequence, Tuple
+import numpy as np
 from app.models.schemas import Mode
 from app.services.exceptions import ModbusReadError, ModbusWriteError
 from app.services.modbus.client import ModbusClientManager
@@ -5,6 +7,16 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# 타입 코드(0: AUTO/MANUAL, 1: LOCAL/REMOTE, 2: OFF/ON) x 비트 값(0, 1) -> Mode
+_MODE_TABLE = np.array(
+    [
+        [Mode.AUTO, Mode.MANUAL],
+        [Mode.LOCAL, Mode.REMOTE],
+        [Mode.OFF, Mode.ON],
+    ],
+    dtype=object,
+)
+
 
 class DigitalService:
     def __init__(self, client_manager: ModbusClientManager):
@@ -22,6 +34,29 @@ class DigitalService:
             digital_value = (register_value >> bit) & 1  # 특정 비트 값 추출
             return _get_digital_status_message(digital_value, type)
 
+    async def read_bits(
+        self, register: int, bits: Sequence[Tuple[int, int]]
+    ) -> List[Mode]:
+        """레지스터를 한 번만 읽어 요청된 (비트, 타입) 목록을 모두 해석
+
+        Args:
+            register (int): 레지스터 주소
+            bits (Sequence[Tuple[int, int]]): (비트 위치, 타입 코드) 목록
+
+        Returns:
+            List[Mode]: bits와 같은 순서의 Mode 목록
+        """
+        with self.client_manager.connect() as client:
+            result = client.read_holding_registers(
+                register, count=1, slave=self.client_manager.slave
+            )
+            if result.isError():
+                raise ModbusReadError(f"디지털 레지스터 {register}의 값 읽기 실패")
+
+        bit_positions = [bit for bit, _ in bits]
+        type_codes = [type_code for _, type_code in bits]
+        return decode_bits(result.registers[0], bit_positions, type_codes)
+
     async def write_bit(
         self, register: int, bit: int, state: bool, type: int = 1
     ) -> Mode:
@@ -45,6 +80,21 @@ class DigitalService:
             return _get_digital_status_message(modified_value, type, bit_position=bit)
 
 
+def decode_bits(
+    register_value: int, bits: Sequence[int], type_codes: Sequence[int]
+) -> List[Mode]:
+    """하나의 레지스터 값에서 여러 비트를 한 번에 추출해 Mode로 변환
+
+    타입 코드가 2보다 크면 _get_digital_status_message와 같이 OFF/ON으로 처리합니다.
+    """
+    if not bits:
+        return []
+    shifts = np.asarray(bits, dtype=np.uint16)
+    states = (np.uint16(register_value) >> shifts) & 1
+    types = np.minimum(np.asarray(type_codes, dtype=np.intp), 2)
+    return _MODE_TABLE[types, states.astype(np.intp)].tolist()
+
+
 def _get_digital_status_message(
     result: int, type: int, *, bit_position: int = 0
 ) -> Mode:
@@ -1,4 +1,6 @@
-from typing import Dict, Optional, Any
+import asyncio
+import sqlite3
+from typing import Dict, List, Optional, Any
 from fastapi import HTTPException
 from app.models.schemas import (
     TagType,
@@ -11,32 +13,43 @@ from app.models.schemas import (
 from app.models.validator import validate_tag_config
 from app.services.exceptions import CustomException, ErrorCode
 from app.services.modbus.client import DatabaseClientManager, ModbusClientManager
-from app.core.config import settings
+from app.services.modbus.dao.config_change_dao import (
+    ConfigChangeDAO,
+    machine_change,
+    tag_change,
+)
+from app.core.config import ConfigSnapshot, settings
 from app.services.modbus.analog import AnalogService
 from app.services.modbus.digital import DigitalService
+from app.services.modbus.read_plan import get_read_plan
 
 
 class MachineService:
     def __init__(self, db: DatabaseClientManager):
         self.client_manager: Optional[ModbusClientManager] = None
         self.db = db
+        self.changes = ConfigChangeDAO(db)
 
-    def get_all_machines(self) -> ServiceResult:
+    def get_all_machines(
+        self, snapshot: Optional[ConfigSnapshot] = None
+    ) -> ServiceResult:
         """모든 기계 설정을 반환하는 메소드"""
         return ServiceResult(
             success=True,
             message="기계 목록 조회 성공",
-            data=list(settings.MODBUS_MACHINES.keys()),
+            data=list((snapshot or settings.config).machine_names),
         )
 
-    def get_machine_config_response(self, machine_name: str) -> ServiceResult:
+    def get_machine_config_response(
+        self, machine_name: str, snapshot: Optional[ConfigSnapshot] = None
+    ) -> ServiceResult:
         """기계 설정을 반환하는 메소드"""
         try:
             machine_name = machine_name.upper()
             return ServiceResult(
                 success=True,
                 message="기계 설정 조회 성공",
-                data=settings.MODBUS_MACHINES[machine_name],
+                data=(snapshot or settings.config).machines[machine_name],
             )
         except KeyError:
             raise CustomException(
@@ -44,30 +57,39 @@ class MachineService:
                 message=f"기계 '{machine_name}'를 찾을 수 없습니다.",
             )
 
-    def get_machine_config(self, machine_name: str) -> MachineConfig:
-        """기계 설정을 반환하는 메소드"""
+    def get_machine_config(
+        self, machine_name: str, snapshot: Optional[ConfigSnapshot] = None
+    ) -> MachineConfig:
+        """기계 설정을 반환하는 메소드 (snapshot이 없으면 현재 스냅샷에서 조회)"""
         try:
             machine_name = machine_name.upper()
-            return settings.MODBUS_MACHINES[machine_name]
+            return (snapshot or settings.config).machines[machine_name]
         except KeyError:
             raise CustomException(
                 error_code=ErrorCode.MACHINE_NOT_FOUND,
                 message=f"기계 '{machine_name}'를 찾을 수 없습니다.",
             )
 
-    def get_machine_tags(self, machine_name: str) -> Dict[str, TagConfig]:
+    def get_machine_tags(
+        self, machine_name: str, snapshot: Optional[ConfigSnapshot] = None
+    ) -> Dict[str, TagConfig]:
         """특정 기계의 모든 태그 반환"""
 
         machine_name = machine_name.upper()
-        machine_config = self.get_machine_config(machine_name)
+        machine_config = self.get_machine_config(machine_name, snapshot)
         return machine_config.tags
 
-    def get_machine_tag_by_name(self, machine_name: str, tag_name: str) -> TagConfig:
+    def get_machine_tag_by_name(
+        self,
+        machine_name: str,
+        tag_name: str,
+        snapshot: Optional[ConfigSnapshot] = None,
+    ) -> TagConfig:
         """기계의 특정 태그 설정을 반환하는 메소드"""
         try:
             machine_name = machine_name.upper()
             tag_name = tag_name.upper()
-            machine_config = self.get_machine_config(machine_name)
+            machine_config = self.get_machine_config(machine_name, snapshot)
             return machine_config.tags[tag_name]
         except KeyError:
             raise CustomException(
@@ -77,7 +99,10 @@ class MachineService:
             )
 
     async def read_machine_tag_value(
-        self, machine_name: str, tag_name: str
+        self,
+        machine_name: str,
+        tag_name: str,
+        snapshot: Optional[ConfigSnapshot] = None,
     ) -> str | int | Mode:
         # Early return으로 클라이언트 매니저 검증
         if self.client_manager is None:
@@ -86,7 +111,7 @@ class MachineService:
                 message="모드버스 클라이언트가 초기화되지 않았습니다.",
             )
 
-        tag_config = self.get_machine_tag_by_name(machine_name, tag_name)
+        tag_config = self.get_machine_tag_by_name(machine_name, tag_name, snapshot)
 
         # 태그 타입별 처리 함수 매핑
         tag_handlers = {
@@ -105,6 +130,69 @@ class MachineService:
 
         return await handler(tag_config)
 
+    async def read_machine_tag_values(
+        self,
+        machine_name: str,
+        tag_names: List[str],
+        snapshot: Optional[ConfigSnapshot] = None,
+    ) -> Dict[str, Any]:
+        """여러 태그 값을 한 번에 읽는 메소드
+
+        같은 레지스터를 가리키는 디지털 태그는 레지스터를 한 번만 읽고
+        필요한 비트를 한꺼번에 해석합니다. 디지털 레지스터 묶음과 나머지 태그는
+        기존처럼 동시에 읽습니다. 태그별 실패는 예외 객체로 담아
+        asyncio.gather(return_exceptions=True)와 같은 형태로 반환합니다.
+        모든 태그는 같은 설정 스냅샷 기준으로 읽습니다.
+        """
+        snapshot = snapshot or settings.config
+        if self.client_manager is None:
+            raise CustomException(
+                error_code=ErrorCode.MODBUS_CONNECTION_ERROR,
+                message="모드버스 클라이언트가 초기화되지 않았습니다.",
+            )
+
+        requested = [tag_name.upper() for tag_name in tag_names]
+        results: Dict[str, Any] = {}
+
+        try:
+            plan = get_read_plan(self.get_machine_config(machine_name, snapshot))
+        except CustomException as e:
+            return {tag_name: e for tag_name in requested}
+
+        digital_tags = dict.fromkeys(tag for tag in requested if tag in plan.digital)
+        grouped = plan.group_digital(digital_tags)
+        service = DigitalService(self.client_manager)
+        # 아날로그 태그와 계획에 없는 태그(미등록, 형식 오류)는 단건 읽기 경로 사용
+        others = [
+            tag_name for tag_name in dict.fromkeys(requested) if tag_name not in digital_tags
+        ]
+
+        outcomes = await asyncio.gather(
+            *(
+                service.read_bits(
+                    register, [(bit, type_code) for _, bit, type_code in slots]
+                )
+                for register, slots in grouped.items()
+            ),
+            *(
+                self.read_machine_tag_value(machine_name, tag_name, snapshot)
+                for tag_name in others
+            ),
+            return_exceptions=True,
+        )
+
+        for slots, outcome in zip(grouped.values(), outcomes):
+            if isinstance(outcome, Exception):
+                for tag_name, _, _ in slots:
+                    results[tag_name] = outcome
+            else:
+                for (tag_name, _, _), mode in zip(slots, outcome):
+                    results[tag_name] = mode
+        for tag_name, outcome in zip(others, outcomes[len(grouped):]):
+            results[tag_name] = outcome
+
+        return {tag_name: results[tag_name] for tag_name in requested}
+
     async def _read_analog_value(self, tag_config: TagConfig) -> int:
         """아날로그 값을 읽는 내부 메소드"""
         assert self.client_manager is not None
@@ -228,25 +316,42 @@ class MachineService:
     ) -> ServiceResult:
         try:
             machine_name = machine_name.upper()
-            self._validate_machine_exists(machine_name)
-            self.db.execute_query(
-                "INSERT INTO machines (name, ip_address, port, slave) VALUES (?, ?, ?, ?) ON CONFLICT(name) DO UPDATE SET ip_address = ?, port = ?, slave = ?",
-                (
-                    machine_name,
-                    machine_config.ip,
-                    machine_config.port,
-                    machine_config.slave,
-                    machine_config.ip,
-                    machine_config.port,
-                    machine_config.slave,
+            try:
+                with self.db.transaction():
+                    self.db.execute_write(
+                        "INSERT INTO machines (name, ip_address, port, slave) VALUES (?, ?, ?, ?)",
+                        (
+                            machine_name,
+                            machine_config.ip,
+                            machine_config.port,
+                            machine_config.slave,
+                        ),
+                    )
+                    self.changes.record(
+                        [machine_change(machine_name, "insert", machine_config)]
+                    )
+            except sqlite3.IntegrityError:
+                raise CustomException(
+                    error_code=ErrorCode.MACHINE_ALREADY_EXISTS,
+                    status_code=409,
+                    message=f"기계 '{machine_name}'가 이미 존재합니다.",
+                )
+            settings.apply_machine(
+                machine_name,
+                MachineConfig(
+                    ip=machine_config.ip,
+                    port=machine_config.port,
+                    slave=machine_config.slave,
+                    tags={},
                 ),
             )
-            self.db.load_modbus_config()
             return ServiceResult(
                 success=True,
                 message=f"기계 {machine_name} 추가 완료",
                 data={"machine_name": machine_name, "config": machine_config},
             )
+        except CustomException:
+            raise
         except Exception as e:
             raise CustomException(
                 error_code=ErrorCode.MACHINE_ADD_ERROR,
@@ -255,9 +360,27 @@ class MachineService:
 
     def delete_machine(self, machine_name: str) -> ServiceResult:
         machine_name = machine_name.upper()
-        machine_id = self._get_machine_id(machine_name)
-        self.db.execute_query("DELETE FROM machines WHERE id = ?", (machine_id,))
-        self.db.load_modbus_config()
+        with self.db.transaction():
+            tag_rows = self.db.execute_query(
+                """
+                SELECT tags.tag_name FROM tags
+                JOIN machines ON machines.id = tags.machine_id
+                WHERE machines.name = ?
+                """,
+                (machine_name,),
+            )
+            # 태그는 FOREIGN KEY ON DELETE CASCADE로 함께 삭제됨
+            deleted = self.db.execute_write(
+                "DELETE FROM machines WHERE name = ?", (machine_name,)
+            )
+            if not deleted:
+                raise self._machine_not_found(machine_name)
+            # 함께 삭제된 태그도 태그별 이력으로 남겨, 이력 정리 후에도 삭제가 전달되도록 함
+            self.changes.record(
+                [tag_change(machine_name, row["tag_name"], "delete") for row in tag_rows]
+                + [machine_change(machine_name, "delete")]
+            )
+        settings.apply_machine(machine_name, None)
         return ServiceResult(success=True, message=f"기계 {machine_name} 삭제 완료")
 
     def add_machine_tag(
@@ -266,13 +389,10 @@ class MachineService:
         # 태그 설정 검증
         validated_config = validate_tag_config(tag_config)
 
-        # 태그 중복 검사
-        self._validate_tag_not_exists(machine_name, tag_name)
-
-        # 태그 추가 실행
+        # 태그 추가 실행 (중복은 고유 인덱스 위반으로 검출)
         self._add_tag_to_machine(machine_name, tag_name, validated_config)
 
-        self.db.load_modbus_config()
+        settings.apply_tag(machine_name.upper(), tag_name.upper(), validated_config)
         return ServiceResult(
             success=True,
             message=f"태그 {tag_name.upper()}가 {machine_name.upper()}에 추가되었습니다.",
@@ -290,141 +410,110 @@ class MachineService:
         # 태그 설정 검증
         validated_config = validate_tag_config(tag_config)
 
-        # 태그 존재 여부 확인
-        self._validate_tag_exists(machine_name, tag_name)
-
-        machine_id = self._get_machine_id(machine_name)
-        # 태그 업데이트
-        self.db.execute_query(
-            """
-            UPDATE tags 
-            SET tag_type = ?, logical_register = ?, real_register = ?, 
-                permission = ?
-            WHERE machine_id = ? AND tag_name = ?
-            """,
-            (
-                validated_config.tag_type,
-                validated_config.logical_register,
-                validated_config.real_register,
-                validated_config.permission,
-                machine_id,
-                tag_name.upper(),
-            ),
-        )
+        machine_name = machine_name.upper()
+        tag_name = tag_name.upper()
+        with self.db.transaction():
+            # 태그 업데이트 (갱신된 행이 없으면 기계 또는 태그가 없는 것)
+            updated = self.db.execute_write(
+                """
+                UPDATE tags 
+                SET tag_type = ?, logical_register = ?, real_register = ?, 
+                    permission = ?
+                WHERE machine_id = (SELECT id FROM machines WHERE name = ?)
+                    AND tag_name = ?
+                """,
+                (
+                    validated_config.tag_type.value,
+                    validated_config.logical_register,
+                    validated_config.real_register,
+                    validated_config.permission.value,
+                    machine_name,
+                    tag_name,
+                ),
+            )
+            if not updated:
+                raise self._tag_not_found(machine_name, tag_name)
+            self.changes.record(
+                [tag_change(machine_name, tag_name, "update", validated_config)]
+            )
 
-        self.db.load_modbus_config()
+        settings.apply_tag(machine_name, tag_name, validated_config)
         return ServiceResult(
             success=True,
-            message=f"태그 {tag_name.upper()}가 업데이트되었습니다.",
+            message=f"태그 {tag_name}가 업데이트되었습니다.",
             data=validated_config,
         )
 
     def delete_machine_tag(self, machine_name: str, tag_name: str):
         """태그를 삭제하는 메소드"""
-        tag_name = tag_name.upper()
-
-        # 태그 존재 여부 확인
-        self._validate_tag_exists(machine_name, tag_name)
-
-        machine_id = self._get_machine_id(machine_name)
-
-        # 태그 삭제
-        self.db.execute_query(
-            "DELETE FROM tags WHERE machine_id = ? AND tag_name = ?",
-            (machine_id, tag_name),
-        )
-
-        self.db.load_modbus_config()
-
-    def _get_machine_id(self, machine_name: str) -> int:
-        """기계 ID를 조회하는 내부 메소드"""
         machine_name = machine_name.upper()
-        machine_result = self.db.execute_query(
-            "SELECT id FROM machines WHERE name = ?", (machine_name,)
-        )
+        tag_name = tag_name.upper()
 
-        if not machine_result:
-            raise CustomException(
-                error_code=ErrorCode.MACHINE_NOT_FOUND,
-                status_code=404,
-                message=f"기계 '{machine_name}'를 찾을 수 없습니다.",
+        with self.db.transaction():
+            # 태그 삭제 (삭제된 행이 없으면 기계 또는 태그가 없는 것)
+            deleted = self.db.execute_write(
+                """
+                DELETE FROM tags
+                WHERE machine_id = (SELECT id FROM machines WHERE name = ?)
+                    AND tag_name = ?
+                """,
+                (machine_name, tag_name),
             )
+            if not deleted:
+                raise self._tag_not_found(machine_name, tag_name)
+            self.changes.record([tag_change(machine_name, tag_name, "delete")])
 
-        return machine_result[0]["id"]
+        settings.apply_tag(machine_name, tag_name, None)
 
     def _add_tag_to_machine(
         self, machine_name: str, tag_name: str, tag_config: TagConfig
     ):
         """태그를 기계에 추가하는 내부 메소드"""
-        tag_name = tag_name.upper()
-        machine_id = self._get_machine_id(machine_name)
-
-        self.db.execute_query(
-            """
-            INSERT INTO tags 
-            (machine_id, tag_name, tag_type, logical_register, real_register, permission)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (
-                machine_id,
-                tag_name,
-                tag_config.tag_type,
-                tag_config.logical_register,
-                tag_config.real_register,
-                tag_config.permission,
-            ),
-        )
-
-    def _validate_tag_not_exists(self, machine_name: str, tag_name: str):
-        """태그 중복 검사를 수행하는 내부 메소드
-
-        태그가 이미 존재하면 CustomException을 발생시킵니다.
-        """
         machine_name = machine_name.upper()
         tag_name = tag_name.upper()
-        machine_id = self._get_machine_id(machine_name)
-        tag_exists = self.db.execute_query(
-            "SELECT COUNT(*) as count FROM tags WHERE machine_id = ? AND tag_name = ?",
-            (machine_id, tag_name),
-        )
-        if tag_exists[0]["count"] > 0:
+
+        try:
+            with self.db.transaction():
+                inserted = self.db.execute_write(
+                    """
+                    INSERT INTO tags 
+                    (machine_id, tag_name, tag_type, logical_register, real_register, permission)
+                    SELECT id, ?, ?, ?, ?, ? FROM machines WHERE name = ?
+                    """,
+                    (
+                        tag_name,
+                        tag_config.tag_type.value,
+                        tag_config.logical_register,
+                        tag_config.real_register,
+                        tag_config.permission.value,
+                        machine_name,
+                    ),
+                )
+                if not inserted:
+                    raise self._machine_not_found(machine_name)
+                self.changes.record(
+                    [tag_change(machine_name, tag_name, "insert", tag_config)]
+                )
+        except sqlite3.IntegrityError:
             raise CustomException(
                 error_code=ErrorCode.TAG_ALREADY_EXISTS,
                 status_code=409,
                 message=f"기계 '{machine_name}'의 태그 '{tag_name}'가 이미 존재합니다.",
             )
 
-    def _validate_tag_exists(self, machine_name: str, tag_name: str):
-        """태그 존재 여부를 확인하는 내부 메소드
-
-        태그가 존재하지 않으면 CustomException을 발생시킵니다.
-        """
-        machine_name = machine_name.upper()
-        tag_name = tag_name.upper()
-        machine_id = self._get_machine_id(machine_name)
-        tag_exists = self.db.execute_query(
-            "SELECT COUNT(*) as count FROM tags WHERE machine_id = ? AND tag_name = ?",
-            (machine_id, tag_name),
+    def _machine_not_found(self, machine_name: str) -> CustomException:
+        return CustomException(
+            error_code=ErrorCode.MACHINE_NOT_FOUND,
+            status_code=404,
+            message=f"기계 '{machine_name}'를 찾을 수 없습니다.",
         )
-        if tag_exists[0]["count"] == 0:
-            raise CustomException(
-                error_code=ErrorCode.TAG_NOT_FOUND,
-                status_code=404,
-                message=f"기계 '{machine_name}'의 태그 '{tag_name}'를 찾을 수 없습니다.",
-            )
-
-    def _validate_machine_exists(self, machine_name: str):
-        """기계 존재 여부를 확인하는 내부 메소드
 
-        기계가 존재하면 CustomException을 발생시킵니다.
-        """
-        machine_name = machine_name.upper()
-        machine_exists = self.db.execute_query(
-            "SELECT COUNT(*) as count FROM machines WHERE name = ?", (machine_name,)
+    def _tag_not_found(self, machine_name: str, tag_name: str) -> CustomException:
+        """갱신/삭제된 태그가 없을 때의 오류 (기계가 없는 경우와 구분)"""
+        if machine_name not in settings.config.machines:
+            return self._machine_not_found(machine_name)
+        return CustomException(
+            error_code=ErrorCode.TAG_NOT_FOUND,
+            status_code=404,
+            message=f"기계 '{machine_name}'의 태그 '{tag_name}'를 찾을 수 없습니다.",
         )
-        if machine_exists[0]["count"] > 0:
-            raise CustomException(
-                error_code=ErrorCode.MACHINE_ALREADY_EXISTS,
-                status_code=409,
-                message=f"기계 '{machine_name}'가 이미 존재합니다.",
-            )
@@ -0,0 +1,121 @@
+import sqlite3
+from typing import List, Tuple
+from app.core.logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+# (버전, 설명, SQL 목록). 적용된 버전은 PRAGMA user_version에 기록됩니다.
+# 이미 배포된 마이그레이션은 수정하지 말고 새 버전을 뒤에 추가하세요.
+MIGRATIONS: List[Tuple[int, str, List[str]]] = [
+    (
+        1,
+        "기본 스키마 (machines, tags, autocontrol)",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS machines (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT UNIQUE NOT NULL,
+                ip_address TEXT NOT NULL,
+                port INTEGER NOT NULL,
+                slave INTEGER NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS tags (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                machine_id INTEGER NOT NULL,
+                tag_name TEXT NOT NULL,
+                tag_type TEXT NOT NULL,
+                logical_register TEXT NOT NULL,
+                real_register TEXT NOT NULL,
+                permission TEXT NOT NULL,
+                FOREIGN KEY (machine_id) REFERENCES machines(id) ON DELETE CASCADE
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS autocontrol (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                enabled BOOLEAN NOT NULL DEFAULT 0,
+                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+        ],
+    ),
+    (
+        2,
+        "레지스터 맵 테이블",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS register_maps (
+                name TEXT PRIMARY KEY,
+                ranges TEXT NOT NULL
+            )
+            """,
+        ],
+    ),
+    (
+        3,
+        "태그 (machine_id, tag_name) 고유 인덱스",
+        [
+            # 설정 로드 시 나중 행이 앞선 행을 덮어썼으므로 가장 최근 행만 남김
+            """
+            DELETE FROM tags WHERE id NOT IN (
+                SELECT MAX(id) FROM tags GROUP BY machine_id, tag_name
+            )
+            """,
+            # 태그 조회/중복 검사와 기계 삭제 시 CASCADE 모두 이 인덱스를 사용
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS ux_tags_machine_tag
+            ON tags (machine_id, tag_name)
+            """,
+        ],
+    ),
+    (
+        4,
+        "설정 변경 이력 테이블",
+        [
+            # AUTOINCREMENT: 정리(compaction)로 행이 지워져도 버전 번호를 재사용하지 않음
+            """
+            CREATE TABLE IF NOT EXISTS config_changes (
+                version INTEGER PRIMARY KEY AUTOINCREMENT,
+                entity TEXT NOT NULL,
+                machine_name TEXT NOT NULL,
+                tag_name TEXT,
+                action TEXT NOT NULL,
+                data TEXT,
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS ix_config_changes_key
+            ON config_changes (entity, machine_name, tag_name, version)
+            """,
+        ],
+    ),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """적용되지 않은 마이그레이션을 순서대로 적용
+
+    호출한 쪽의 트랜잭션 안에서 실행되므로, 중간에 실패하면 모두 롤백됩니다.
+
+    Returns:
+        int: 적용 후 스키마 버전
+    """
+    current = get_schema_version(conn)
+    for version, description, statements in MIGRATIONS:
+        if version <= current:
+            continue
+        for statement in statements:
+            conn.execute(statement)
+        conn.execute(f"PRAGMA user_version = {version}")
+        logger.info(f"설정 DB 마이그레이션 적용: v{version} - {description}")
+        current = version
+    return current
@@ -0,0 +1,58 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+from app.models.schemas import MachineConfig, TagConfig, TagType
+
+# 디지털 태그 타입별 Mode 해석 코드 (DigitalService 타입 코드와 동일)
+DIGITAL_TYPE_CODES: Dict[TagType, int] = {
+    TagType.DIGITAL_AM: 0,
+    TagType.DIGITAL_RM: 1,
+    TagType.DIGITAL: 2,
+}
+
+
+class ReadPlan:
+    """기계의 태그 설정을 레지스터 단위로 미리 해석해 둔 읽기 계획
+
+    태그 설정이 바뀌면 MachineConfig 자체가 새로 만들어지므로,
+    계획은 MachineConfig 인스턴스마다 한 번만 컴파일됩니다.
+    """
+
+    def __init__(self, tags: Dict[str, TagConfig]):
+        # 태그 이름 -> 레지스터
+        self.analog: Dict[str, int] = {}
+        # 태그 이름 -> (레지스터, 비트, 타입 코드)
+        self.digital: Dict[str, Tuple[int, int, int]] = {}
+
+        for tag_name, tag_config in tags.items():
+            try:
+                if tag_config.tag_type == TagType.ANALOG:
+                    self.analog[tag_name] = int(tag_config.real_register)
+                elif tag_config.tag_type in DIGITAL_TYPE_CODES:
+                    register, bit = tag_config.real_register.split(".")
+                    self.digital[tag_name] = (
+                        int(register),
+                        int(bit),
+                        DIGITAL_TYPE_CODES[tag_config.tag_type],
+                    )
+            except ValueError:
+                # 형식이 잘못된 태그는 계획에서 제외하고 단건 읽기 경로에서 오류를 보고
+                continue
+
+    def group_digital(
+        self, tag_names: Iterable[str]
+    ) -> Dict[int, List[Tuple[str, int, int]]]:
+        """요청된 디지털 태그를 레지스터별 (태그, 비트, 타입 코드) 목록으로 묶음"""
+        groups: Dict[int, List[Tuple[str, int, int]]] = defaultdict(list)
+        for tag_name in tag_names:
+            register, bit, type_code = self.digital[tag_name]
+            groups[register].append((tag_name, bit, type_code))
+        return groups
+
+
+def get_read_plan(machine_config: MachineConfig) -> ReadPlan:
+    """MachineConfig에 캐시된 읽기 계획을 반환하고, 없으면 컴파일"""
+    plan = machine_config._read_plan
+    if plan is None:
+        plan = ReadPlan(machine_config.tags)
+        machine_config._read_plan = plan
+    return plan
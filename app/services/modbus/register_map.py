@@ -0,0 +1,126 @@
+from typing import Dict, Iterable, List, Tuple
+from app.core.config import ConfigSnapshot, settings
+from app.models.schemas import TagConfig, TagType
+from app.services.exceptions import CustomException, ErrorCode
+from app.services.modbus.client import DatabaseClientManager
+from app.services.modbus.dao.register_map_dao import RegisterMapDAO
+
+# Modbus 프로토콜상 한 번의 Read Holding Registers 요청으로 읽을 수 있는 최대 개수
+MAX_REGISTERS_PER_READ = 125
+
+# 기존 read_all_values가 읽던 기본 레지스터 범위 (시작 주소, 개수)
+DEFAULT_REGISTER_MAP_NAME = "DEFAULT"
+DEFAULT_REGISTER_RANGES: List[Tuple[int, int]] = [
+    (1220, 6),  # 1220-1225
+    (2000, 11),  # 2000-2010
+    (2100, 21),  # 2100-2120
+    (2300, 11),  # 2300-2310
+    (2330, 6),  # 2330-2335
+    (2500, 11),  # 2500-2510
+    (2701, 5),  # 2701-2705
+    (2901, 2),  # 2901-2902
+    (1200, 11),  # 1200-1210
+]
+
+
+def split_range(start: int, count: int) -> List[Tuple[int, int]]:
+    """범위를 한 번에 읽을 수 있는 크기의 블록으로 분할"""
+    return [
+        (block_start, min(MAX_REGISTERS_PER_READ, start + count - block_start))
+        for block_start in range(start, start + count, MAX_REGISTERS_PER_READ)
+    ]
+
+
+def coalesce_ranges(
+    ranges: Iterable[Tuple[int, int]], max_gap: int = 0
+) -> List[Tuple[int, int]]:
+    """겹치거나 가까운 범위를 합쳐 읽기 요청 수를 줄임
+
+    Args:
+        ranges: (시작 주소, 개수) 목록
+        max_gap: 사이에 끼워 읽어도 되는 최대 빈 레지스터 수
+
+    Returns:
+        List[Tuple[int, int]]: 주소 순으로 정렬되고 최대 읽기 크기를 넘지 않는 블록 목록
+    """
+    merged: List[List[int]] = []
+    for start, count in sorted(r for r in ranges if r[1] > 0):
+        end = start + count
+        if merged and start <= merged[-1][1] + max_gap:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+
+    blocks: List[Tuple[int, int]] = []
+    for start, end in merged:
+        blocks.extend(split_range(start, end - start))
+    return blocks
+
+
+def ranges_from_tags(tags: Dict[str, TagConfig]) -> List[Tuple[int, int]]:
+    """태그 설정에서 사용하는 레지스터를 연속 범위로 정리"""
+    registers = set()
+    for tag_config in tags.values():
+        try:
+            if tag_config.tag_type == TagType.ANALOG:
+                registers.add(int(tag_config.real_register))
+            else:
+                registers.add(int(tag_config.real_register.split(".")[0]))
+        except ValueError:
+            continue
+    return coalesce_ranges((register, 1) for register in registers)
+
+
+def _machine_register_maps(snapshot: ConfigSnapshot) -> Dict[str, List[Tuple[int, int]]]:
+    """설정 스냅샷의 기계별 태그 기반 레지스터 맵 (스냅샷마다 한 번 계산)"""
+    return {
+        machine_name: ranges_from_tags(machine_config.tags)
+        for machine_name, machine_config in snapshot.machines.items()
+    }
+
+
+class RegisterMapService:
+    """이름이 붙은 레지스터 맵 관리
+
+    맵은 데이터베이스에 저장된 것이 우선하며, 없으면 같은 이름의 기계에
+    등록된 태그로부터 만들어집니다. "DEFAULT"는 기존 기본 범위를 뜻합니다.
+    """
+
+    def __init__(self, db: DatabaseClientManager):
+        self.db = db
+        self.dao = RegisterMapDAO(db)
+
+    def list_maps(self) -> Dict[str, List[Tuple[int, int]]]:
+        maps: Dict[str, List[Tuple[int, int]]] = {
+            DEFAULT_REGISTER_MAP_NAME: DEFAULT_REGISTER_RANGES
+        }
+        maps.update(settings.config.derive("register_maps", _machine_register_maps))
+        maps.update(self.dao.list_maps())
+        return maps
+
+    def get_map(self, name: str) -> List[Tuple[int, int]]:
+        name = name.upper()
+        stored = self.dao.get_map(name)
+        if stored is not None:
+            return stored
+        if name == DEFAULT_REGISTER_MAP_NAME:
+            return DEFAULT_REGISTER_RANGES
+        machine_maps = settings.config.derive("register_maps", _machine_register_maps)
+        if name in machine_maps:
+            return machine_maps[name]
+        raise CustomException(
+            error_code=ErrorCode.REGISTER_MAP_NOT_FOUND,
+            status_code=404,
+            message=f"레지스터 맵 '{name}'를 찾을 수 없습니다.",
+        )
+
+    def save_map(self, name: str, ranges: List[Tuple[int, int]]):
+        self.dao.save_map(name.upper(), ranges)
+
+    def delete_map(self, name: str):
+        if not self.dao.delete_map(name.upper()):
+            raise CustomException(
+                error_code=ErrorCode.REGISTER_MAP_NOT_FOUND,
+                status_code=404,
+                message=f"저장된 레지스터 맵 '{name.upper()}'를 찾을 수 없습니다.",
+            )
@@ -0,0 +1,212 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Set, Tuple
+from pymodbus.client import ModbusTcpClient
+from pymodbus.exceptions import ModbusException
+from pymodbus.pdu import ExceptionResponse
+from app.core.config import settings
+from app.core.logging_config import setup_logger
+from app.models.schemas import (
+    MachineConfigFormat,
+    Permission,
+    RegisterRange,
+    ScanResult,
+    TagConfigFormat,
+    TagType,
+)
+from app.services.exceptions import ModbusConnectionError, ModbusReadError
+from app.services.modbus.register_map import MAX_REGISTERS_PER_READ, coalesce_ranges
+
+logger = setup_logger(__name__)
+
+# Holding Register의 논리 주소 기준 (40001 = 실제 주소 0)
+HOLDING_REGISTER_BASE = 40001
+
+# 블록 탐색 결과
+PROBE_OK = "ok"  # 정상 응답
+PROBE_ILLEGAL = "illegal"  # 잘못된 주소 예외 응답 (블록을 나누어 다시 읽음)
+PROBE_UNKNOWN = "unknown"  # 시간 초과, 통신 오류, 그 밖의 예외 응답
+
+
+class RegisterScanner:
+    """장비의 Holding Register 주소 공간을 동시에 탐색하는 스캐너
+
+    각 작업 스레드가 장비와 별도의 TCP 연결을 맺어 블록 단위로 읽습니다.
+    장비가 잘못된 주소(예외 코드 2) 응답을 주면 블록을 반으로 나누어 다시 읽어
+    응답하는 주소 구간만 남깁니다. 시간 초과나 통신 오류, 그 밖의 예외 응답을 받은
+    블록은 나누지 않고 unknown_ranges에 기록한 뒤 탐색을 계속합니다.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 502,
+        slave: int = 1,
+        workers: int = 4,
+        timeout: float = 1.0,
+    ):
+        self.host = host
+        self.port = port
+        self.slave = slave
+        self.workers = workers
+        self.timeout = timeout
+        self._local = threading.local()
+        self._clients: List[ModbusTcpClient] = []
+        self._clients_lock = threading.Lock()
+        self.request_count = 0
+        self.unknown_ranges: List[Tuple[int, int]] = []
+
+    def scan(
+        self, start: int, count: int, block_size: int = MAX_REGISTERS_PER_READ
+    ) -> List[Tuple[int, int]]:
+        """start부터 count개의 주소를 탐색해 응답하는 (시작 주소, 개수) 구간 목록을 반환
+
+        확인하지 못한 구간은 unknown_ranges에 남깁니다. 장비가 한 번도 응답하지
+        않았으면 마지막 오류를 ModbusReadError로 알립니다.
+        """
+        block_size = max(1, min(block_size, MAX_REGISTERS_PER_READ))
+        responding: List[Tuple[int, int]] = []
+        unknown: List[Tuple[int, int]] = []
+        answered = False
+        last_error: Optional[str] = None
+
+        try:
+            with ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="modbus-scan"
+            ) as pool:
+                pending: Set[Future] = set()
+
+                def submit(block_start: int, block_count: int):
+                    self.request_count += 1
+                    pending.add(pool.submit(self._probe, block_start, block_count))
+
+                for block_start in range(start, start + count, block_size):
+                    submit(block_start, min(block_size, start + count - block_start))
+
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        block_start, block_count, status, error = future.result()
+                        if status == PROBE_UNKNOWN:
+                            unknown.append((block_start, block_count))
+                            last_error = error
+                            continue
+                        answered = True
+                        if status == PROBE_OK:
+                            responding.append((block_start, block_count))
+                        elif block_count > 1:
+                            half = block_count // 2
+                            submit(block_start, half)
+                            submit(block_start + half, block_count - half)
+        finally:
+            self._close_clients()
+
+        self.unknown_ranges = coalesce_ranges(unknown)
+        if not answered and last_error:
+            raise ModbusReadError(last_error)
+        if unknown:
+            logger.warning(
+                f"레지스터 탐색 중 확인하지 못한 구간 {len(self.unknown_ranges)}개: "
+                f"{last_error}"
+            )
+        return coalesce_ranges(responding)
+
+    def _probe(self, start: int, count: int) -> Tuple[int, int, str, Optional[str]]:
+        """블록을 읽어 (시작 주소, 개수, 탐색 결과, 오류 메시지)를 반환"""
+        span = f"레지스터 {start}-{start + count - 1}"
+        try:
+            client = self._get_client()
+            response = client.read_holding_registers(
+                start, count=count, slave=self.slave
+            )
+        except ModbusConnectionError as e:
+            return start, count, PROBE_UNKNOWN, f"{span} 탐색 중 {e.message}"
+        except ModbusException as e:
+            return start, count, PROBE_UNKNOWN, f"{span} 탐색 중 통신 오류: {e}"
+        if not response.isError():
+            return start, count, PROBE_OK, None
+        code = getattr(response, "exception_code", None)
+        if code == ExceptionResponse.ILLEGAL_ADDRESS:
+            return start, count, PROBE_ILLEGAL, None
+        return start, count, PROBE_UNKNOWN, f"{span} 탐색 중 예외 응답 (코드 {code})"
+
+    def _get_client(self) -> ModbusTcpClient:
+        client = getattr(self._local, "client", None)
+        if client is None or not client.connected:
+            client = ModbusTcpClient(
+                host=self.host, port=self.port, timeout=self.timeout, retries=1
+            )
+            if not client.connect():
+                raise ModbusConnectionError(
+                    f"Modbus 서버 연결 실패 - host: {self.host}, port: {self.port}"
+                )
+            self._local.client = client
+            with self._clients_lock:
+                self._clients.append(client)
+        return client
+
+    def _close_clients(self):
+        with self._clients_lock:
+            for client in self._clients:
+                client.close()
+            self._clients.clear()
+
+
+def propose_machine_config(
+    host: str, port: int, slave: int, ranges: List[Tuple[int, int]]
+) -> MachineConfigFormat:
+    """응답하는 레지스터마다 읽기 전용 아날로그 태그를 만든 기계 설정 제안"""
+    tags: Dict[str, TagConfigFormat] = {}
+    for start, count in ranges:
+        for register in range(start, start + count):
+            tags[f"R{register}"] = TagConfigFormat(
+                tag_type=TagType.ANALOG,
+                logical_register=str(HOLDING_REGISTER_BASE + register),
+                real_register=str(register),
+                permission=Permission.READ,
+            )
+    return MachineConfigFormat(ip=host, port=port, slave=slave, tags=tags)
+
+
+def scan_device(
+    host: str,
+    port: int = settings.MODBUS_DEFAULT_PORT,
+    slave: int = settings.MODBUS_SLAVE,
+    start: int = 0,
+    count: int = 10000,
+    workers: int = 4,
+    block_size: int = MAX_REGISTERS_PER_READ,
+    machine_name: str = "",
+) -> ScanResult:
+    """장비를 탐색하고 ConfigService.import_config 형식의 태그 설정을 제안"""
+    machine_name = (machine_name or f"SCAN_{host.replace('.', '_')}").upper()
+    scanner = RegisterScanner(host, port, slave, workers=workers)
+
+    started = time.perf_counter()
+    ranges = scanner.scan(start, count, block_size)
+    elapsed = time.perf_counter() - started
+
+    register_count = sum(c for _, c in ranges)
+    unknown_count = sum(c for _, c in scanner.unknown_ranges)
+    logger.info(
+        f"레지스터 탐색 완료: {host}:{port} {start}-{start + count - 1}, "
+        f"{len(ranges)}개 구간 / {register_count}개 레지스터 응답, "
+        f"{unknown_count}개 레지스터 확인 실패, "
+        f"요청 {scanner.request_count}회, {elapsed:.2f}초"
+    )
+    return ScanResult(
+        host=host,
+        port=port,
+        slave=slave,
+        start=start,
+        count=count,
+        ranges=[RegisterRange(start=s, count=c) for s, c in ranges],
+        register_count=register_count,
+        unknown_ranges=[
+            RegisterRange(start=s, count=c) for s, c in scanner.unknown_ranges
+        ],
+        request_count=scanner.request_count,
+        elapsed=round(elapsed, 3),
+        config={machine_name: propose_machine_config(host, port, slave, ranges)},
+    )
@@ -5,6 +5,7 @@ from fastapi import WebSocket
 from app.models.schemas import ApiResponse, ErrorResponse
 from app.services.modbus.machine import MachineService
 from app.services.modbus.client import ModbusClientManager
+from app.core.config import ConfigSnapshot, settings
 from app.core.logging_config import setup_logger
 
 logger = setup_logger(__name__)
@@ -82,16 +83,19 @@ class WebSocketService:
         except Exception as e:
             logger.error(f"웹소켓 에러 발생: {str(e)}")
 
-    async def _read_machine_tags(self, machine_name: str, tag_list: List[str]) -> Dict:
+    async def _read_machine_tags(
+        self,
+        machine_name: str,
+        tag_list: List[str],
+        snapshot: Optional[ConfigSnapshot] = None,
+    ) -> Dict:
         """단일 기계의 태그 값들을 읽음"""
-        tasks = [
-            self.machine_service.read_machine_tag_value(machine_name, tag.upper())
-            for tag in tag_list
-        ]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        results = await self.machine_service.read_machine_tag_values(
+            machine_name, tag_list, snapshot
+        )
 
         data = {}
-        for tag, result in zip(tag_list, results):
+        for tag, result in results.items():
             if isinstance(result, Exception):
                 data[tag.upper()] = f"오류 발생: {str(result)}"
             else:
@@ -99,15 +103,24 @@ class WebSocketService:
         return data
 
     async def _read_multiple_machines_tags(self, machines_config: Dict) -> Dict:
-        """여러 기계의 태그 값들을 읽음"""
+        """여러 기계의 태그 값들을 읽음 (한 주기 동안 같은 설정 스냅샷 사용)"""
+        snapshot = settings.config
         all_data = {}
         for machine_name, tag_names in machines_config.items():
             try:
-                client = await self._get_modbus_client(machine_name)
-                self.machine_service.client_manager = client
+                machine_config = self.machine_service.get_machine_config(
+                    machine_name, snapshot
+                )
+                self.machine_service.client_manager = ModbusClientManager(
+                    host=machine_config.ip,
+                    port=machine_config.port,
+                    slave=machine_config.slave,
+                )
 
                 tag_list = [tag.strip().upper() for tag in tag_names]
-                machine_data = await self._read_machine_tags(machine_name, tag_list)
+                machine_data = await self._read_machine_tags(
+                    machine_name, tag_list, snapshot
+                )
                 all_data[machine_name] = machine_data
 
             except Exception as machine_error:
@@ -164,13 +177,6 @@ class WebSocketService:
             ).model_dump()
         )
 
-    @staticmethod
-    async def _get_modbus_client(machine_name: str) -> ModbusClientManager:
-        """ModbusClient 인스턴스 가져오기"""
-        from app.api.dependencies import get_modbus_client_by_machine_name
-
-        return await get_modbus_client_by_machine_name(machine_name)
-
     async def _cleanup(self) -> None:
         """리소스 정리를 위한 메서드"""
         try:
@@ -3,13 +3,16 @@ from fastapi import FastAPI, Request, HTTPException
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.dependencies import get_database_client, get_historian
 from app.api.middleware import log_middleware
 from app.api.routes.direct.analog import router as analog_router
 from app.api.routes.direct.digital import router as digital_router
+from app.api.routes.direct.scan import router as scan_router
 from app.api.routes.health import router as health_router
 from app.api.routes.machine import router as machine_router
 from app.api.routes.config import router as config_router
 from app.api.routes.autocontrol import router as autocontrol_router
+from app.api.routes.history import router as history_router
 from app.api.exceptions import (
     http_exception_handler,
     validation_exception_handler,
@@ -20,14 +23,43 @@ from app.api.exceptions import (
 from contextlib import asynccontextmanager
 from app.services.exceptions import CustomException
 from app.services.modbus.client import ModbusClientManager
+from app.services.modbus.dao.auto_controll_dao import AutoControllDAO
+from app.services.historian.retention import RetentionService
+from app.services.historian.store import HistorianStore
+from app.core.config import settings
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # 시작할 때 실행할 코드
     print("서버가 시작됩니다...")
+    db = get_database_client()
+    # 자동운전 상태를 미리 메모리로 읽어 상태 조회 시 DB를 거치지 않도록 함
+    await db.run(AutoControllDAO(db).load)
+    historian = get_historian()
+    if historian is not None:
+        await historian.start()
+    retention = None
+    if settings.RETENTION_ENABLED:
+        # 히스토리언이 켜져 있으면 같은 저장소(연결과 잠금)를 써서 저장과 삭제가 번갈아 실행되도록 함
+        retention_store = historian.store if historian is not None else HistorianStore(
+            settings.historian_db_file,
+            wide_table=settings.SAVER_DB_NAME,
+            partition=settings.HISTORIAN_PARTITION,
+            archive_dir=settings.historian_archive_dir,
+        )
+        retention = RetentionService(retention_store)
+        retention.start()
     yield
+    if retention is not None:
+        # 실행 중인 정리가 멈춘 뒤에 저장소를 닫음
+        await retention.stop()
+        if historian is None:
+            retention.store.close()
+    if historian is not None:
+        await historian.stop()
     ModbusClientManager.close_all()
+    db.close()
     # 종료할 때 실행할 코드
     print("서버가 종료됩니다...")
 
@@ -76,7 +108,9 @@ app.include_router(machine_router)
 app.include_router(config_router)
 app.include_router(analog_router)
 app.include_router(digital_router)
+app.include_router(scan_router)
 app.include_router(autocontrol_router)
+app.include_router(history_router)
 
 if __name__ == "__main__":
     import uvicorn
@@ -24,25 +24,21 @@ def _format_machine_name(name):
         # OIL_MAIN -> OIL MAIN
         return name.replace('_', ' ')
 
-def get_modbus_data(value_type='all', hours=1, start_time=None, end_time=None):
+def _parse_time_range(hours=1, start_time=None, end_time=None):
     """
-    특정 타입의 기계 데이터를 가져오는 함수
+    조회 구간 계산 함수
     
     Parameters:
-    - value_type: 'pv', 'sv', 'all' 중 하나 (기본값: 'all')
-    - hours: 몇 시간 전 데이터부터 가져올지 (기본값: 1, start_time이 지정된 경우 무시됨)
-    - start_time: 시작 시간 (datetime 객체 또는 문자열 'YYYY-MM-DD HH:MM:SS' 형식, 기본값: None)
+    - hours: 몇 시간 전 데이터부터 가져올지 (start_time이 지정된 경우 무시됨)
+    - start_time: 시작 시간 (datetime 객체 또는 문자열 'YYYY-MM-DD HH:MM:SS' 형식)
     - end_time: 종료 시간 (datetime 객체 또는 문자열 'YYYY-MM-DD HH:MM:SS' 형식, 기본값: 현재 시간)
     
     Returns:
-    - DataFrame: 조회된 데이터
+    - (datetime, datetime): 시작 시간, 종료 시간
     """
-    # 현재 시간과 지정된 시간 전 계산
-    now = datetime.now()
-    
     # end_time 처리
     if end_time is None:
-        end_time = now
+        end_time = datetime.now()
     elif isinstance(end_time, str):
         end_time = datetime.strptime(end_time, '%Y-%m-%d %H:%M:%S')
     
@@ -52,6 +48,23 @@ def get_modbus_data(value_type='all', hours=1, start_time=None, end_time=None):
     elif isinstance(start_time, str):
         start_time = datetime.strptime(start_time, '%Y-%m-%d %H:%M:%S')
     
+    return start_time, end_time
+
+def get_modbus_data(value_type='all', hours=1, start_time=None, end_time=None):
+    """
+    특정 타입의 기계 데이터를 가져오는 함수
+    
+    Parameters:
+    - value_type: 'pv', 'sv', 'all' 중 하나 (기본값: 'all')
+    - hours: 몇 시간 전 데이터부터 가져올지 (기본값: 1, start_time이 지정된 경우 무시됨)
+    - start_time: 시작 시간 (datetime 객체 또는 문자열 'YYYY-MM-DD HH:MM:SS' 형식, 기본값: None)
+    - end_time: 종료 시간 (datetime 객체 또는 문자열 'YYYY-MM-DD HH:MM:SS' 형식, 기본값: 현재 시간)
+    
+    Returns:
+    - DataFrame: 조회된 데이터
+    """
+    start_time, end_time = _parse_time_range(hours, start_time, end_time)
+    
     # 시간 문자열로 변환
     start_time_str = start_time.strftime('%Y-%m-%d %H:%M:%S')
     end_time_str = end_time.strftime('%Y-%m-%d %H:%M:%S')
@@ -132,9 +145,54 @@ def get_modbus_data(value_type='all', hours=1, start_time=None, end_time=None):
     
     return df
 
-# 사용 예시
-# pv만 조회하기
-pv_data = get_modbus_data('pv', hours=1)
-print("pv 데이터:")
-print(pv_data)
+
+def export_history(path, tags=None, hours=1, start_time=None, end_time=None):
+    """
+    히스토리언에 저장된 원시 값을 Arrow IPC 스트림 또는 Parquet 파일로 내보내는 함수
+    
+    DataFrame으로 모으지 않고 히스토리언에서 배치 단위로 읽은 값을 바로 파일에 쓰므로
+    긴 구간도 메모리를 적게 씁니다. 열은 tag('기계.태그'), ts(UTC), value, quality입니다.
+    히스토리언 DB와 Parquet 보관 위치는 서버 설정(.env)을 따릅니다.
+    
+    Parameters:
+    - path: 저장할 파일 경로 (확장자가 .parquet이면 Parquet, 그 밖에는 Arrow IPC 스트림)
+    - tags: 내보낼 태그 목록 ('기계.태그' 형식, 기본값: 모든 태그)
+    - hours, start_time, end_time: 조회 구간 (get_modbus_data와 같음)
+    
+    Returns:
+    - int: 파일 크기 (바이트)
+    """
+    from app.services.historian.history import export_history_file
+    from app.services.historian.schema import to_epoch_ms
+
+    start_time, end_time = _parse_time_range(hours, start_time, end_time)
+    return export_history_file(path, tags, to_epoch_ms(start_time), to_epoch_ms(end_time))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='모드버스 데이터 조회 프로그램')
+    parser.add_argument('--hours', type=float, default=1,
+                        help='몇 시간 전 데이터부터 가져올지')
+    parser.add_argument('--start', type=str,
+                        help='시작 시간 (YYYY-MM-DD HH:MM:SS 형식)')
+    parser.add_argument('--end', type=str,
+                        help='종료 시간 (YYYY-MM-DD HH:MM:SS 형식)')
+    parser.add_argument('--export', type=str, metavar='PATH',
+                        help='히스토리언 원시 값을 파일로 내보내기 (.parquet이면 Parquet, 그 밖에는 Arrow IPC 스트림)')
+    parser.add_argument('--tags', type=str,
+                        help='내보낼 태그 (기계.태그, 쉼표로 구분, 기본값: 모든 태그)')
+    args = parser.parse_args()
+
+    if args.export:
+        tags = [tag for tag in args.tags.split(',') if tag.strip()] if args.tags else None
+        size = export_history(args.export, tags, args.hours, args.start, args.end)
+        print(f"{args.export}에 저장했습니다. ({size:,} 바이트)")
+    else:
+        # 사용 예시
+        # pv만 조회하기
+        pv_data = get_modbus_data('pv', hours=args.hours, start_time=args.start, end_time=args.end)
+        print("pv 데이터:")
+        print(pv_data)
 
@@ -1,4 +1,6 @@
+from concurrent.futures import ThreadPoolExecutor, wait
 import requests
+from requests.adapters import HTTPAdapter
 import sqlite3
 from datetime import datetime
 import logging
@@ -7,6 +9,10 @@ import os
 import signal
 import atexit
 import sys
+from app.services.historian.scheduler import PeriodicScheduler
+from app.services.historian.spool import Spool
+from app.services.historian.store import HistorianStore
+from app.services.historian.schema import to_epoch_ms
 
 # 로그 디렉토리 설정
 LOG_DIR = '/Users/sajaebin/IneejiModbusTester/logs/dblog'
@@ -15,6 +21,31 @@ os.makedirs(LOG_DIR, exist_ok=True)
 # SQLite 데이터베이스 파일 경로
 DB_NAME = 'modbus_data'
 DB_FILE_ROOT = f'/Users/sajaebin/IneejiModbusTester/{DB_NAME}.db'
+# DB에 저장하지 못한 행을 보관했다가 다음 저장 때 먼저 저장하는 디스크 스풀
+SPOOL_DIR = '/Users/sajaebin/IneejiModbusTester/spool/saver'
+# DB 잠금을 기다리는 최대 시간 (초)
+DB_TIMEOUT = 5
+
+
+# 조회할 기계 이름들과 태그 이름들
+MACHINE_NAMES = ['oil_main', 'oil_1l', 'oil_2l','oil_3l','oil_4l','oil_5l','oil_1r','oil_2r','oil_3r','oil_4r','oxy_main','oxy_1l','oxy_2l','oxy_3l','oxy_4l','oxy_5l','oxy_1r','oxy_2r','oxy_3r','oxy_4r', 'arch_3']
+TAG_NAMES = ['pv','pv', 'sv']
+
+API_BASE_URL = "http://localhost:4444"
+# 저장 간격 (초). 매 분 0초부터 이 간격마다 저장
+SAVE_INTERVAL = 30
+# 한 수집 주기에서 기계 응답을 기다리는 최대 시간 (초). 저장 간격보다 짧아야 함
+CYCLE_DEADLINE = 20
+
+# keep-alive 연결을 재사용하는 HTTP 세션과 기계별 동시 요청용 스레드 풀
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=len(MACHINE_NAMES)))
+executor = ThreadPoolExecutor(max_workers=len(MACHINE_NAMES), thread_name_prefix="saver")
+# 기계별로 진행 중인 조회 (마감이 지나도 응답을 기다리는 요청이 있으면 그 기계는 다시 요청하지 않음)
+in_flight = {}
+spool = Spool(SPOOL_DIR)
+# 넓은 테이블과 같은 값을 히스토리언의 태그별 테이블(/history 조회, 롤업, 보관 기간 정리 대상)에도 저장
+historian = HistorianStore(DB_FILE_ROOT, wide_table=DB_NAME)
 
 
 def setup_logger():
@@ -43,12 +74,6 @@ def setup_logger():
 # 글로벌 로거 객체 초기화
 logger = setup_logger()
 
-def is_save_time():
-    """현재 시간이 저장 시간(30초 또는 0초)인지 확인합니다."""
-    now = datetime.now()
-    return now.second in [0, 30]
-
-
 def init_database():
     """데이터베이스와 테이블을 초기화합니다."""
     try:
@@ -100,51 +125,93 @@ def init_database():
             oxy_4r_pv REAL,
             oxy_4r_sv REAL,
             arch_3_pv REAL,
-            arch_3_sv REAL
+            arch_3_sv REAL,
+            missing_machines TEXT
         )''')
+        # 기존 테이블에 누락 기계 컬럼이 없으면 추가
+        existing_columns = {row[1] for row in cursor.execute(f'PRAGMA table_info({DB_NAME})')}
+        if 'missing_machines' not in existing_columns:
+            cursor.execute(f'ALTER TABLE {DB_NAME} ADD COLUMN missing_machines TEXT')
         # 타임스탬프 인덱스 생성
         cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_timestamp ON {DB_NAME} (timestamp)')
 
         conn.commit()
         conn.close()
+
+        # 히스토리언 스키마를 준비하고, 넓은 테이블에만 저장되어 있던 값을 옮김
+        historian.ensure_schema(
+            (machine.upper(), tag_name.upper()) for machine in MACHINE_NAMES for tag_name in TAG_NAMES
+        )
+        synced = historian.sync_wide_table()
+        if synced:
+            logger.info(f"넓은 테이블에만 있던 값 {synced}건을 히스토리언에 저장")
         logger.info("데이터베이스 테이블 초기화 완료")
         return True
     except Exception as e:
         logger.error(f"데이터베이스 초기화 오류: {str(e)}")
         return False
 
-def get_tag_values():
-    """기계별 태그 값을 가져옵니다."""
-    # 조회할 기계 이름들과 태그 이름들을 리스트로 설정
-    machine_names = ['oil_main', 'oil_1l', 'oil_2l','oil_3l','oil_4l','oil_5l','oil_1r','oil_2r','oil_3r','oil_4r','oxy_main','oxy_1l','oxy_2l','oxy_3l','oxy_4l','oxy_5l','oxy_1r','oxy_2r','oxy_3r','oxy_4r', 'arch_3']
-    tag_names = ['pv','pv', 'sv']
+def fetch_machine_values(machine):
+    """기계 하나의 태그 값을 조회합니다. 실패하면 None을 반환합니다."""
+    url = f"{API_BASE_URL}/machine/{machine}/values"
+    # 태그 이름을 콤마(,)로 연결하여 쿼리 파라미터로 전달
+    params = {"tag_names": ','.join(TAG_NAMES)}
+    try:
+        response = session.get(url, params=params, timeout=(3, CYCLE_DEADLINE))
+        if response.status_code == 200:
+            json_data = response.json()
+            if json_data.get("success"):
+                return json_data.get("data")
+            logger.warning(f"기계 {machine}의 데이터 가져오기 실패: {json_data.get('message')}")
+        else:
+            logger.warning(f"기계 {machine}의 HTTP 오류: {response.status_code}")
+    except Exception as e:
+        logger.warning(f"기계 {machine} 조회 중 예외 발생: {str(e)}")
+    return None
+
+def collect_tag_values(deadline=CYCLE_DEADLINE):
+    """모든 기계를 스레드 풀에서 동시에 조회하고, deadline 안에 응답하지 않은 기계는 누락으로 표시합니다.
+
+    마감이 지나도 스레드의 요청은 끝까지 기다리므로, 이전 주기의 요청이 아직 끝나지
+    않은 기계는 새로 요청하지 않고 누락으로 기록합니다. 기계마다 요청이 하나뿐이므로
+    스레드 풀이 밀려 다음 주기의 요청이 늦게 시작되지 않습니다.
+    """
+    futures = {}
+    busy = []
+    for machine in MACHINE_NAMES:
+        previous = in_flight.get(machine)
+        if previous is not None and not previous.done():
+            busy.append(machine)
+            continue
+        futures[machine] = in_flight[machine] = executor.submit(fetch_machine_values, machine)
+    done, pending = wait(futures.values(), timeout=deadline)
 
-    # 최종 결과를 저장할 딕셔너리
     aggregated_results = {}
+    missing_machines = list(busy)
+    for machine, future in futures.items():
+        data = future.result() if future in done else None
+        if data is None:
+            missing_machines.append(machine)
+        else:
+            # 기계 이름을 key로 하여 해당 기계의 태그 값을 저장
+            aggregated_results[machine] = data
+    if busy:
+        logger.warning(f"이전 주기의 조회가 아직 끝나지 않은 기계: {busy}")
+    if pending:
+        logger.warning(f"{deadline}초 안에 응답하지 않은 기계: {[m for m, f in futures.items() if f in pending]}")
+    return aggregated_results, missing_machines
 
-    # 각 기계별로 API 호출을 수행
-    logger.info(f"== □ □ □ 데이터 조회 시작 ==")
+def get_tag_values():
+    """기계별 태그 값을 동시에 가져옵니다.
 
-    for machine in machine_names:
-        url = f"http://localhost:4444/machine/{machine}/values"
-        # 태그 이름을 콤마(,)로 연결하여 쿼리 파라미터로 전달
-        params = {"tag_names": ','.join(tag_names)}
-        try:
-            response = requests.get(url, params=params)
-            if response.status_code == 200:
-                json_data = response.json()
-                if json_data.get("success"):
-                    # 기계 이름을 key로 하여 해당 기계의 태그 값을 저장
-                    aggregated_results[machine] = json_data.get("data")
-                else:
-                    logger.warning(f"기계 {machine}의 데이터 가져오기 실패: {json_data.get('message')}")
-            else:
-                logger.warning(f"기계 {machine}의 HTTP 오류: {response.status_code}")
-        except Exception as e:
-            logger.warning(f"기계 {machine} 조회 중 예외 발생: {str(e)}")
-    
-    logger.info(f"== ■ □ □ 데이터 조회 완료 ==")
-    return aggregated_results
+    Returns:
+        (기계별 태그 값, 값을 가져오지 못한 기계 목록)
+    """
+    logger.info(f"== □ □ □ 데이터 조회 시작 ==")
+    started = time.monotonic()
+    aggregated_results, missing_machines = collect_tag_values()
+    logger.info(f"== ■ □ □ 데이터 조회 완료 ({time.monotonic() - started:.1f}초, 누락 {len(missing_machines)}대) ==")
+    return aggregated_results, missing_machines
 
 def process_value(machine, value):
     """기계와 값에 따라 적절한 변환을 적용합니다."""
@@ -169,43 +236,66 @@ def process_value(machine, value):
         logger.warning(f"값 처리 중 오류: {str(e)}, machine: {machine}, value: {value}")
         return None
 
-def save_to_database(tag_values):
-    """태그 값을 데이터베이스에 저장합니다."""
+def save_to_database(tag_values, missing_machines=(), timestamp=None):
+    """태그 값을 데이터베이스에 저장합니다.
+
+    일부 기계만 응답한 경우에도 받은 값은 저장하고, 값이 없는 기계 목록은
+    missing_machines 컬럼에 콤마(,)로 연결하여 기록합니다. 모든 기계가 응답하지 않은
+    주기도 값 없이 누락 기계만 기록한 행을 남깁니다. timestamp는 저장 주기의
+    기준 시각이며, 없으면 현재 시간을 사용합니다.
+
+    DB가 잠겨 있는 등 저장에 실패하면 행을 스풀에 보관하고, 이후 저장 때 스풀의
+    행을 시각 순으로 먼저 저장합니다.
+    """
     try:
-        if not tag_values:
+        if not tag_values and not missing_machines:
             logger.warning("저장할 태그 값이 없습니다")
             return False
+        if not tag_values:
+            logger.warning("모든 기계의 값을 가져오지 못했습니다. 누락 기계만 기록합니다.")
             
-        # 현재 시간을 YYYY-MM-DD HH:MM:SS 형식으로 가져옴
-        current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        # 저장 시각을 YYYY-MM-DD HH:MM:SS 형식으로 변환
+        timestamp = timestamp or datetime.now()
+        current_time = timestamp.strftime('%Y-%m-%d %H:%M:%S')
         logger.info(f"== ■ ■ □ 데이터 저장 시작 ==")
-        # 데이터베이스 연결
-        conn = sqlite3.connect(DB_FILE_ROOT)
-        cursor = conn.cursor()
         
         # INSERT 쿼리 생성을 위한 컬럼과 값 준비
         columns = ['timestamp']
         values = [current_time]
-        placeholders = ['?']
+        missing = list(missing_machines)
         
         # 각 기계의 태그 값을 컬럼과 값 목록에 추가
         for machine, data in tag_values.items():
+            saved = False
             if isinstance(data, dict) and 'error' not in data:
                 for tag_name in ['pv', 'sv']:
                     tag_key = next((k for k in data.keys() if k.lower() == tag_name.lower()), None)
                     if tag_key:
-                        column_name = f"{machine}_{tag_name}"
-                        columns.append(column_name)
                         processed_value = process_value(machine, data[tag_key])
+                        # 값이 있는 컬럼만 추가해야 컬럼 수와 값 수가 맞음
                         if processed_value is not None:
+                            columns.append(f"{machine}_{tag_name}")
                             values.append(str(processed_value))
-                            placeholders.append('?')
+                            saved = True
+            if not saved:
+                missing.append(machine)
+
+        if missing:
+            logger.warning(f"값이 없는 기계: {missing}")
+            columns.append('missing_machines')
+            values.append(','.join(missing))
         
-        # INSERT 쿼리 실행
-        query = f"INSERT INTO {DB_NAME} ({', '.join(columns)}) VALUES ({', '.join(placeholders)})"
-        cursor.execute(query, values)
-        conn.commit()
-        conn.close()
+        row = dict(zip(columns, values))
+        try:
+            # 스풀에 남은 행이 있으면 시각 순서를 지키도록 먼저 저장
+            if spool.pending:
+                drained = spool.drain(lambda records: insert_rows([r for _, r in records]))
+                logger.info(f"스풀에 보관했던 {drained}개 행 저장 완료")
+            insert_rows([row])
+        except sqlite3.Error as e:
+            spool.append([(int(timestamp.timestamp() * 1000), row)])
+            logger.warning(f"데이터베이스 저장 실패, 스풀에 보관: {str(e)}")
+            return False
         
         logger.info(f"== ■ ■ ■ 데이터베이스에 {current_time} 시간의 데이터 저장 완료 ==")
         return True
@@ -213,6 +303,33 @@ def save_to_database(tag_values):
         logger.error(f"데이터베이스 저장 오류: {str(e)}")
         return False
 
+def insert_rows(rows):
+    """행(컬럼 이름: 값)들을 한 트랜잭션으로 저장하고, 같은 값을 히스토리언에도 저장합니다.
+
+    두 저장 모두 이미 저장된 시각의 값은 건너뛰므로, 도중에 실패해 스풀에 보관한 행을
+    다시 저장해도 중복되지 않습니다.
+    """
+    conn = sqlite3.connect(DB_FILE_ROOT, timeout=DB_TIMEOUT)
+    try:
+        with conn:
+            for row in rows:
+                placeholders = ', '.join('?' for _ in row)
+                query = f"INSERT OR IGNORE INTO {DB_NAME} ({', '.join(row)}) VALUES ({placeholders})"
+                conn.execute(query, list(row.values()))
+    finally:
+        conn.close()
+    historian.write_rows([value for row in rows for value in historian_rows(row)])
+
+def historian_rows(row):
+    """넓은 테이블 행을 히스토리언 행((기계, 태그), ts, 값)으로 변환합니다. 값이 없는 태그는 None(값 없음)으로 기록합니다."""
+    ts = to_epoch_ms(datetime.strptime(row['timestamp'], '%Y-%m-%d %H:%M:%S'))
+    values = []
+    for machine in MACHINE_NAMES:
+        for tag_name in dict.fromkeys(TAG_NAMES):
+            value = row.get(f"{machine}_{tag_name}")
+            values.append(((machine.upper(), tag_name.upper()), ts, float(value) if value is not None else None))
+    return values
+
 def check_logger_date():
     """날짜가 변경되었는지 확인하고 필요시 로거를 재설정합니다."""
     global logger
@@ -230,41 +347,21 @@ def check_logger_date():
                 logger.info(f"날짜 변경으로 로그 파일 교체: {log_file_date} -> {current_date}")
                 break
 
-def wait_for_next_save_time():
-    """다음 저장 시간(0초 또는 30초)까지 대기합니다."""
-    now = datetime.now()
-    seconds = now.second
-    
-    # 다음 실행 시간 계산 (다음 30초 또는 0초)
-    if seconds < 30:
-        wait_seconds = 30 - seconds
-    else:
-        wait_seconds = 60 - seconds
-        
-    # 밀리초 추가 고려
-    wait_seconds -= now.microsecond / 1000000
-    if wait_seconds <= 0:
-        wait_seconds += 30
-        
-    logger.info(f"{now.strftime('%Y-%m-%d %H:%M:%S')} - 다음 저장 시간까지 {wait_seconds:.1f}초 대기")
-    time.sleep(wait_seconds)
-
-def main():
-    """메인 실행 함수"""
+def main(tick):
+    """메인 실행 함수 (저장 주기 하나)"""
     try:
-        # 현재 시간이 저장 시간인지 확인
-        if not is_save_time():
-            logger.info("저장 시간이 아니므로 태그 값 저장을 건너뜁니다.")
-            return
-            
+        # 이전 주기가 늦게 끝나 건너뛴 주기 기록
+        if tick.missed:
+            logger.warning(f"이전 저장이 늦어 {tick.missed}개 주기를 건너뛰었습니다.")
+
         # 날짜 변경 확인 및 로거 업데이트
         check_logger_date()
         
         # 태그 값 가져오기
-        tag_values = get_tag_values()
+        tag_values, missing_machines = get_tag_values()
         
-        # 데이터베이스에 저장
-        save_to_database(tag_values)
+        # 데이터베이스에 저장 (응답하지 않은 기계는 누락으로 기록)
+        save_to_database(tag_values, missing_machines, tick.timestamp)
         
     except Exception as e:
         logger.error(f"실행 중 오류 발생: {str(e)}")
@@ -276,6 +373,7 @@ def handle_exit_signal(signum, frame):
     sys.exit(0)
 
 def on_exit():
+    historian.close()
     logger.info("프로그램이 정상적으로 종료되었습니다.")
     logger.info("================================================")
 
@@ -289,9 +387,12 @@ if __name__ == "__main__":
     logger.info("================================================")
     init_database()
 
+    # 단조 시계로 주기를 정하므로 저장이 오래 걸리거나 시스템 시계가 바뀌어도 주기가 밀리지 않음
+    scheduler = PeriodicScheduler(SAVE_INTERVAL)
     while True:
-        # 메인 함수 실행
-        main()
-        
         # 다음 저장 시간까지 대기
-        wait_for_next_save_time()
\ No newline at end of file
+        logger.info(f"다음 저장 시간까지 {scheduler.next_tick():.1f}초 대기")
+        tick = scheduler.wait()
+
+        # 메인 함수 실행 (끝난 뒤 다음 주기를 기다리므로 저장이 겹치지 않음)
+        main(tick)
\ No newline at end of file
@@ -0,0 +1,122 @@
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import pytest
+from pymodbus.exceptions import ModbusIOException
+from pymodbus.pdu import ExceptionResponse
+
+# 설정의 기본 경로(PROJECT_DIR)가 실제 운영 디렉토리를 가리키지 않도록 app을 불러오기 전에 바꿈
+os.environ["PROJECT_DIR"] = tempfile.mkdtemp(prefix="modbus_test_")
+
+from app.services.modbus.client import DatabaseClientManager  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    """임시 파일에 만든 설정 DB"""
+    manager = DatabaseClientManager(str(tmp_path / "modbus_config.db"))
+    yield manager
+    manager.close()
+
+
+class FakeResponse:
+    def __init__(self, registers):
+        self.registers = registers
+
+    def isError(self):
+        return False
+
+
+class FakeModbusClient:
+    """레지스터 딕셔너리로 동작하는 동기 Modbus 클라이언트 대역
+
+    없는 주소를 포함한 요청에는 잘못된 주소(예외 코드 2) 응답을 돌려주고,
+    fail에 포함된 주소를 건드리는 요청에는 ModbusIOException(시간 초과)을 던집니다.
+    """
+
+    connected = True
+
+    def __init__(self, registers, fail=()):
+        self.registers = dict(registers)
+        self.fail = set(fail)
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def read_holding_registers(self, address, count=1, slave=1):
+        with self._lock:
+            self.requests.append((address, count))
+        span = range(address, address + count)
+        if any(register in self.fail for register in span):
+            raise ModbusIOException("응답 시간 초과")
+        if any(register not in self.registers for register in span):
+            return ExceptionResponse(3, ExceptionResponse.ILLEGAL_ADDRESS)
+        return FakeResponse([self.registers[register] for register in span])
+
+    def close(self):
+        pass
+
+
+class FakeClientManager:
+    """ModbusClientManager 대신 FakeModbusClient를 빌려주는 대역"""
+
+    slave = 1
+
+    def __init__(self, client):
+        self.client = client
+
+    @contextmanager
+    def connect(self):
+        yield self.client
+
+
+@pytest.fixture
+def fake_modbus():
+    """레지스터 딕셔너리로 (클라이언트 매니저, 클라이언트)를 만드는 팩토리"""
+
+    def factory(registers, fail=()):
+        client = FakeModbusClient(registers, fail)
+        return FakeClientManager(client), client
+
+    return factory
+
+
+class FlakyStore:
+    """broken인 동안 저장에 실패하는 저장소 대역"""
+
+    def __init__(self, store):
+        self.store = store
+        self.broken = False
+        self.calls = []
+        self.written = threading.Event()
+
+    def write_rows(self, rows):
+        self.calls.append(len(rows))
+        if self.broken:
+            raise OSError("database is locked")
+        inserted = self.store.write_rows(rows)
+        self.written.set()
+        return inserted
+
+
+@pytest.fixture
+def store(tmp_path):
+    """임시 파일에 만든 히스토리언 저장소 (일 단위 파티션)"""
+    from app.services.historian.store import HistorianStore
+
+    historian = HistorianStore(
+        str(tmp_path / "historian.db"),
+        wide_table="modbus_data",
+        partition="day",
+        archive_dir=str(tmp_path / "archive"),
+    )
+    historian.ensure_schema([])
+    yield historian
+    historian.close()
+
+
+@pytest.fixture
+def flaky_store(store):
+    """store에 저장하되 broken인 동안 실패하는 저장소 대역"""
+    return FlakyStore(store)
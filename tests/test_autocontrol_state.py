@@ -0,0 +1,41 @@
+import pytest
+
+from app.services.modbus.dao.auto_controll_dao import AutoControllDAO
+
+
+@pytest.fixture
+def dao(db, monkeypatch):
+    monkeypatch.setattr(AutoControllDAO, "_state", None)
+    return AutoControllDAO(db)
+
+
+def test_default_state_is_disabled(dao):
+    result = dao.get_autocontrol()
+
+    assert result.success
+    assert result.data == {"enabled": False}
+
+
+def test_set_is_visible_immediately_and_persisted_behind(dao, db, monkeypatch):
+    dao.set_autocontrol(True)
+    state = dao.get_autocontrol().data
+
+    assert state["enabled"] is True
+    # DB 스레드의 대기열을 비우면 저장이 끝나 있어야 함
+    db.executor.shutdown()
+    rows = db.execute_query("SELECT enabled FROM autocontrol WHERE id = 1")
+    assert rows == [{"enabled": 1}]
+
+    # 재시작을 흉내 내 메모리 상태를 지우고 DB에서 복원
+    monkeypatch.setattr(AutoControllDAO, "_state", None)
+    restored = AutoControllDAO(db).get_autocontrol().data
+    assert restored == state
+
+
+def test_last_write_wins(dao, db):
+    for enabled in (True, False, True, False):
+        dao.set_autocontrol(enabled)
+    db.executor.shutdown()
+
+    assert db.execute_query("SELECT enabled FROM autocontrol")[0]["enabled"] == 0
+    assert dao.get_autocontrol().data["enabled"] is False
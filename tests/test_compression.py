@@ -0,0 +1,134 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from app.models.schemas import CompressionMode, HistorianCompression
+from app.services.historian.compression import (
+    NO_COMPRESSION,
+    Compressor,
+    DeadbandFilter,
+    SwingingDoorFilter,
+    reconstruct,
+    resolve_compression,
+)
+
+STEP = 1000
+
+
+def signal(count=2000, seed=7):
+    """잡음이 섞인 느린 추세와 계단 변화"""
+    rng = random.Random(seed)
+    values = []
+    for i in range(count):
+        trend = 40 + 10 * math.sin(i / 150) + (15 if 800 <= i < 1100 else 0)
+        values.append(round(trend + rng.uniform(-0.2, 0.2), 3))
+    return [(i * STEP, value) for i, value in enumerate(values)]
+
+
+def compress(value_filter, points):
+    stored = []
+    for ts, value in points:
+        stored.extend(value_filter.offer(ts, value))
+    stored.extend(value_filter.flush())
+    return stored
+
+
+def restored(stored, mode, points):
+    ts = np.array([t for t, _ in stored], dtype=np.int64)
+    values = np.array([np.nan if v is None else v for _, v in stored])
+    _, result = reconstruct(ts, values, mode, 0, points[-1][0] + STEP, STEP, 10**9)
+    return result
+
+
+@pytest.mark.parametrize(
+    "mode, filter_class",
+    [
+        (CompressionMode.DEADBAND, DeadbandFilter),
+        (CompressionMode.SWINGING_DOOR, SwingingDoorFilter),
+    ],
+)
+def test_reconstructed_values_stay_within_deviation(mode, filter_class):
+    spec = HistorianCompression(mode=mode, deviation=0.5, max_interval=10_000)
+    points = signal()
+
+    stored = compress(filter_class(spec), points)
+    error = np.abs(restored(stored, mode.value, points) - np.array([v for _, v in points]))
+
+    assert len(stored) < len(points) / 5
+    assert error.max() <= 0.5 + 1e-9
+
+
+def test_swinging_door_stores_fewer_points_than_deadband_on_ramps():
+    ramp = [(i * STEP, i * 0.1) for i in range(600)]
+    spec = dict(deviation=0.5, max_interval=10_000)
+
+    deadband = compress(DeadbandFilter(HistorianCompression(mode=CompressionMode.DEADBAND, **spec)), ramp)
+    door = compress(
+        SwingingDoorFilter(HistorianCompression(mode=CompressionMode.SWINGING_DOOR, **spec)), ramp
+    )
+
+    assert len(door) == 2
+    assert len(deadband) > 50
+
+
+@pytest.mark.parametrize("filter_class", [DeadbandFilter, SwingingDoorFilter])
+def test_constant_value_is_stored_every_max_interval(filter_class):
+    spec = HistorianCompression(deviation=1, max_interval=10)
+    points = [(i * STEP, 5.0) for i in range(35)]
+
+    stored = compress(filter_class(spec), points)
+
+    gaps = np.diff([ts for ts, _ in stored])
+    assert stored[0] == (0, 5.0)
+    assert gaps.max() <= 10 * STEP
+
+
+@pytest.mark.parametrize("filter_class", [DeadbandFilter, SwingingDoorFilter])
+def test_missing_values_are_always_stored(filter_class):
+    spec = HistorianCompression(deviation=100, max_interval=3600)
+    points = [(0, 1.0), (1000, 1.0), (2000, None), (3000, 1.0), (4000, 1.0)]
+
+    stored = compress(filter_class(spec), points)
+
+    assert (2000, None) in stored
+    assert (3000, 1.0) in stored
+
+
+def test_percent_deviation_scales_with_last_stored_value():
+    spec = HistorianCompression(mode=CompressionMode.DEADBAND, deviation=10, percent=True)
+    value_filter = DeadbandFilter(spec)
+
+    assert value_filter.offer(0, 200.0) == [(0, 200.0)]
+    assert value_filter.offer(1000, 219.0) == []
+    assert value_filter.offer(2000, 221.0) == [(2000, 221.0)]
+
+
+def test_resolve_compression_prefers_exact_rule_then_first_pattern():
+    exact = HistorianCompression(mode=CompressionMode.DEADBAND, deviation=1)
+    pattern = HistorianCompression(mode=CompressionMode.SWINGING_DOOR, deviation=2)
+    rules = {"PUMP.PV": exact, "pump.*": pattern, "*": NO_COMPRESSION}
+
+    assert resolve_compression(("PUMP", "PV"), rules) is exact
+    assert resolve_compression(("PUMP", "SV"), rules) is pattern
+    assert resolve_compression(("FAN", "PV"), rules) is NO_COMPRESSION
+    assert resolve_compression(("FAN", "PV"), {}) is NO_COMPRESSION
+
+
+def test_compressor_passes_uncompressed_tags_and_flushes_held_values():
+    compressor = Compressor(
+        {"PUMP.*": HistorianCompression(mode=CompressionMode.SWINGING_DOOR, deviation=1)}
+    )
+
+    rows = []
+    for i in range(10):
+        rows += compressor.process(i * STEP, {("PUMP", "PV"): float(i), ("FAN", "PV"): 3.0})
+    held = compressor.flush()
+
+    assert [row for row in rows if row[0] == ("FAN", "PV")] == [
+        (("FAN", "PV"), i * STEP, 3.0) for i in range(10)
+    ]
+    assert [row for row in rows if row[0] == ("PUMP", "PV")] == [(("PUMP", "PV"), 0, 0.0)]
+    assert held == [(("PUMP", "PV"), 9 * STEP, 9.0)]
+    assert compressor.stats() == {"received": 20, "stored": 12, "ratio": 1.67}
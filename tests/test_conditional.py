@@ -0,0 +1,87 @@
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.api.conditional import config_response
+from app.core.config import settings
+from app.models.schemas import ApiResponse, MachineConfig
+
+
+@pytest.fixture
+def built():
+    return []
+
+
+@pytest.fixture
+def client(built):
+    app = FastAPI()
+
+    @app.get("/machines/{name}")
+    async def get_machine(request: Request, name: str):
+        name = name.upper()
+
+        def build(snapshot):
+            built.append(name)
+            return ApiResponse(success=True, message=name, data=snapshot.machines[name].ip)
+
+        return config_response(request, ("machine", name), build)
+
+    @app.get("/machines")
+    async def get_machines(request: Request):
+        def build(snapshot):
+            built.append("*")
+            return ApiResponse(success=True, message="목록", data=list(snapshot.machine_names))
+
+        return config_response(request, "machines", build)
+
+    settings.update_machines_config({"PUMP": MachineConfig(ip="10.0.0.1"), "FAN": MachineConfig(ip="10.0.0.2")})
+    return TestClient(app)
+
+
+def test_response_has_etag_and_body(client):
+    response = client.get("/machines/pump")
+
+    assert response.status_code == 200
+    assert response.json() == {"success": True, "message": "PUMP", "data": "10.0.0.1"}
+    assert response.headers["etag"].startswith(f'"{settings.config.snapshot_id}-')
+    assert response.headers["cache-control"] == "no-cache"
+
+
+def test_matching_etag_returns_304_without_building(client, built):
+    etag = client.get("/machines/PUMP").headers["etag"]
+    built.clear()
+
+    for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        response = client.get("/machines/PUMP", headers={"If-None-Match": header})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+    assert built == []
+
+
+def test_body_is_built_once_per_snapshot_regardless_of_case(client, built):
+    first = client.get("/machines/pump")
+    second = client.get("/machines/PUMP")
+
+    assert first.content == second.content
+    assert first.headers["etag"] == second.headers["etag"]
+    assert built == ["PUMP"]
+
+
+def test_etag_differs_per_route(client):
+    etags = {
+        client.get(path).headers["etag"] for path in ("/machines", "/machines/PUMP", "/machines/FAN")
+    }
+    assert len(etags) == 3
+
+
+def test_config_change_invalidates_etag(client, built):
+    etag = client.get("/machines/PUMP").headers["etag"]
+
+    settings.apply_machine("PUMP", MachineConfig(ip="10.0.0.9"))
+    response = client.get("/machines/PUMP", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.json()["data"] == "10.0.0.9"
+    assert response.headers["etag"] != etag
+    assert built == ["PUMP", "PUMP"]
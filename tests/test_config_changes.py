@@ -0,0 +1,131 @@
+import pytest
+
+from app.core.config import settings
+from app.models.schemas import MachineConfig, Permission, TagConfig, TagType
+from app.services.modbus.dao.config_change_dao import ConfigChangeDAO
+from app.services.modbus.machine import MachineService
+
+
+def _analog(register):
+    return TagConfig(
+        tag_type=TagType.ANALOG,
+        logical_register=str(40001 + register),
+        real_register=str(register),
+        permission=Permission.READ,
+    )
+
+
+@pytest.fixture
+def service(db):
+    return MachineService(db)
+
+
+def _replay(changes, state=None):
+    """변경 이력을 순서대로 적용한 {기계: {"config": ..., "tags": {태그: 설정}}}"""
+    state = {} if state is None else state
+    for change in changes:
+        machine = change["machine_name"]
+        if change["entity"] == "machine":
+            if change["action"] == "delete":
+                state.pop(machine, None)
+            else:
+                state.setdefault(machine, {"tags": {}})["config"] = change["config"]
+        elif change["action"] == "delete":
+            state.get(machine, {"tags": {}})["tags"].pop(change["tag_name"], None)
+        else:
+            state.setdefault(machine, {"tags": {}})["tags"][change["tag_name"]] = change["config"]
+    return state
+
+
+def _current():
+    return {
+        name: {
+            "config": {"ip": config.ip, "port": config.port, "slave": config.slave},
+            "tags": {tag: tag_config.model_dump(mode="json") for tag, tag_config in config.tags.items()},
+        }
+        for name, config in settings.config.machines.items()
+    }
+
+
+def _churn(service):
+    service.add_machine("pump", MachineConfig(ip="10.0.0.1"))
+    service.add_machine("old", MachineConfig(ip="10.0.0.2"))
+    service.add_machine_tag("old", "pv", _analog(0))
+    for register in range(5):
+        service.add_machine_tag("pump", f"t{register}", _analog(register))
+        service.update_machine_tag("pump", f"t{register}", _analog(register + 100))
+    service.delete_machine_tag("pump", "t0")
+    service.delete_machine("old")
+
+
+def test_list_since_pages_in_version_order(service, db):
+    _churn(service)
+    dao = ConfigChangeDAO(db)
+
+    pages, since = [], 0
+    while True:
+        page = dao.list_since(since, 4)
+        pages.append(page)
+        since = page["version"]
+        if not page["has_more"]:
+            break
+
+    versions = [change["version"] for page in pages for change in page["changes"]]
+    assert versions == sorted(versions)
+    assert len(versions) == len(set(versions))
+    assert pages[-1]["version"] == pages[-1]["latest"]
+    assert _replay(change for page in pages for change in page["changes"]) == _current()
+
+
+def test_machine_delete_records_tag_deletes(service, db):
+    _churn(service)
+
+    changes = ConfigChangeDAO(db).list_since(0, 1000)["changes"]
+
+    assert [(c["entity"], c["tag_name"], c["action"]) for c in changes[-2:]] == [
+        ("tag", "PV", "delete"),
+        ("machine", None, "delete"),
+    ]
+
+
+def test_compaction_keeps_latest_change_per_entity(service, db):
+    _churn(service)
+    dao = ConfigChangeDAO(db)
+    before = dao.list_since(0, 1000)
+
+    deleted = dao.compact()
+    after = dao.list_since(0, 1000)
+
+    assert deleted == len(before["changes"]) - len(after["changes"]) > 0
+    keys = [(c["entity"], c["machine_name"], c["tag_name"]) for c in after["changes"]]
+    assert len(keys) == len(set(keys))
+    assert after["latest"] == before["latest"]
+    assert _replay(after["changes"]) == _current()
+
+
+def test_replay_from_middle_version_converges_after_compaction(service, db):
+    dao = ConfigChangeDAO(db)
+    service.add_machine("pump", MachineConfig(ip="10.0.0.1"))
+    service.add_machine_tag("pump", "pv", _analog(0))
+    # 클라이언트가 여기까지 복제했다고 가정
+    replica = _replay(dao.list_since(0, 1000)["changes"])
+    since = dao.list_since(0, 1000)["version"]
+
+    service.update_machine_tag("pump", "pv", _analog(5))
+    service.add_machine_tag("pump", "sv", _analog(1))
+    service.delete_machine_tag("pump", "sv")
+    dao.compact()
+
+    assert _replay(dao.list_since(since, 1000)["changes"], replica) == _current()
+
+
+def test_record_compacts_every_n_versions(service, db, monkeypatch):
+    monkeypatch.setattr(ConfigChangeDAO, "COMPACT_EVERY", 5)
+    service.add_machine("pump", MachineConfig(ip="10.0.0.1"))
+    service.add_machine_tag("pump", "pv", _analog(0))
+    for register in range(1, 8):
+        service.update_machine_tag("pump", "pv", _analog(register))
+
+    rows = db.execute_query("SELECT version FROM config_changes")
+    assert len(rows) < 9
+    assert _replay(ConfigChangeDAO(db).list_since(0, 1000)["changes"]) == _current()
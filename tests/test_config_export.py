@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+from app.models.schemas import MachineConfigFormat, Permission, TagConfigFormat, TagType
+from app.services import config as config_module
+from app.services.config import ConfigService
+
+
+@pytest.fixture
+def service(db):
+    service = ConfigService(db)
+    service.import_config(
+        {
+            "PUMP": MachineConfigFormat(
+                ip="10.0.0.1",
+                tags={
+                    "PV": TagConfigFormat(tag_type=TagType.ANALOG, logical_register="40001", real_register="0", permission=Permission.READ),
+                    "RUN": TagConfigFormat(tag_type=TagType.DIGITAL, logical_register="40002.0", real_register="1.0", permission=Permission.READ_WRITE),
+                },
+            ),
+            "EMPTY": MachineConfigFormat(ip="10.0.0.2", port=5020, slave=3),
+        }
+    )
+    return service
+
+
+EXPECTED = {
+    "EMPTY": {"ip": "10.0.0.2", "port": 5020, "slave": 3, "tags": {}},
+    "PUMP": {
+        "ip": "10.0.0.1",
+        "port": 502,
+        "slave": 1,
+        "tags": {
+            "PV": {"tag_type": "Analog", "logical_register": "40001", "real_register": "0", "permission": "Read"},
+            "RUN": {"tag_type": "Digital", "logical_register": "40002.0", "real_register": "1.0", "permission": "ReadWrite"},
+        },
+    },
+}
+
+
+def test_iter_export_machines_groups_join_rows(service):
+    assert dict(service.iter_export_machines()) == EXPECTED
+    assert [name for name, _ in service.iter_export_machines()] == ["EMPTY", "PUMP"]
+
+
+def test_iter_export_json_is_a_valid_api_response(service):
+    rows = service.load_export_rows()
+
+    body = json.loads(b"".join(service.iter_export_json("추출 완료", rows)))
+
+    assert body == {
+        "success": True,
+        "message": "추출 완료",
+        "data": {"config": EXPECTED, "saved_path": None},
+        "error": None,
+    }
+
+
+def test_iter_export_json_uses_rows_read_before_streaming(service, db):
+    rows = service.load_export_rows()
+    # 응답을 시작한 뒤의 설정 변경이나 DB 오류는 이미 읽은 내용에 영향을 주지 않음
+    db.execute_write("DELETE FROM machines")
+    db.close()
+
+    body = json.loads(b"".join(service.iter_export_json("추출 완료", rows)))
+
+    assert body["data"]["config"] == EXPECTED
+
+
+def test_iter_export_json_with_no_machines(db):
+    body = json.loads(b"".join(ConfigService(db).iter_export_json("없음", [])))
+    assert body["data"]["config"] == {}
+
+
+def test_export_config_deduplicates_snapshots(service, tmp_path, monkeypatch):
+    monkeypatch.setattr(config_module, "CONFIG_SNAPSHOT_DIR", str(tmp_path / "config"))
+
+    first = service.export_config()
+    second = service.export_config()
+
+    assert first["config"] == EXPECTED
+    assert first["deduplicated"] is False
+    assert second["deduplicated"] is True
+    assert second["saved_path"] == first["saved_path"]
+    with open(first["saved_path"], encoding="utf-8") as f:
+        assert json.load(f) == EXPECTED
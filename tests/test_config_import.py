@@ -0,0 +1,114 @@
+import pytest
+
+from app.core.config import settings
+from app.models.schemas import MachineConfigFormat, Permission, TagConfigFormat, TagType
+from app.services.config import ConfigService
+
+
+def _tag(register, permission=Permission.READ):
+    return TagConfigFormat(
+        tag_type=TagType.ANALOG,
+        logical_register=str(40001 + register),
+        real_register=str(register),
+        permission=permission,
+    )
+
+
+def _config(pump_tags=None, pump_ip="10.0.0.1"):
+    return {
+        "PUMP": MachineConfigFormat(
+            ip=pump_ip,
+            tags=pump_tags if pump_tags is not None else {"PV": _tag(0), "SV": _tag(1)},
+        ),
+        "FAN": MachineConfigFormat(ip="10.0.0.2", tags={"PV": _tag(10)}),
+    }
+
+
+@pytest.fixture
+def service(db):
+    return ConfigService(db)
+
+
+def _tag_ids(db):
+    return {
+        (row["name"], row["tag_name"]): row["id"]
+        for row in db.execute_query(
+            "SELECT machines.name, tags.tag_name, tags.id FROM tags JOIN machines ON machines.id = tags.machine_id"
+        )
+    }
+
+
+def test_first_import_inserts_everything(service):
+    diff = service.import_config(_config())
+
+    assert diff["summary"] == {
+        "machines_inserted": 2,
+        "machines_updated": 0,
+        "machines_unchanged": 0,
+        "tags_inserted": 3,
+        "tags_updated": 0,
+        "tags_deleted": 0,
+    }
+    assert diff["machines"]["PUMP"] == {
+        "action": "insert",
+        "tags": {"insert": ["PV", "SV"], "update": [], "delete": []},
+    }
+    assert set(settings.config.machines["PUMP"].tags) == {"PV", "SV"}
+
+
+def test_reimport_of_same_config_changes_nothing(service, db):
+    service.import_config(_config())
+    ids = _tag_ids(db)
+    fan = settings.config.machines["FAN"]
+
+    diff = service.import_config(_config())
+
+    assert diff["machines"] == {}
+    assert diff["summary"]["machines_unchanged"] == 2
+    assert _tag_ids(db) == ids
+    assert settings.config.machines["FAN"] is fan
+
+
+def test_import_touches_only_changed_rows(service, db):
+    service.import_config(_config())
+    ids = _tag_ids(db)
+    fan = settings.config.machines["FAN"]
+
+    diff = service.import_config(
+        _config({"PV": _tag(0), "SV": _tag(1, Permission.READ_WRITE), "MV": _tag(2)})
+    )
+
+    assert diff["machines"] == {
+        "PUMP": {"action": "unchanged", "tags": {"insert": ["MV"], "update": ["SV"], "delete": []}}
+    }
+    new_ids = _tag_ids(db)
+    # 바뀌지 않은 태그와 값만 바뀐 태그는 같은 행을 유지
+    assert new_ids[("PUMP", "PV")] == ids[("PUMP", "PV")]
+    assert new_ids[("PUMP", "SV")] == ids[("PUMP", "SV")]
+    assert settings.config.machines["PUMP"].tags["SV"].permission == Permission.READ_WRITE
+    assert settings.config.machines["FAN"] is fan
+
+
+def test_import_deletes_missing_tags_and_updates_connection(service, db):
+    service.import_config(_config())
+
+    diff = service.import_config(_config({"PV": _tag(0)}, pump_ip="10.0.0.9"))
+
+    assert diff["machines"]["PUMP"] == {
+        "action": "update",
+        "tags": {"insert": [], "update": [], "delete": ["SV"]},
+    }
+    assert ("PUMP", "SV") not in _tag_ids(db)
+    assert settings.config.machines["PUMP"].ip == "10.0.0.9"
+    assert list(settings.config.machines["PUMP"].tags) == ["PV"]
+
+
+def test_dry_run_does_not_write(service, db):
+    service.import_config(_config())
+    version = settings.config_version
+
+    diff = service.import_config(_config({}), dry_run=True)
+
+    assert diff["summary"]["tags_deleted"] == 2
+    assert len(_tag_ids(db)) == 3
+    assert settings.config_version == version
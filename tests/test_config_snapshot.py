@@ -0,0 +1,79 @@
+import pytest
+
+from app.core.config import ConfigSnapshot, Settings
+from app.models.schemas import MachineConfig, Permission, TagConfig, TagType
+
+
+def _machine(ip, **tags):
+    return MachineConfig(
+        ip=ip,
+        tags={
+            name: TagConfig(tag_type=TagType.ANALOG, logical_register=str(40001 + r), real_register=str(r), permission=Permission.READ)
+            for name, r in tags.items()
+        },
+    )
+
+
+@pytest.fixture
+def config():
+    config = Settings()
+    config.update_machines_config({"PUMP": _machine("10.0.0.1", PV=0), "FAN": _machine("10.0.0.2")})
+    return config
+
+
+def test_snapshot_is_read_only(config):
+    snapshot = config.config
+
+    with pytest.raises(AttributeError):
+        snapshot.version = 10
+    with pytest.raises(TypeError):
+        snapshot.machines["NEW"] = _machine("10.0.0.3")
+
+
+def test_derive_is_computed_once_per_snapshot(config):
+    calls = []
+
+    def factory(snapshot):
+        calls.append(snapshot.version)
+        return sorted(snapshot.machines)
+
+    first = config.config
+    assert first.derive("names", factory) == ["FAN", "PUMP"]
+    assert first.derive("names", factory) == ["FAN", "PUMP"]
+    config.apply_machine("NEW", _machine("10.0.0.3"))
+    assert config.config.derive("names", factory) == ["FAN", "NEW", "PUMP"]
+
+    assert calls == [first.version, first.version + 1]
+
+
+def test_readers_keep_their_snapshot_while_config_changes(config):
+    before = config.config
+
+    config.apply_tag("PUMP", "SV", TagConfig(tag_type=TagType.ANALOG, logical_register="40002", real_register="1", permission=Permission.READ))
+
+    assert list(before.machines["PUMP"].tags) == ["PV"]
+    assert list(config.config.machines["PUMP"].tags) == ["PV", "SV"]
+    assert config.config_version == before.version + 1
+    # 바뀌지 않은 기계는 같은 인스턴스를 공유
+    assert config.config.machines["FAN"] is before.machines["FAN"]
+    assert config.config.machines["PUMP"] is not before.machines["PUMP"]
+
+
+def test_apply_machines_inserts_replaces_and_deletes(config):
+    config.apply_machines({"FAN": None, "PUMP": _machine("10.0.0.9"), "NEW": _machine("10.0.0.3")})
+
+    assert set(config.MODBUS_MACHINES) == {"PUMP", "NEW"}
+    assert config.MODBUS_MACHINES["PUMP"].ip == "10.0.0.9"
+
+
+def test_apply_tag_to_missing_machine_is_ignored(config):
+    version = config.config_version
+
+    config.apply_tag("NOPE", "PV", None)
+
+    assert config.config_version == version
+
+
+def test_snapshot_id_includes_boot_id():
+    snapshot = ConfigSnapshot({}, 7)
+    assert snapshot.snapshot_id == f"{snapshot.boot_id}-7"
@@ -0,0 +1,142 @@
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+from app.services.exceptions import CustomException
+
+
+def _names(db):
+    return [row["name"] for row in db.execute_query("SELECT name FROM machines ORDER BY name")]
+
+
+def _insert(conn, name):
+    conn.execute(
+        "INSERT INTO machines (name, ip_address, port, slave) VALUES (?, '127.0.0.1', 502, 1)",
+        (name,),
+    )
+
+
+def test_nested_scope_commits_with_outer_transaction(db):
+    with db.transaction() as conn:
+        _insert(conn, "A")
+        with db.get_connection() as inner:
+            assert inner is conn
+            _insert(inner, "B")
+
+    assert _names(db) == ["A", "B"]
+
+
+def test_failed_inner_scope_rolls_back_only_its_savepoint(db):
+    with db.transaction() as conn:
+        _insert(conn, "A")
+        with pytest.raises(CustomException):
+            with db.get_connection() as inner:
+                _insert(inner, "B")
+                raise RuntimeError("안쪽 범위 실패")
+        _insert(conn, "C")
+
+    assert _names(db) == ["A", "C"]
+
+
+def test_failed_outer_scope_rolls_back_everything(db):
+    with pytest.raises(CustomException):
+        with db.transaction() as conn:
+            _insert(conn, "A")
+            with db.get_connection() as inner:
+                _insert(inner, "B")
+            raise RuntimeError("바깥 범위 실패")
+
+    assert _names(db) == []
+    # 실패한 뒤에도 새 트랜잭션을 시작할 수 있어야 함
+    with db.transaction() as conn:
+        _insert(conn, "D")
+    assert _names(db) == ["D"]
+
+
+def test_deeply_nested_savepoints(db):
+    with db.transaction() as conn:
+        _insert(conn, "A")
+        with db.get_connection() as level1:
+            _insert(level1, "B")
+            with pytest.raises(CustomException):
+                with db.get_connection() as level2:
+                    _insert(level2, "C")
+                    with db.get_connection() as level3:
+                        _insert(level3, "D")
+                    raise RuntimeError("2단계 실패")
+            _insert(level1, "E")
+
+    assert _names(db) == ["A", "B", "E"]
+
+
+def test_integrity_error_is_passed_through(db):
+    with db.transaction() as conn:
+        _insert(conn, "A")
+    with pytest.raises(sqlite3.IntegrityError):
+        with db.transaction() as conn:
+            _insert(conn, "A")
+    assert _names(db) == ["A"]
+
+
+def test_scopes_from_other_threads_are_serialized(db):
+    def worker(prefix):
+        for i in range(20):
+            with db.transaction() as conn:
+                _insert(conn, f"{prefix}{i}")
+                with db.get_connection() as inner:
+                    _insert(inner, f"{prefix}{i}_SUB")
+
+    threads = [threading.Thread(target=worker, args=(p,)) for p in "XYZ"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(_names(db)) == 120
+
+
+
+def test_run_executes_on_db_thread(db):
+    main_thread = threading.get_ident()
+
+    def work():
+        with db.transaction() as conn:
+            _insert(conn, "A")
+        return threading.get_ident()
+
+    db_thread = asyncio.run(db.run(work))
+
+    assert db_thread != main_thread
+    assert _names(db) == ["A"]
+    assert db.executor.stats()["completed"] == 1
+
+
+def test_run_keeps_submission_order_and_propagates_errors(db):
+    order = []
+
+    def fail():
+        raise CustomException(message="실패")
+
+    async def main():
+        tasks = [asyncio.ensure_future(db.run(order.append, i)) for i in range(50)]
+        with pytest.raises(CustomException):
+            await db.run(fail)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+
+    assert order == list(range(50))
+    stats = db.executor.stats()
+    assert stats["completed"] == 51
+    assert stats["failed"] == 1
+    assert stats["pending"] == 0
+
+
+def test_executor_restarts_after_shutdown(db):
+    first = db.executor.submit(threading.get_ident).result()
+    db.executor.shutdown()
+
+    assert db.executor.submit(lambda: 1).result() == 1
+    assert first != threading.get_ident()
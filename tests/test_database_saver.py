@@ -0,0 +1,100 @@
+import sqlite3
+import threading
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("requests")
+
+import modbus_database_saver as saver  # noqa: E402
+
+MACHINES = ["oil_main", "oil_1l", "oxy_main"]
+
+
+@pytest.fixture(autouse=True)
+def machines(monkeypatch):
+    monkeypatch.setattr(saver, "MACHINE_NAMES", MACHINES)
+    monkeypatch.setattr(saver, "in_flight", {})
+
+
+def test_collect_marks_failed_and_slow_machines_missing(monkeypatch):
+    release = threading.Event()
+
+    def fetch(machine):
+        if machine == "oil_1l":
+            return None
+        if machine == "oxy_main":
+            release.wait(5)
+        return {"pv": 100, "sv": 200}
+
+    monkeypatch.setattr(saver, "fetch_machine_values", fetch)
+    try:
+        values, missing = saver.collect_tag_values(deadline=0.2)
+    finally:
+        release.set()
+
+    assert values == {"oil_main": {"pv": 100, "sv": 200}}
+    assert sorted(missing) == ["oil_1l", "oxy_main"]
+
+
+def test_collect_skips_machine_still_busy_from_previous_cycle(monkeypatch):
+    release = threading.Event()
+    calls = []
+
+    def fetch(machine):
+        calls.append(machine)
+        if machine == "oxy_main":
+            release.wait(5)
+        return {"pv": 1, "sv": 2}
+
+    monkeypatch.setattr(saver, "fetch_machine_values", fetch)
+    try:
+        saver.collect_tag_values(deadline=0.2)
+        values, missing = saver.collect_tag_values(deadline=0.2)
+    finally:
+        release.set()
+
+    assert missing == ["oxy_main"]
+    assert set(values) == {"oil_main", "oil_1l"}
+    assert calls.count("oxy_main") == 1
+
+
+def test_all_missing_cycle_still_records_row():
+    assert saver.init_database()
+    timestamp = datetime(2026, 1, 1, 0, 0, 30)
+
+    assert saver.save_to_database({}, list(MACHINES), timestamp)
+
+    conn = sqlite3.connect(saver.DB_FILE_ROOT)
+    try:
+        row = conn.execute(
+            f"SELECT oil_main_pv, missing_machines FROM {saver.DB_NAME} WHERE timestamp = ?",
+            ("2026-01-01 00:00:30",),
+        ).fetchone()
+    finally:
+        conn.close()
+    assert row == (None, ",".join(MACHINES))
+
+
+def test_partial_cycle_saves_received_values_and_lists_the_rest():
+    assert saver.init_database()
+    timestamp = datetime(2026, 1, 1, 0, 1, 0)
+
+    saved = saver.save_to_database(
+        {"oil_main": {"PV": 12.34, "SV": 15}, "oil_1l": {"error": "timeout"}},
+        ["oxy_main"],
+        timestamp,
+    )
+
+    assert saved
+    conn = sqlite3.connect(saver.DB_FILE_ROOT)
+    try:
+        row = conn.execute(
+            f"SELECT oil_main_pv, oil_main_sv, missing_machines FROM {saver.DB_NAME} "
+            "WHERE timestamp = ?",
+            ("2026-01-01 00:01:00",),
+        ).fetchone()
+    finally:
+        conn.close()
+    assert row[:2] == (12.3, 15.0)
+    assert sorted(row[2].split(",")) == ["oil_1l", "oxy_main"]
@@ -0,0 +1,93 @@
+import os
+import sqlite3
+from datetime import datetime
+
+import pyarrow as pa
+
+from app.services.historian.schema import (
+    TIER_COLD,
+    TIER_HOT,
+    partition_bounds,
+    partition_key,
+    to_epoch_ms,
+)
+
+PUMP_PV = ("PUMP", "PV")
+FAN_PV = ("FAN", "PV")
+DAY1 = to_epoch_ms(datetime(2026, 1, 1, 23, 59, 45))
+DAY2 = to_epoch_ms(datetime(2026, 1, 2, 0, 0, 0))
+
+
+def partitions(store):
+    conn = sqlite3.connect(store.db_file)
+    try:
+        return dict(conn.execute("SELECT key, tier FROM historian_partitions"))
+    finally:
+        conn.close()
+
+
+def write_two_days(store):
+    store.ensure_schema([PUMP_PV, FAN_PV])
+    store.write_rows(
+        [(key, ts + i * 30_000, float(i)) for key in (PUMP_PV, FAN_PV) for ts in (DAY1, DAY2) for i in range(2)]
+    )
+
+
+def test_partition_key_and_bounds():
+    assert partition_key(DAY2 - 1, "day") == "20260101"
+    assert partition_key(DAY2, "day") == "20260102"
+    assert partition_key(DAY2, "month") == "202601"
+    assert partition_bounds("20260101") == (to_epoch_ms(datetime(2026, 1, 1)), DAY2)
+    assert partition_bounds("202612")[1] == to_epoch_ms(datetime(2027, 1, 1))
+
+
+def test_rows_are_routed_to_their_day_partition(store):
+    write_two_days(store)
+
+    assert partitions(store) == {"20260101": TIER_HOT, "20260102": TIER_HOT}
+    conn = sqlite3.connect(store.db_file)
+    try:
+        counts = [
+            conn.execute(f"SELECT COUNT(*) FROM historian_values_{key}").fetchone()[0]
+            for key in ("20260101", "20260102")
+        ]
+    finally:
+        conn.close()
+    # DAY1 + 30초는 다음 날로 넘어감
+    assert counts == [2, 6]
+
+
+def test_archive_moves_closed_partitions_to_parquet_and_reads_stay_the_same(store):
+    write_two_days(store)
+    window = (DAY1 - 60_000, DAY2 + 60_000)
+    before = list(store.read([PUMP_PV, FAN_PV], *window))
+    batches_before = pa.Table.from_batches(list(store.read_batches([PUMP_PV, FAN_PV], *window)))
+
+    archived = store.archive_closed_partitions(now=datetime(2026, 1, 3, 1, 0, 0))
+
+    assert archived == ["20260101"]
+    assert partitions(store) == {"20260101": TIER_COLD, "20260102": TIER_HOT}
+    assert os.path.exists(os.path.join(store.archive_dir, "historian_values_20260101.parquet"))
+    assert list(store.read([PUMP_PV, FAN_PV], *window)) == before
+    batches_after = pa.Table.from_batches(list(store.read_batches([PUMP_PV, FAN_PV], *window)))
+    assert batches_after.sort_by([("tag_id", "ascending"), ("ts", "ascending")]).equals(
+        batches_before.sort_by([("tag_id", "ascending"), ("ts", "ascending")])
+    )
+
+
+def test_archived_partitions_do_not_take_new_values(store):
+    write_two_days(store)
+    store.archive_closed_partitions(now=datetime(2026, 1, 3, 1, 0, 0))
+
+    assert store.write_rows([(PUMP_PV, DAY1 - 1000, 9.0), (PUMP_PV, DAY2 + 1000, 9.0)]) == 1
+    assert store.archive_closed_partitions(now=datetime(2026, 1, 3, 1, 0, 0)) == []
+
+
+def test_read_batches_respects_batch_size(store):
+    write_two_days(store)
+    store.archive_closed_partitions(now=datetime(2026, 1, 3, 1, 0, 0))
+
+    batches = list(store.read_batches([PUMP_PV, FAN_PV], DAY1 - 60_000, DAY2 + 60_000, batch_rows=3))
+
+    assert all(batch.num_rows <= 3 for batch in batches)
+    assert sum(batch.num_rows for batch in batches) == 8
@@ -0,0 +1,143 @@
+import math
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from app.services.historian.rollup import rollup_table
+from app.services.historian.schema import to_epoch_ms
+from app.services.historian.store import HistorianStore
+
+PUMP_PV = ("PUMP", "PV")
+START = to_epoch_ms(datetime(2026, 1, 1, 23, 0, 0))
+END = to_epoch_ms(datetime(2026, 1, 2, 1, 0, 0))
+
+
+def sample_rows(step_ms=10_000):
+    """자정을 사이에 둔 두 시간의 값 (7번째 값마다 값 없음)"""
+    rows = []
+    for i, ts in enumerate(range(START, END, step_ms)):
+        value = None if i % 7 == 3 else round(50 + 20 * math.sin(i / 9) + i % 5, 3)
+        rows.append((PUMP_PV, ts, value))
+    return rows
+
+
+def brute_force(rows, start_ts, end_ts, width):
+    buckets = {}
+    for _, ts, value in sorted(rows, key=lambda row: row[1]):
+        if value is None or not start_ts <= ts < end_ts:
+            continue
+        buckets.setdefault(ts - ts % width, []).append(value)
+    return [
+        (bucket, min(values), max(values), sum(values) / len(values), values[-1])
+        for bucket, values in sorted(buckets.items())
+    ]
+
+
+def assert_same(actual, expected):
+    assert [row[0] for row in actual] == [row[0] for row in expected]
+    for got, want in zip(actual, expected):
+        assert got[1:3] == want[1:3]
+        assert got[3] == pytest.approx(want[3])
+        assert got[4] == want[4]
+
+
+def aligned(width):
+    return START - START % width, END - END % width + (width if END % width else 0)
+
+
+@pytest.fixture
+def filled(store):
+    rows = sample_rows()
+    store.ensure_schema([PUMP_PV])
+    store.write_rows(rows)
+    # 첫날은 Parquet로 옮겨도 롤업은 SQLite에 남음
+    store.archive_closed_partitions(now=datetime(2026, 1, 3, 12, 0, 0))
+    return rows
+
+
+@pytest.mark.parametrize(
+    "width",
+    [
+        60_000,  # 1분 롤업
+        420_000,  # 1분 롤업을 다시 집계 (자정에 걸친 구간 포함)
+        3_600_000,  # 1시간 롤업
+        70_000,  # 롤업 폭의 배수가 아님: 파티션에서 집계하고 자정에 걸친 구간을 합침
+    ],
+)
+def test_aggregate_matches_brute_force_across_partitions(store, filled, width):
+    start_ts, end_ts = aligned(width)
+
+    assert_same(
+        list(store.aggregate(PUMP_PV, start_ts, end_ts, width)),
+        brute_force(filled, start_ts, end_ts, width),
+    )
+
+
+def test_aggregate_reads_partitions_where_rollups_were_deleted(store, filled):
+    cutoff = to_epoch_ms(datetime(2026, 1, 1, 23, 30, 0))
+    for name in ("1m", "1h"):
+        list(store.delete_rollups_before(name, cutoff, batch_rows=10))
+
+    assert_same(
+        list(store.aggregate(PUMP_PV, START, END, 60_000)),
+        brute_force(filled, START, END, 60_000),
+    )
+    assert_same(
+        list(store.aggregate(PUMP_PV, START, END, 600_000)),
+        brute_force(filled, START, END, 600_000),
+    )
+
+
+def test_read_trend_uses_rollups(store, filled):
+    resolution, rows = store.read_trend([PUMP_PV], START, END, resolution="1m")
+    rows = list(rows)
+
+    expected = brute_force(filled, START, END, 60_000)
+    assert resolution == "1m"
+    assert [row[1] for row in rows] == [row[0] for row in expected]
+    assert all(row[5] > 0 for row in rows)
+
+
+def test_migrated_wide_table_has_rollups(tmp_path):
+    db_file = str(tmp_path / "legacy.db")
+    rows = sample_rows(step_ms=30_000)
+    conn = sqlite3.connect(db_file)
+    with conn:
+        conn.execute("CREATE TABLE modbus_data (timestamp TEXT PRIMARY KEY, pump_pv REAL)")
+        conn.executemany(
+            "INSERT INTO modbus_data VALUES (?, ?)",
+            [
+                (datetime.fromtimestamp(ts / 1000).strftime("%Y-%m-%d %H:%M:%S"), value)
+                for _, ts, value in rows
+            ],
+        )
+    conn.close()
+
+    store = HistorianStore(db_file, wide_table="modbus_data", partition="day")
+    try:
+        store.ensure_schema([])
+        conn = sqlite3.connect(db_file)
+        rollup_rows = conn.execute(f"SELECT COUNT(*) FROM {rollup_table('1m')}").fetchone()[0]
+        conn.close()
+        hourly = list(store.aggregate(PUMP_PV, START, END, 3_600_000))
+        ten_minutes = list(store.aggregate(PUMP_PV, START, END, 600_000))
+    finally:
+        store.close()
+
+    assert rollup_rows == len(brute_force(rows, START, END, 60_000))
+    assert_same(hourly, brute_force(rows, START, END, 3_600_000))
+    assert_same(ten_minutes, brute_force(rows, START, END, 600_000))
+
+
+def test_late_values_update_existing_rollup_buckets(store, filled):
+    # 둘째 날(SQLite에 남은 파티션)의 이미 집계된 구간에 늦게 도착한 값
+    late = END - 3_600_000 + 5_000
+    assert store.write_rows([(PUMP_PV, late, 999.0)]) == 1
+    rows = filled + [(PUMP_PV, late, 999.0)]
+
+    for width in (60_000, 3_600_000):
+        assert_same(
+            list(store.aggregate(PUMP_PV, START, END, width)),
+            brute_force(rows, START, END, width),
+        )
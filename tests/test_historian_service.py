@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from app.core.config import settings
+from app.models.schemas import MachineConfig
+from app.services.historian import service as service_module
+from app.services.historian.schema import QUALITY_GOOD, QUALITY_NO_DATA, to_epoch_ms
+from app.services.historian.service import HistorianService
+
+
+@pytest.fixture
+def historian(store, monkeypatch):
+    monkeypatch.setattr(settings, "HISTORIAN_SPOOL_ENABLED", False)
+    monkeypatch.setattr(settings, "HISTORIAN_COMPRESSION", {})
+    settings.update_machines_config(
+        {name: MachineConfig(ip="127.0.0.1") for name in ("PUMP", "FAN", "SLOW")}
+    )
+    return HistorianService(store, interval=0.1, machines=["pump", "fan", "slow", "gone"], tags=["pv", "sv"])
+
+
+def test_collect_records_missing_values_for_failed_machines(historian, monkeypatch):
+    release = threading.Event()
+
+    def sample(machine_name, machine_config, tag_names):
+        if machine_name == "FAN":
+            raise ConnectionError("연결 실패")
+        if machine_name == "SLOW":
+            release.wait(5)
+        return {"PV": 1.5, "SV": 2.5}
+
+    monkeypatch.setattr(service_module, "sample_machine", sample)
+    timestamp = datetime(2024, 1, 1, 12, 0, 0)
+
+    async def tick():
+        try:
+            return await historian.collect(timestamp)
+        finally:
+            release.set()
+
+    row = asyncio.run(tick())
+
+    assert row == {
+        ("PUMP", "PV"): 1.5,
+        ("PUMP", "SV"): 2.5,
+        ("FAN", "PV"): None,
+        ("FAN", "SV"): None,
+        ("SLOW", "PV"): None,
+        ("SLOW", "SV"): None,
+    }
+    assert historian.writer.flush() == 6
+    ts = to_epoch_ms(timestamp)
+    stored = {
+        (key, quality)
+        for key, row_ts, _, quality in historian.store.read(row, ts, ts + 1)
+        if row_ts == ts
+    }
+    assert (("PUMP", "PV"), QUALITY_GOOD) in stored
+    assert (("FAN", "PV"), QUALITY_NO_DATA) in stored
+
+
+def test_collect_skips_machine_whose_previous_read_is_running(historian, monkeypatch):
+    release = threading.Event()
+    reads = []
+
+    def sample(machine_name, machine_config, tag_names):
+        reads.append(machine_name)
+        if machine_name == "SLOW":
+            release.wait(5)
+        return {"PV": 1.0, "SV": 1.0}
+
+    monkeypatch.setattr(service_module, "sample_machine", sample)
+
+    async def two_ticks():
+        first = await historian.collect(datetime(2024, 1, 1, 12, 0, 0))
+        second = await historian.collect(datetime(2024, 1, 1, 12, 0, 1))
+        release.set()
+        # 남아 있던 읽기가 끝나면 다음 주기에는 다시 읽음
+        await asyncio.sleep(0.05)
+        third = await historian.collect(datetime(2024, 1, 1, 12, 0, 2))
+        return first, second, third
+
+    first, second, third = asyncio.run(two_ticks())
+
+    assert reads.count("SLOW") == 2
+    assert historian.skipped_reads == 1
+    assert first[("SLOW", "PV")] is None and second[("SLOW", "PV")] is None
+    assert third[("SLOW", "PV")] == 1.0
+    assert second[("PUMP", "PV")] == 1.0
+
+
+def test_collect_reads_machines_concurrently(historian, monkeypatch):
+    def sample(machine_name, machine_config, tag_names):
+        time.sleep(0.05)
+        return {"PV": 1.0, "SV": 1.0}
+
+    monkeypatch.setattr(service_module, "sample_machine", sample)
+    historian.interval = 1.0
+
+    started = time.perf_counter()
+    asyncio.run(historian.collect(datetime(2024, 1, 1, 12, 0, 0)))
+
+    assert time.perf_counter() - started < 0.14
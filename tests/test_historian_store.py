@@ -0,0 +1,106 @@
+import sqlite3
+from datetime import datetime
+
+from app.services.historian.schema import (
+    QUALITY_GOOD,
+    QUALITY_NO_DATA,
+    SCHEMA_VERSION,
+    to_epoch_ms,
+)
+from app.services.historian.store import HistorianStore
+
+PUMP_PV = ("PUMP", "PV")
+PUMP_SV = ("PUMP", "SV")
+T0 = to_epoch_ms(datetime(2026, 1, 1, 12, 0, 0))
+
+
+def create_wide_table(db_file, rows):
+    """기존 저장기 형식의 넓은 테이블 (timestamp + {machine}_{tag} 컬럼)"""
+    conn = sqlite3.connect(db_file)
+    with conn:
+        conn.execute(
+            "CREATE TABLE modbus_data (timestamp TEXT PRIMARY KEY, pump_pv REAL, pump_sv REAL, missing_machines TEXT)"
+        )
+        conn.executemany("INSERT INTO modbus_data VALUES (?, ?, ?, NULL)", rows)
+    conn.close()
+
+
+def test_write_rows_skips_existing_points_and_marks_missing_values(store):
+    store.ensure_schema([PUMP_PV, PUMP_SV])
+    rows = [(PUMP_PV, T0, 1.5), (PUMP_SV, T0, None)]
+
+    assert store.write_rows(rows) == 2
+    assert store.write_rows(rows + [(PUMP_PV, T0 + 1000, 2.5)]) == 1
+
+    assert list(store.read([PUMP_PV, PUMP_SV], T0, T0 + 60_000)) == [
+        (PUMP_PV, T0, 1.5, QUALITY_GOOD),
+        (PUMP_PV, T0 + 1000, 2.5, QUALITY_GOOD),
+        (PUMP_SV, T0, None, QUALITY_NO_DATA),
+    ]
+
+
+def test_read_returns_half_open_range_per_tag_in_time_order(store):
+    store.write_rows([(PUMP_PV, T0 + i * 1000, float(i)) for i in (3, 0, 2, 1)])
+
+    assert [ts for _, ts, _, _ in store.read([PUMP_PV], T0 + 1000, T0 + 3000)] == [
+        T0 + 1000,
+        T0 + 2000,
+    ]
+    assert list(store.read([("NONE", "PV")], T0, T0 + 10_000)) == []
+
+
+def test_write_registers_new_tags_without_schema_change(store):
+    store.write(datetime(2026, 1, 1, 12, 0, 0), {("NEW", "TEMP"): 20.0})
+
+    assert ("NEW", "TEMP") in store.lookup_tags()
+    assert not store.write(datetime(2026, 1, 1, 12, 0, 0), {("NEW", "TEMP"): 21.0})
+
+
+def test_legacy_wide_table_is_migrated_on_first_open(tmp_path):
+    db_file = str(tmp_path / "legacy.db")
+    create_wide_table(
+        db_file,
+        [("2026-01-01 12:00:00", 1.0, 10.0), ("2026-01-01 12:00:30", None, 11.0)],
+    )
+
+    store = HistorianStore(db_file, wide_table="modbus_data", partition="day")
+    try:
+        store.ensure_schema([])
+        rows = list(store.read([PUMP_PV, PUMP_SV], T0, T0 + 60_000))
+        conn = sqlite3.connect(db_file)
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        wide_count = conn.execute("SELECT COUNT(*) FROM modbus_data").fetchone()[0]
+        conn.close()
+    finally:
+        store.close()
+
+    # NULL 칸은 옮기지 않고, 원본 테이블은 그대로 둠
+    assert rows == [
+        (PUMP_PV, T0, 1.0, QUALITY_GOOD),
+        (PUMP_SV, T0, 10.0, QUALITY_GOOD),
+        (PUMP_SV, T0 + 30_000, 11.0, QUALITY_GOOD),
+    ]
+    assert version == SCHEMA_VERSION
+    assert wide_count == 2
+
+
+def test_sync_wide_table_copies_only_rows_after_last_stored_value(tmp_path):
+    db_file = str(tmp_path / "legacy.db")
+    create_wide_table(db_file, [("2026-01-01 12:00:00", 1.0, 10.0)])
+    store = HistorianStore(db_file, wide_table="modbus_data", partition="day")
+    try:
+        store.ensure_schema([])
+        conn = sqlite3.connect(db_file)
+        with conn:
+            conn.execute(
+                "INSERT INTO modbus_data VALUES ('2026-01-01 12:01:00', 2.0, 20.0, NULL)"
+            )
+        conn.close()
+
+        assert store.sync_wide_table() == 2
+        assert store.sync_wide_table() == 0
+        values = [value for _, _, value, _ in store.read([PUMP_PV], T0, T0 + 120_000)]
+    finally:
+        store.close()
+
+    assert values == [1.0, 2.0]
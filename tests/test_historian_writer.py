@@ -0,0 +1,73 @@
+from datetime import datetime
+
+from app.services.historian.schema import to_epoch_ms
+from app.services.historian.writer import HistorianWriter
+
+PUMP_PV = ("PUMP", "PV")
+T0 = to_epoch_ms(datetime(2026, 1, 1, 12, 0, 0))
+
+
+def rows(count, start=0):
+    return [(PUMP_PV, T0 + i * 1000, float(i)) for i in range(start, start + count)]
+
+
+def stored(store):
+    return [ts for _, ts, _, _ in store.read([PUMP_PV], T0, T0 + 3_600_000)]
+
+
+def test_flush_writes_buffer_in_one_batch_and_counts_duplicates(store, flaky_store):
+    sink = flaky_store
+    writer = HistorianWriter(sink, flush_rows=100, flush_interval_ms=1000, max_buffer_rows=1000)
+
+    writer.append_rows(rows(3))
+    assert writer.flush() == 3
+    writer.append_rows(rows(4))
+    assert writer.flush() == 1
+
+    assert sink.calls == [3, 4]
+    stats = writer.stats()
+    assert stats["buffered"] == 0
+    assert stats["flushes"] == 2
+    assert stats["written_rows"] == 4
+    assert stats["duplicate_rows"] == 3
+
+
+def test_failed_flush_keeps_rows_in_buffer_without_spool(store, flaky_store):
+    sink = flaky_store
+    writer = HistorianWriter(sink, flush_rows=100, flush_interval_ms=1000, max_buffer_rows=1000)
+    writer.append_rows(rows(2))
+
+    sink.broken = True
+    assert writer.flush() == 0
+    writer.append_rows(rows(1, start=2))
+    assert writer.stats()["buffered"] == 3
+
+    sink.broken = False
+    assert writer.flush() == 3
+    assert stored(store) == [T0, T0 + 1000, T0 + 2000]
+    assert writer.stats()["failed_flushes"] == 1
+
+
+def test_buffer_drops_oldest_rows_over_limit(store):
+    writer = HistorianWriter(store, flush_rows=100, flush_interval_ms=1000, max_buffer_rows=5)
+
+    writer.append_rows(rows(8))
+    writer.flush()
+
+    assert stored(store) == [T0 + i * 1000 for i in range(3, 8)]
+    assert writer.stats()["dropped_rows"] == 3
+
+
+def test_writer_thread_flushes_when_flush_rows_reached_and_on_stop(store, flaky_store):
+    sink = flaky_store
+    writer = HistorianWriter(sink, flush_rows=3, flush_interval_ms=60_000, max_buffer_rows=1000)
+    writer.start()
+    try:
+        writer.append_rows(rows(3))
+        assert sink.written.wait(5)
+        writer.append_rows(rows(1, start=3))
+    finally:
+        writer.stop()
+
+    assert sink.calls == [3, 1]
+    assert len(stored(store)) == 4
@@ -0,0 +1,158 @@
+import json
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.models.schemas import CompressionMode, HistorianCompression, HistoryAggregation
+from app.services.exceptions import CustomException
+from app.services.historian.compression import aggregate_reconstructed, reconstruct
+from app.services.historian.history import HistoryService
+from app.services.historian.schema import to_epoch_ms
+
+PUMP_PV = ("PUMP", "PV")
+FAN_PV = ("FAN", "PV")
+T0 = to_epoch_ms(datetime(2026, 1, 1, 12, 0, 0))
+
+# 저장 점: 0~10초 상승, 10~25초 하강, 40초에 값 없음, 45초부터 다시 값
+POINT_TS = np.array([0, 10_000, 25_000, 40_000, 45_000], dtype=np.int64)
+POINT_VALUES = np.array([0.0, 10.0, 4.0, np.nan, 2.0])
+
+
+def test_reconstruct_holds_or_interpolates_and_stops_after_max_gap():
+    _, step = reconstruct(POINT_TS, POINT_VALUES, "deadband", 0, 60_000, 5_000, 16_000)
+    _, linear = reconstruct(POINT_TS, POINT_VALUES, "swinging_door", 0, 60_000, 5_000, 16_000)
+
+    nan = np.nan
+    np.testing.assert_allclose(step, [0, 0, 10, 10, 10, 4, 4, 4, nan, 2, 2, 2])
+    # 25초에서 40초(값 없음)까지는 직선이 없으므로 마지막 값 유지, 45초 이후 다음 점이 없음
+    np.testing.assert_allclose(linear, [0, 5, 10, 8, 6, 4, 4, 4, nan, 2, 2, 2])
+    _, gap = reconstruct(POINT_TS[:3], POINT_VALUES[:3], "deadband", 0, 60_000, 5_000, 16_000)
+    assert np.isnan(gap[-3:]).all() and gap[-4] == 4
+
+
+@pytest.mark.parametrize("mode", ["deadband", "swinging_door"])
+def test_aggregate_reconstructed_matches_dense_sampling(mode):
+    start_ts, end_ts, width, max_gap = 0, 60_000, 7_000, 16_000
+    grid, dense = reconstruct(POINT_TS, POINT_VALUES, mode, start_ts, end_ts, 1, max_gap)
+
+    bucket, minimum, maximum, avg, points, first, last = aggregate_reconstructed(
+        POINT_TS, POINT_VALUES, mode, start_ts, end_ts, width, max_gap
+    )
+
+    expected = []
+    for bucket_start in range(start_ts, end_ts, width):
+        window = dense[(grid >= bucket_start) & (grid < min(bucket_start + width, end_ts))]
+        window = window[~np.isnan(window)]
+        if len(window):
+            expected.append((bucket_start, window.min(), window.max(), window.mean(), window[0]))
+    assert bucket.tolist() == [row[0] for row in expected]
+    for i, (_, low, high, mean, head) in enumerate(expected):
+        assert minimum[i] == pytest.approx(low, abs=0.01)
+        assert maximum[i] == pytest.approx(high, abs=0.01)
+        assert avg[i] == pytest.approx(mean, abs=0.01)
+        assert first[i] == pytest.approx(head, abs=0.01)
+    assert points.sum() == len(POINT_TS)
+
+
+@pytest.fixture
+def compressed(store):
+    store.set_compression(
+        {PUMP_PV: HistorianCompression(mode=CompressionMode.SWINGING_DOOR, deviation=1, max_interval=8)}
+    )
+    store.write_rows(
+        [
+            (PUMP_PV, T0 + ts, None if np.isnan(value) else float(value))
+            for ts, value in zip(POINT_TS.tolist(), POINT_VALUES)
+        ]
+    )
+    return store
+
+
+def test_read_sampled_restores_compressed_tag(compressed):
+    rows = list(compressed.read_sampled([PUMP_PV], T0, T0 + 30_000, 5_000))
+
+    assert [value for _, _, value in rows] == pytest.approx([0, 5, 10, 8, 6, 4])
+    assert [ts - T0 for _, ts, _ in rows] == list(range(0, 30_000, 5_000))
+
+
+def test_aggregate_of_compressed_tag_is_time_weighted(compressed):
+    rows = list(compressed.aggregate(PUMP_PV, T0, T0 + 20_000, 10_000))
+
+    # 0~10초 0에서 10으로 상승, 10~20초 10에서 6으로 하강
+    assert [row[0] - T0 for row in rows] == [0, 10_000]
+    assert rows[0][1:4] == pytest.approx((0, 10, 5))
+    assert rows[1][1:4] == pytest.approx((6, 10, 8))
+
+
+def fill_two_tags(store):
+    store.ensure_schema([PUMP_PV, FAN_PV])
+    store.write_rows(
+        [(key, T0 + i * 10_000, float(i)) for key in (PUMP_PV, FAN_PV) for i in range(12)]
+    )
+    service = HistoryService(store)
+    return service, service.resolve_tags(["pump.pv", "FAN.PV"])
+
+
+def collect(service, tag_ids, aggregation, width, limit):
+    pages, cursor = [], None
+    while True:
+        body = json.loads(
+            b"".join(
+                service.iter_history_json(
+                    "ok",
+                    tag_ids,
+                    T0,
+                    T0 + 120_000,
+                    aggregation,
+                    width,
+                    limit,
+                    service.parse_cursor(cursor),
+                )
+            )
+        )
+        pages.append(body["data"]["rows"])
+        cursor = body["data"]["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize(
+    "aggregation, width, total",
+    [(HistoryAggregation.RAW, 60_000, 24), (HistoryAggregation.AVG, 60_000, 4)],
+)
+def test_paging_with_cursor_returns_every_row_once(store, aggregation, width, total):
+    service, tag_ids = fill_two_tags(store)
+
+    pages = collect(service, tag_ids, aggregation, width, limit=5)
+    full = collect(service, tag_ids, aggregation, width, limit=1000)
+
+    assert len(full) == 1 and len(full[0]) == total
+    assert [row for page in pages for row in page] == full[0]
+    assert all(len(page) <= 5 for page in pages)
+
+
+def test_response_is_chunked_valid_json(store, monkeypatch):
+    service, tag_ids = fill_two_tags(store)
+    monkeypatch.setattr(HistoryService, "ROWS_PER_CHUNK", 3)
+
+    chunks = list(
+        service.iter_history_json("ok", tag_ids, T0, T0 + 120_000, HistoryAggregation.RAW, 1, 1000)
+    )
+    body = json.loads(b"".join(chunks))
+
+    assert len(chunks) > 5
+    assert body["data"]["columns"] == ["tag", "ts", "value", "quality"]
+    assert len(body["data"]["rows"]) == 24
+
+
+def test_unknown_tag_and_bad_cursor_are_rejected(store):
+    service, _ = fill_two_tags(store)
+
+    with pytest.raises(CustomException) as error:
+        service.resolve_tags(["PUMP.PV", "NONE.PV"])
+    assert error.value.status_code == 404
+    with pytest.raises(CustomException):
+        service.resolve_tags(["PUMP"])
+    with pytest.raises(CustomException):
+        HistoryService.parse_cursor("abc")
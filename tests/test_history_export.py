@@ -0,0 +1,123 @@
+import io
+from datetime import datetime, timezone
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import get_history_store
+from app.api.routes.history import router
+from app.core.config import settings
+from app.models.schemas import HistoryExportFormat
+from app.services.historian.history import EXPORT_SCHEMA, HistoryService, export_history_file
+from app.services.historian.schema import to_epoch_ms
+from app.services.historian.store import HistorianStore
+
+PUMP_PV = ("PUMP", "PV")
+FAN_PV = ("FAN", "PV")
+# 자정을 사이에 둔 값 (첫날은 Parquet로 옮김)
+START = to_epoch_ms(datetime(2026, 1, 1, 23, 59, 0))
+END = to_epoch_ms(datetime(2026, 1, 2, 0, 1, 0))
+
+
+def fill(store):
+    store.ensure_schema([PUMP_PV, FAN_PV])
+    store.write_rows(
+        [
+            (key, ts, None if i == 3 else float(i))
+            for key in (PUMP_PV, FAN_PV)
+            for i, ts in enumerate(range(START, END, 10_000))
+        ]
+    )
+    store.archive_closed_partitions(now=datetime(2026, 1, 3, 12, 0, 0))
+
+
+def expected_rows(store):
+    return sorted(
+        (f"{key[0]}.{key[1]}", ts, value, quality)
+        for key, ts, value, quality in store.read([PUMP_PV, FAN_PV], START, END)
+    )
+
+
+def table_rows(table):
+    columns = (table.column(name).to_pylist() for name in table.column_names)
+    return sorted(
+        (tag, int(ts.replace(tzinfo=timezone.utc).timestamp() * 1000), value, quality)
+        for tag, ts, value, quality in zip(*columns)
+    )
+
+
+def read_export(data, export_format):
+    if export_format == HistoryExportFormat.PARQUET:
+        return pq.read_table(io.BytesIO(data))
+    return pa.ipc.open_stream(data).read_all()
+
+
+@pytest.mark.parametrize("export_format", list(HistoryExportFormat))
+def test_export_round_trips_hot_and_cold_partitions(store, export_format):
+    fill(store)
+    service = HistoryService(store)
+
+    chunks = list(service.iter_export(service.resolve_all_tags(), START, END, export_format))
+    table = read_export(b"".join(chunks), export_format)
+
+    assert table.schema.equals(EXPORT_SCHEMA)
+    assert table.num_rows == 24
+    assert table_rows(table) == expected_rows(store)
+
+
+def test_export_of_empty_range_is_a_valid_file(store):
+    fill(store)
+    service = HistoryService(store)
+
+    data = b"".join(service.iter_export(service.resolve_all_tags(), 0, 1000, HistoryExportFormat.ARROW))
+
+    assert read_export(data, HistoryExportFormat.ARROW).num_rows == 0
+
+
+def test_export_history_file_uses_settings_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROJECT_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "HISTORIAN_PARTITION", "day")
+    monkeypatch.setattr(settings, "HISTORIAN_ARCHIVE_DIR", str(tmp_path / "archive"))
+    store = HistorianStore(
+        settings.historian_db_file, partition="day", archive_dir=settings.historian_archive_dir
+    )
+    try:
+        fill(store)
+        expected = [row for row in expected_rows(store) if row[0] == "PUMP.PV"]
+    finally:
+        store.close()
+    path = str(tmp_path / "pump.parquet")
+
+    size = export_history_file(path, ["PUMP.PV"], START, END)
+
+    table = pq.read_table(path)
+    assert size == (tmp_path / "pump.parquet").stat().st_size
+    assert table_rows(table) == expected
+
+
+def test_export_route_streams_file_with_attachment_name(store):
+    fill(store)
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_history_store] = lambda: store
+    client = TestClient(app)
+
+    response = client.get(
+        "/history/export",
+        params={
+            "tags": "PUMP.PV",
+            "start": "2026-01-01T23:59:00",
+            "end": "2026-01-02T00:01:00",
+            "format": "parquet",
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.parquet"
+    assert 'filename="history_20260101235900_20260102000100.parquet"' in response.headers[
+        "content-disposition"
+    ]
+    assert pq.read_table(io.BytesIO(response.content)).num_rows == 12
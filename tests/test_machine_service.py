@@ -0,0 +1,77 @@
+import pytest
+
+from app.core.config import settings
+from app.models.schemas import MachineConfig, Permission, TagConfig, TagType
+from app.services.exceptions import CustomException, ErrorCode
+from app.services.modbus.machine import MachineService
+
+
+def _analog(register):
+    return TagConfig(
+        tag_type=TagType.ANALOG,
+        logical_register=str(40001 + register),
+        real_register=str(register),
+        permission=Permission.READ,
+    )
+
+
+@pytest.fixture
+def service(db):
+    return MachineService(db)
+
+
+def _reloaded(db):
+    return {name: config.model_dump() for name, config in db.load_modbus_config().items()}
+
+
+def test_crud_updates_config_without_reloading(service, db):
+    service.add_machine("pump", MachineConfig(ip="10.0.0.1"))
+    service.add_machine("fan", MachineConfig(ip="10.0.0.2"))
+    service.add_machine_tag("pump", "pv", _analog(0))
+    service.add_machine_tag("pump", "sv", _analog(1))
+    service.update_machine_tag("pump", "sv", _analog(2))
+    service.delete_machine_tag("pump", "pv")
+
+    snapshot = settings.config
+    assert set(snapshot.machines) == {"PUMP", "FAN"}
+    assert list(snapshot.machines["PUMP"].tags) == ["SV"]
+    assert snapshot.machines["PUMP"].tags["SV"].real_register == "2"
+    in_memory = {name: config.model_dump() for name, config in snapshot.machines.items()}
+    assert in_memory == _reloaded(db)
+
+    service.delete_machine("pump")
+    assert set(settings.config.machines) == {"FAN"}
+    assert _reloaded(db).keys() == {"FAN"}
+
+
+def test_tag_change_keeps_other_machine_configs(service):
+    service.add_machine("pump", MachineConfig(ip="10.0.0.1"))
+    service.add_machine("fan", MachineConfig(ip="10.0.0.2"))
+    fan = settings.config.machines["FAN"]
+    version = settings.config_version
+
+    service.add_machine_tag("pump", "pv", _analog(0))
+
+    assert settings.config_version == version + 1
+    assert settings.config.machines["FAN"] is fan
+
+
+def test_duplicates_and_missing_entries_raise(service):
+    service.add_machine("pump", MachineConfig(ip="10.0.0.1"))
+    service.add_machine_tag("pump", "pv", _analog(0))
+
+    with pytest.raises(CustomException) as e:
+        service.add_machine("PUMP", MachineConfig(ip="10.0.0.1"))
+    assert e.value.status_code == 409
+    with pytest.raises(CustomException) as e:
+        service.add_machine_tag("pump", "PV", _analog(0))
+    assert e.value.error_code == ErrorCode.TAG_ALREADY_EXISTS
+    with pytest.raises(CustomException) as e:
+        service.add_machine_tag("nope", "pv", _analog(0))
+    assert e.value.error_code == ErrorCode.MACHINE_NOT_FOUND
+    with pytest.raises(CustomException) as e:
+        service.delete_machine_tag("pump", "nope")
+    assert e.value.error_code == ErrorCode.TAG_NOT_FOUND
+    with pytest.raises(CustomException) as e:
+        service.delete_machine("nope")
+    assert e.value.error_code == ErrorCode.MACHINE_NOT_FOUND
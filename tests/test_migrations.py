@@ -0,0 +1,58 @@
+import sqlite3
+
+import pytest
+
+from app.services.modbus.client import DatabaseClientManager
+from app.services.modbus.migrations import MIGRATIONS, SCHEMA_VERSION, get_schema_version, migrate
+
+
+def _legacy_db(path):
+    """마이그레이션 도입 전 형식의 설정 DB (중복 태그 포함)"""
+    conn = sqlite3.connect(path)
+    for statement in MIGRATIONS[0][2]:
+        conn.execute(statement)
+    conn.execute("INSERT INTO machines (name, ip_address, port, slave) VALUES ('PUMP', '10.0.0.1', 502, 1)")
+    conn.executemany(
+        "INSERT INTO tags (machine_id, tag_name, tag_type, logical_register, real_register, permission) "
+        "VALUES (1, ?, 'Analog', ?, ?, 'Read')",
+        [("PV", "40001", "0"), ("SV", "40002", "1"), ("PV", "40011", "10")],
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_legacy_database_is_migrated_keeping_latest_duplicate(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    _legacy_db(path)
+
+    db = DatabaseClientManager(path)
+    try:
+        rows = db.execute_query("SELECT tag_name, real_register FROM tags ORDER BY tag_name")
+        assert rows == [
+            {"tag_name": "PV", "real_register": "10"},
+            {"tag_name": "SV", "real_register": "1"},
+        ]
+        with db.get_connection() as conn:
+            assert get_schema_version(conn) == SCHEMA_VERSION
+        # 고유 인덱스로 중복 태그가 막힘
+        with pytest.raises(sqlite3.IntegrityError):
+            db.execute_write(
+                "INSERT INTO tags (machine_id, tag_name, tag_type, logical_register, real_register, permission) "
+                "VALUES (1, 'PV', 'Analog', '40001', '0', 'Read')"
+            )
+    finally:
+        db.close()
+
+
+def test_migrate_is_idempotent(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "new.db"))
+
+    assert migrate(conn) == SCHEMA_VERSION
+    assert migrate(conn) == SCHEMA_VERSION
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert {"machines", "tags", "autocontrol", "register_maps", "config_changes"} <= tables
+    conn.close()
+
+
+def test_migration_versions_are_sequential():
+    assert [version for version, _, _ in MIGRATIONS] == list(range(1, SCHEMA_VERSION + 1))
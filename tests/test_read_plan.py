@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from app.core.config import ConfigSnapshot
+from app.models.schemas import MachineConfig, Mode, Permission, TagConfig, TagType
+from app.services.modbus import analog
+from app.services.modbus.digital import _get_digital_status_message, decode_bits
+from app.services.modbus.machine import MachineService
+from app.services.modbus.read_plan import ReadPlan, get_read_plan
+
+
+def _tag(tag_type, register):
+    return TagConfig(
+        tag_type=tag_type,
+        logical_register=str(register),
+        real_register=str(register),
+        permission=Permission.READ,
+    )
+
+
+def _machine():
+    return MachineConfig(
+        ip="127.0.0.1",
+        tags={
+            "RUN": _tag(TagType.DIGITAL, "10.0"),
+            "AUTO": _tag(TagType.DIGITAL_AM, "10.3"),
+            "REMOTE": _tag(TagType.DIGITAL_RM, "10.15"),
+            "ALARM": _tag(TagType.DIGITAL, "11.1"),
+            "PV": _tag(TagType.ANALOG, "20"),
+            "SV": _tag(TagType.ANALOG, "21"),
+            "BROKEN": _tag(TagType.DIGITAL, "12"),
+        },
+    )
+
+
+@pytest.mark.parametrize("register_value", [0, 1, 0b1000, 0x8009, 0xFFFF])
+def test_decode_bits_matches_single_bit_decoding(register_value):
+    bits = list(range(16)) * 3
+    types = [0] * 16 + [1] * 16 + [2] * 16
+
+    modes = decode_bits(register_value, bits, types)
+
+    assert modes == [
+        _get_digital_status_message(register_value, type_code, bit_position=bit)
+        for bit, type_code in zip(bits, types)
+    ]
+
+
+def test_read_plan_groups_digital_tags_by_register():
+    plan = ReadPlan(_machine().tags)
+
+    assert plan.analog == {"PV": 20, "SV": 21}
+    # 비트가 없는 디지털 태그는 계획에서 빠지고 단건 경로에서 오류로 보고됨
+    assert "BROKEN" not in plan.digital
+    assert plan.group_digital(["RUN", "AUTO", "REMOTE", "ALARM"]) == {
+        10: [("RUN", 0, 2), ("AUTO", 3, 0), ("REMOTE", 15, 1)],
+        11: [("ALARM", 1, 2)],
+    }
+
+
+def test_read_plan_is_cached_per_machine_config():
+    machine = _machine()
+    assert get_read_plan(machine) is get_read_plan(machine)
+
+
+def _service(manager):
+    service = MachineService.__new__(MachineService)
+    service.client_manager = manager
+    return service
+
+
+def test_read_machine_tag_values_reads_shared_register_once(fake_modbus):
+    manager, client = fake_modbus({10: 0b1000_0000_0000_1001, 11: 0b10, 20: 250, 21: 300})
+    snapshot = ConfigSnapshot({"M1": _machine()}, 1)
+
+    values = asyncio.run(
+        _service(manager).read_machine_tag_values(
+            "m1", ["run", "auto", "remote", "alarm", "pv", "sv", "broken", "missing"], snapshot
+        )
+    )
+
+    assert values["RUN"] == Mode.ON
+    assert values["AUTO"] == Mode.MANUAL
+    assert values["REMOTE"] == Mode.REMOTE
+    assert values["ALARM"] == Mode.ON
+    assert values["PV"] == 250 and values["SV"] == 300
+    assert isinstance(values["BROKEN"], Exception)
+    assert isinstance(values["MISSING"], Exception)
+    assert list(values) == ["RUN", "AUTO", "REMOTE", "ALARM", "PV", "SV", "BROKEN", "MISSING"]
+    assert sorted(client.requests).count((10, 1)) == 1
+
+
+def test_read_machine_tag_values_reads_tags_concurrently(fake_modbus, monkeypatch):
+    in_flight = 0
+    peak = 0
+
+    async def slow_read(self, register):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return register
+
+    monkeypatch.setattr(analog.AnalogService, "read_value", slow_read)
+    manager, _ = fake_modbus({10: 0, 11: 0})
+    snapshot = ConfigSnapshot({"M1": _machine()}, 1)
+
+    values = asyncio.run(
+        _service(manager).read_machine_tag_values("M1", ["PV", "SV", "RUN"], snapshot)
+    )
+
+    assert values == {"PV": 20, "SV": 21, "RUN": Mode.OFF}
+    assert peak == 2
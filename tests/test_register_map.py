@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.models.schemas import MachineConfig, Permission, TagConfig, TagType
+from app.services.exceptions import CustomException
+from app.services.modbus.analog import AnalogService
+from app.services.modbus.register_map import (
+    DEFAULT_REGISTER_RANGES,
+    MAX_REGISTERS_PER_READ,
+    RegisterMapService,
+    coalesce_ranges,
+    ranges_from_tags,
+    split_range,
+)
+
+
+def test_split_range_respects_read_limit():
+    assert split_range(0, 300) == [(0, 125), (125, 125), (250, 50)]
+    assert all(count <= MAX_REGISTERS_PER_READ for _, count in split_range(7, 1000))
+
+
+def test_coalesce_ranges_merges_overlaps_and_gaps():
+    ranges = [(20, 5), (0, 10), (5, 10), (30, 2), (40, 0)]
+
+    assert coalesce_ranges(ranges) == [(0, 15), (20, 5), (30, 2)]
+    assert coalesce_ranges(ranges, max_gap=4) == [(0, 15), (20, 5), (30, 2)]
+    assert coalesce_ranges(ranges, max_gap=5) == [(0, 32)]
+    # 합친 범위도 한 번에 읽을 수 있는 크기로 나뉨
+    assert coalesce_ranges([(0, 100), (100, 100)]) == [(0, 125), (125, 75)]
+
+
+def test_ranges_from_tags_uses_digital_base_register():
+    tags = {
+        "A": TagConfig(tag_type=TagType.ANALOG, logical_register="40001", real_register="0", permission=Permission.READ),
+        "B": TagConfig(tag_type=TagType.ANALOG, logical_register="40002", real_register="1", permission=Permission.READ),
+        "D": TagConfig(tag_type=TagType.DIGITAL, logical_register="40006.3", real_register="5.3", permission=Permission.READ),
+        "X": TagConfig(tag_type=TagType.ANALOG, logical_register="?", real_register="?", permission=Permission.READ),
+    }
+    assert ranges_from_tags(tags) == [(0, 2), (5, 1)]
+
+
+def test_read_ranges_bridges_small_gaps(fake_modbus):
+    manager, client = fake_modbus({r: r * 2 for r in range(100)})
+
+    values = asyncio.run(AnalogService(manager).read_ranges([(10, 3), (16, 2)], max_gap=8))
+
+    assert values == {10: 20, 11: 22, 12: 24, 16: 32, 17: 34}
+    assert client.requests == [(10, 8)]
+
+
+def test_read_ranges_falls_back_when_gap_is_not_readable(fake_modbus):
+    registers = {r: r for r in (10, 11, 12, 16, 17)}
+    manager, client = fake_modbus(registers)
+
+    values = asyncio.run(AnalogService(manager).read_ranges([(10, 3), (16, 2)], max_gap=8))
+
+    assert values == registers
+    assert client.requests[0] == (10, 8)
+    assert sorted(client.requests[1:]) == [(10, 3), (16, 2)]
+
+
+def test_register_map_service_prefers_stored_maps(db):
+    settings.update_machines_config(
+        {
+            "PUMP": MachineConfig(
+                ip="127.0.0.1",
+                tags={
+                    "PV": TagConfig(tag_type=TagType.ANALOG, logical_register="40101", real_register="100", permission=Permission.READ)
+                },
+            )
+        }
+    )
+    service = RegisterMapService(db)
+
+    assert service.get_map("default") == DEFAULT_REGISTER_RANGES
+    assert service.get_map("pump") == [(100, 1)]
+
+    service.save_map("pump", [(100, 10)])
+    assert service.get_map("PUMP") == [(100, 10)]
+    assert service.list_maps()["PUMP"] == [(100, 10)]
+
+    service.delete_map("Pump")
+    assert service.get_map("PUMP") == [(100, 1)]
+    with pytest.raises(CustomException):
+        service.delete_map("PUMP")
+    with pytest.raises(CustomException):
+        service.get_map("NOPE")
@@ -0,0 +1,126 @@
+import os
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from app.core.config import settings
+from app.services.historian import retention
+from app.services.historian.retention import RetentionService, enable_incremental_vacuum
+from app.services.historian.rollup import rollup_table
+from app.services.historian.schema import to_epoch_ms
+from app.services.historian.store import HistorianStore
+
+PUMP_PV = ("PUMP", "PV")
+NOW = datetime(2026, 1, 20, 12, 0, 0)
+
+
+@pytest.fixture(autouse=True)
+def policy(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "RETENTION_RAW_DAYS", 7)
+    monkeypatch.setattr(settings, "RETENTION_ROLLUP_1M_DAYS", 10)
+    monkeypatch.setattr(settings, "RETENTION_ROLLUP_1H_DAYS", 0)
+    monkeypatch.setattr(settings, "RETENTION_AUTOCONTROL_LOG_DAYS", 30)
+    monkeypatch.setattr(retention, "AUTOCONTROL_LOGS_DIR", str(tmp_path / "autocontrol"))
+    monkeypatch.setattr(RetentionService, "BATCH_PAUSE", 0)
+    monkeypatch.setattr(RetentionService, "DELETE_BATCH_ROWS", 50)
+
+
+def fill(store, days):
+    """days의 각 날짜 정오부터 1분 동안 10초 간격 값과 같은 시각의 넓은 테이블 행"""
+    store.ensure_schema([PUMP_PV])
+    conn = sqlite3.connect(store.db_file)
+    with conn:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS modbus_data (timestamp TEXT PRIMARY KEY, pump_pv REAL)"
+        )
+    rows = []
+    for day in days:
+        start = datetime(2026, 1, day, 12, 0, 0)
+        for i in range(6):
+            ts = to_epoch_ms(start) + i * 10_000
+            rows.append((PUMP_PV, ts, float(i)))
+            conn.execute(
+                "INSERT INTO modbus_data VALUES (?, ?)",
+                (datetime.fromtimestamp(ts / 1000).strftime("%Y-%m-%d %H:%M:%S"), float(i)),
+            )
+    conn.commit()
+    conn.close()
+    store.write_rows(rows)
+
+
+def count(store, sql):
+    conn = sqlite3.connect(store.db_file)
+    try:
+        return conn.execute(sql).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_enforce_drops_expired_partitions_rollups_and_wide_rows(store):
+    fill(store, days=[1, 5, 11, 19])
+    store.archive_closed_partitions(now=NOW)
+
+    result = RetentionService(store).enforce(now=NOW)
+
+    # 원시 값 7일 (13일 이전 파티션), 1분 롤업 10일 (10일 이전), 1시간 롤업 무기한
+    assert result["raw_partitions"] == 3
+    assert result["wide_rows"] == 18
+    assert result["rollup_1m_rows"] == 2
+    assert result["rollup_1h_rows"] == 0
+    assert count(store, "SELECT COUNT(*) FROM historian_partitions") == 1
+    assert os.listdir(store.archive_dir) == []
+    assert count(store, f"SELECT COUNT(*) FROM {rollup_table('1m')}") == 2
+    assert count(store, f"SELECT COUNT(*) FROM {rollup_table('1h')}") == 4
+    assert len(list(store.read([PUMP_PV], 0, 2**62))) == 6
+    assert isinstance(result["free_pages"], int)
+
+
+def test_enforce_deletes_old_autocontrol_logs(store, tmp_path):
+    logs = tmp_path / "autocontrol"
+    logs.mkdir()
+    for name in ("auto_control_20251201.parquet", "auto_control_20260115.parquet", "other.txt"):
+        (logs / name).write_bytes(b"")
+
+    result = RetentionService(store).enforce(now=NOW)
+
+    assert result["autocontrol_logs"] == 1
+    assert sorted(os.listdir(logs)) == ["auto_control_20260115.parquet", "other.txt"]
+
+
+def test_enforce_stops_between_batches(store):
+    fill(store, days=[1, 5, 11, 19])
+    service = RetentionService(store)
+    service._stopping.set()
+
+    result = service.enforce(now=NOW)
+
+    assert result["wide_rows"] == 18
+    assert result["rollup_1m_rows"] == 0
+    assert result["free_pages"] == 0
+
+
+def test_free_pages_is_none_until_incremental_vacuum_is_enabled(tmp_path):
+    db_file = str(tmp_path / "legacy.db")
+    # PRAGMA auto_vacuum 없이 만든 기존 파일
+    conn = sqlite3.connect(db_file)
+    conn.execute("CREATE TABLE modbus_data (timestamp TEXT PRIMARY KEY, pump_pv REAL)")
+    conn.close()
+
+    store = HistorianStore(db_file, wide_table="modbus_data", partition="day")
+    try:
+        fill(store, days=[1, 19])
+        service = RetentionService(store)
+        assert service.enforce(now=NOW)["free_pages"] is None
+        assert service._vacuum_warned
+        assert service.enforce(now=NOW)["free_pages"] is None
+    finally:
+        store.close()
+
+    enable_incremental_vacuum(db_file)
+    store = HistorianStore(db_file, wide_table="modbus_data", partition="day")
+    try:
+        store.ensure_schema([])
+        assert RetentionService(store).enforce(now=NOW)["free_pages"] == 0
+    finally:
+        store.close()
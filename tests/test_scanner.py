@@ -0,0 +1,93 @@
+import pytest
+from pymodbus.pdu import ExceptionResponse
+
+from app.models.schemas import TagType
+from app.services.exceptions import ModbusReadError
+from app.services.modbus import scanner as scanner_module
+from app.services.modbus.scanner import RegisterScanner, propose_machine_config, scan_device
+
+
+class _OtherError:
+    """잘못된 주소가 아닌 예외 응답 (장비 오류, 코드 4)"""
+
+    exception_code = ExceptionResponse.SLAVE_FAILURE
+
+    def isError(self):
+        return True
+
+
+def _scanner(monkeypatch, client, workers=2):
+    scanner = RegisterScanner("127.0.0.1", workers=workers)
+    monkeypatch.setattr(scanner, "_get_client", lambda: client)
+    return scanner
+
+
+def test_scan_bisects_illegal_address_blocks(monkeypatch, fake_modbus):
+    registers = {r: 0 for r in list(range(0, 100)) + list(range(300, 310))}
+    _, client = fake_modbus(registers)
+    scanner = _scanner(monkeypatch, client)
+
+    ranges = scanner.scan(0, 500, block_size=125)
+
+    assert ranges == [(0, 100), (300, 10)]
+    assert scanner.unknown_ranges == []
+    assert scanner.request_count == len(client.requests)
+
+
+def test_scan_records_timeouts_as_unknown_and_continues(monkeypatch, fake_modbus):
+    registers = {r: 0 for r in range(0, 500)}
+    _, client = fake_modbus(registers, fail=[130])
+    scanner = _scanner(monkeypatch, client)
+
+    ranges = scanner.scan(0, 500, block_size=125)
+
+    # 시간 초과 블록은 나누지 않고 확인하지 못한 구간으로 남김
+    assert ranges == [(0, 125), (250, 125), (375, 125)]
+    assert scanner.unknown_ranges == [(125, 125)]
+    assert client.requests.count((125, 125)) == 1
+
+
+def test_scan_does_not_bisect_other_exception_codes(monkeypatch, fake_modbus):
+    _, client = fake_modbus({r: 0 for r in range(0, 250)})
+    original = client.read_holding_registers
+
+    def read(address, count=1, slave=1):
+        if address == 125:
+            client.requests.append((address, count))
+            return _OtherError()
+        return original(address, count, slave)
+
+    client.read_holding_registers = read
+    scanner = _scanner(monkeypatch, client)
+
+    assert scanner.scan(0, 250, block_size=125) == [(0, 125)]
+    assert scanner.unknown_ranges == [(125, 125)]
+    assert len(client.requests) == 2
+
+
+def test_scan_raises_when_device_never_answers(monkeypatch, fake_modbus):
+    _, client = fake_modbus({}, fail=range(0, 250))
+    scanner = _scanner(monkeypatch, client)
+
+    with pytest.raises(ModbusReadError):
+        scanner.scan(0, 250, block_size=125)
+
+
+def test_scan_device_reports_unknown_ranges(monkeypatch, fake_modbus):
+    _, client = fake_modbus({r: 0 for r in range(0, 20)}, fail=[15])
+    monkeypatch.setattr(RegisterScanner, "_get_client", lambda self: client)
+
+    result = scan_device("10.0.0.5", start=0, count=20, block_size=10)
+
+    assert [(r.start, r.count) for r in result.ranges] == [(0, 10)]
+    assert [(r.start, r.count) for r in result.unknown_ranges] == [(10, 10)]
+    assert result.register_count == 10
+    assert list(result.config) == ["SCAN_10_0_0_5"]
+
+
+def test_propose_machine_config_creates_read_only_analog_tags():
+    config = propose_machine_config("10.0.0.5", 502, 1, [(0, 2), (10, 1)])
+
+    assert list(config.tags) == ["R0", "R1", "R10"]
+    assert config.tags["R10"].tag_type == TagType.ANALOG
+    assert config.tags["R10"].logical_register == str(scanner_module.HOLDING_REGISTER_BASE + 10)
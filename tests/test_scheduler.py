@@ -0,0 +1,124 @@
+import pytest
+
+from app.services.historian.scheduler import PeriodicScheduler
+
+
+class FakeClocks:
+    """단조 시계와 벽시계 대역 (advance는 둘 다, jump는 벽시계만 움직임)"""
+
+    def __init__(self, mono=50.0, wall=1000.3):
+        self.mono = mono
+        self.wall = wall
+
+    def advance(self, seconds):
+        self.mono += seconds
+        self.wall += seconds
+
+    def jump(self, seconds):
+        self.wall += seconds
+
+    def scheduler(self, period=1.0, **kwargs):
+        return PeriodicScheduler(
+            period, clock=lambda: self.mono, wall_clock=lambda: self.wall, **kwargs
+        )
+
+
+def test_first_tick_is_aligned_to_period_on_wall_clock():
+    clocks = FakeClocks(wall=1000.3)
+    scheduler = clocks.scheduler()
+
+    assert scheduler.next_tick() == pytest.approx(0.7)
+    clocks.advance(0.7)
+    tick = scheduler.take()
+
+    assert (tick.index, tick.missed) == (0, 0)
+    assert tick.timestamp.timestamp() == pytest.approx(1001)
+    assert tick.lateness == pytest.approx(0)
+    assert scheduler.next_tick() == pytest.approx(1.0)
+
+
+def test_phase_offsets_tick_times():
+    clocks = FakeClocks(wall=1000.0)
+    scheduler = clocks.scheduler(period=30, phase=5)
+
+    clocks.advance(scheduler.next_tick())
+
+    assert scheduler.take().timestamp.timestamp() == pytest.approx(1025)
+
+
+def test_slow_work_skips_to_latest_tick_and_counts_missed():
+    clocks = FakeClocks()
+    scheduler = clocks.scheduler()
+    clocks.advance(0.7)
+    scheduler.take()
+
+    # 작업이 3.2초 걸려 1, 2번 주기를 넘기고 3번 주기에 0.2초 늦음
+    clocks.advance(3.2)
+    tick = scheduler.take()
+
+    assert (tick.index, tick.missed) == (3, 2)
+    assert tick.timestamp.timestamp() == pytest.approx(1004)
+    assert tick.lateness == pytest.approx(0.2)
+    assert scheduler.stats()["missed"] == 2
+
+
+def test_tick_later_than_tolerance_is_skipped_and_reported_with_next_tick():
+    clocks = FakeClocks()
+    scheduler = clocks.scheduler(late_tolerance=0.5)
+    clocks.advance(0.7)
+    scheduler.take()
+
+    clocks.advance(1.8)
+    assert scheduler.take() is None
+    clocks.advance(scheduler.next_tick())
+    tick = scheduler.take()
+
+    assert (tick.index, tick.missed) == (2, 1)
+    assert scheduler.stats()["ticks"] == 2
+    assert scheduler.stats()["missed"] == 1
+
+
+def test_wall_clock_jump_forward_resyncs_timestamps():
+    clocks = FakeClocks()
+    scheduler = clocks.scheduler()
+    clocks.advance(0.7)
+    scheduler.take()
+
+    clocks.jump(10.25)
+    scheduler._check_wall_clock()
+    clocks.advance(scheduler.next_tick())
+    tick = scheduler.take()
+
+    assert scheduler.resyncs == 1
+    assert tick.timestamp.timestamp() == pytest.approx(1012)
+
+
+def test_wall_clock_jump_backward_never_repeats_a_timestamp():
+    clocks = FakeClocks()
+    scheduler = clocks.scheduler()
+    clocks.advance(0.7)
+    first = scheduler.take()
+
+    clocks.jump(-10)
+    scheduler._check_wall_clock()
+    clocks.advance(scheduler.next_tick())
+    tick = scheduler.take()
+
+    assert scheduler.resyncs == 1
+    assert tick.timestamp > first.timestamp
+
+
+def test_small_wall_clock_drift_does_not_resync():
+    clocks = FakeClocks()
+    scheduler = clocks.scheduler()
+
+    clocks.jump(0.5)
+    scheduler._check_wall_clock()
+
+    assert scheduler.resyncs == 0
+
+
+@pytest.mark.parametrize("period, phase", [(0, 0), (-1, 0), (1, 1), (1, -0.1)])
+def test_invalid_period_or_phase(period, phase):
+    with pytest.raises(ValueError):
+        PeriodicScheduler(period, phase)
@@ -0,0 +1,115 @@
+import os
+from datetime import datetime
+
+import pytest
+
+from app.services.historian.schema import to_epoch_ms
+from app.services.historian.spool import Spool
+from app.services.historian.writer import HistorianWriter
+
+PUMP_PV = ("PUMP", "PV")
+T0 = to_epoch_ms(datetime(2026, 1, 1, 12, 0, 0))
+
+
+def drained(spool):
+    records = []
+    spool.drain(records.extend)
+    return records
+
+
+def test_drain_returns_records_in_time_order_and_removes_segments(tmp_path):
+    spool = Spool(str(tmp_path), segment_bytes=1)
+    spool.append([(3, "c"), (1, "a")])
+    spool.append([(2, "b")])
+
+    # 세그먼트 안에서만 시각 순으로 정렬하고 세그먼트는 쓴 순서대로 넘김
+    assert spool.pending
+    assert drained(spool) == [(1, "a"), (3, "c"), (2, "b")]
+    assert not spool.pending
+    assert spool.stats()["drained_records"] == 3
+
+
+def test_torn_last_record_is_dropped_after_restart(tmp_path):
+    spool = Spool(str(tmp_path))
+    spool.append([(1, ["PUMP", "PV", 1.0]), (2, ["PUMP", "PV", 2.0])])
+    spool.close()
+    [segment] = spool._segments()
+    # 두 번째 레코드를 쓰다가 프로세스가 죽은 상태
+    with open(segment, "r+b") as f:
+        f.truncate(os.path.getsize(segment) - 3)
+
+    restarted = Spool(str(tmp_path))
+    restarted.append([(3, ["PUMP", "PV", 3.0])])
+
+    assert len(restarted._segments()) == 2
+    assert drained(restarted) == [(1, ["PUMP", "PV", 1.0]), (3, ["PUMP", "PV", 3.0])]
+    assert restarted.stats()["corrupt_records"] == 1
+
+
+def test_record_with_bad_crc_drops_rest_of_segment(tmp_path):
+    spool = Spool(str(tmp_path))
+    spool.append([(1, "a"), (2, "b"), (3, "c")])
+    spool.close()
+    [segment] = spool._segments()
+    with open(segment, "r+b") as f:
+        data = bytearray(f.read())
+        # 두 번째 레코드 본문의 한 바이트를 바꿈
+        data[data.index(b'[2,"b"]') + 4] ^= 0xFF
+        f.seek(0)
+        f.write(data)
+
+    assert drained(Spool(str(tmp_path))) == [(1, "a")]
+
+
+def test_failed_sink_keeps_segment_for_next_drain(tmp_path):
+    spool = Spool(str(tmp_path))
+    spool.append([(1, "a")])
+
+    def failing(records):
+        raise OSError("database is locked")
+
+    with pytest.raises(OSError):
+        spool.drain(failing)
+    assert spool.pending
+    assert drained(spool) == [(1, "a")]
+
+
+def test_max_bytes_drops_oldest_segments(tmp_path):
+    spool = Spool(str(tmp_path), segment_bytes=1, max_bytes=80)
+    for ts in range(5):
+        spool.append([(ts, "x" * 20)])
+
+    assert [ts for ts, _ in drained(spool)] == [3, 4]
+    assert spool.stats()["dropped_segments"] == 3
+
+
+def test_writer_spools_failed_flushes_and_drains_them_first(store, flaky_store, tmp_path):
+    sink = flaky_store
+    spool = Spool(str(tmp_path / "spool"))
+    writer = HistorianWriter(
+        sink, flush_rows=100, flush_interval_ms=1000, max_buffer_rows=1000, spool=spool
+    )
+
+    sink.broken = True
+    writer.append_rows([(PUMP_PV, T0, 0.0), (PUMP_PV, T0 + 1000, 1.0)])
+    writer.flush()
+    # 저장소가 돌아오기 전에 쌓인 값도 스풀 뒤에 이어 씀
+    writer._next_drain = 0
+    writer.append_rows([(PUMP_PV, T0 + 2000, 2.0)])
+    writer.flush()
+    assert writer.stats()["buffered"] == 0
+    assert writer.stats()["spooled_rows"] == 3
+
+    sink.broken = False
+    writer._next_drain = 0
+    writer.append_rows([(PUMP_PV, T0 + 3000, 3.0)])
+    assert writer.flush() == 1
+
+    assert [ts for _, ts, _, _ in store.read([PUMP_PV], T0, T0 + 60_000)] == [
+        T0 + i * 1000 for i in range(4)
+    ]
+    assert not spool.pending
+    stats = writer.stats()
+    assert stats["drained_rows"] == 3
+    assert stats["written_rows"] == 4
+    spool.close()